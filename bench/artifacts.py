@@ -0,0 +1,109 @@
+"""Shared artifact cache under contention: N processes ask for the regime chart at once.
+
+    python -m bench.artifacts --processes 8
+
+Reports how many processes rendered (should be 1), how many waited for the
+builder, torn reads seen by a concurrent reader (should be 0), hit latency and
+LRU eviction under a size cap.
+"""
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from benchmark3x import artifacts, charts
+
+
+def _worker(root, chart_path, barrier, queue):
+    cache = artifacts.ArtifactCache(root)
+    if barrier is not None:
+        barrier.wait()
+    start = time.perf_counter()
+    charts.ensure_regime_chart(chart_path, cache=cache)
+    queue.put((time.perf_counter() - start, cache.stats()))
+
+
+def _reader(chart_path, stop, queue):
+    reads = torn = 0
+    while not stop.is_set():
+        try:
+            data = Path(chart_path).read_bytes()
+        except FileNotFoundError:
+            continue
+        reads += 1
+        if not (data.startswith(b"\xff\xd8") and data.endswith(b"\xff\xd9")):
+            torn += 1
+    queue.put((reads, torn))
+
+
+def _hit_latency(root, chart_path, n):
+    cache = artifacts.ArtifactCache(root)
+    start = time.perf_counter()
+    for _ in range(n):
+        charts.ensure_regime_chart(chart_path, cache=cache)
+    return (time.perf_counter() - start) / n
+
+
+def _eviction(root, entries, size, max_entries):
+    cache = artifacts.ArtifactCache(root, max_bytes=size * max_entries)
+    payload = b"x" * size
+    for i in range(entries):
+        cache.get_or_build("blob", {"i": i}, lambda path: Path(path).write_bytes(payload))
+        time.sleep(0.002)  # distinct mtimes
+    # The most recent entries survive; the oldest were evicted.
+    cache.get_or_build("blob", {"i": entries - 1}, lambda path: Path(path).write_bytes(payload))
+    cache.get_or_build("blob", {"i": 0}, lambda path: Path(path).write_bytes(payload))
+    return cache.stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "artifacts"
+        chart_path = Path(tmp) / "downturn_chart.jpg"
+        barrier = multiprocessing.Barrier(args.processes)
+        queue = multiprocessing.Queue()
+        stop = multiprocessing.Event()
+        reader_queue = multiprocessing.Queue()
+        reader = multiprocessing.Process(target=_reader, args=(chart_path, stop, reader_queue))
+        reader.start()
+        workers = [
+            multiprocessing.Process(target=_worker, args=(root, chart_path, barrier, queue))
+            for _ in range(args.processes)
+        ]
+        for worker in workers:
+            worker.start()
+        results = [queue.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        # Keep reading while every process republishes the (unchanged) chart.
+        more = [multiprocessing.Process(target=_worker, args=(root, chart_path, None, queue))
+                for _ in range(args.processes)]
+        for worker in more:
+            worker.start()
+        results += [queue.get() for _ in more]
+        for worker in more:
+            worker.join()
+        stop.set()
+        reads, torn = reader_queue.get()
+        reader.join()
+
+        builds = sum(stats["misses"] for _, stats in results)
+        waits = sum(stats["waits"] for _, stats in results)
+        slowest = max(elapsed for elapsed, _ in results)
+        print(f"{len(results)} processes: {builds} render(s), {waits} waited for the builder, "
+              f"slowest {slowest * 1e3:.0f} ms")
+        print(f"concurrent reader: {reads:,} reads, {torn} torn")
+        print(f"hit path: {_hit_latency(root, chart_path, 2000) * 1e6:.1f} us per ensure_regime_chart()")
+
+        stats = _eviction(Path(tmp) / "lru", entries=50, size=64 * 1024, max_entries=10)
+        print(f"LRU: {stats['entries']} entries / {stats['bytes']:,} B kept under a {stats['max_bytes']:,} B cap, "
+              f"{stats['hits']} hit(s), {stats['misses']} miss(es)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Login backend throughput: concurrent sign-ins, cached session checks and rate-limit rejections.
+
+    python -m bench.auth --users 200 --concurrency 32
+"""
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from benchmark3x import auth
+
+
+def _percentiles(latencies):
+    p50, p99 = np.percentile(np.asarray(latencies), [50, 99]) * 1e3
+    return f"p50 {p50:7.2f} ms  p99 {p99:7.2f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32, help="simulated Streamlit sessions")
+    parser.add_argument("--validations", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # No rate limiting here: this measures the hashing pool, not the limiter.
+        limiter = auth.TokenBucket(rate=1e9, burst=1e9)
+        service = auth.AuthService(Path(tmp) / "auth.sqlite3", limiter=limiter)
+        emails = [f"user{i}@example.com" for i in range(args.users)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as sessions:
+            list(sessions.map(lambda email: service.create_user(email, "correct horse"), emails))
+        print(f"created {args.users} users in {time.perf_counter() - start:.2f} s "
+              f"({auth.HASH_WORKERS} hash workers)")
+
+        def login(email):
+            start = time.perf_counter()
+            token = service.login(email, "correct horse", client_key=email)
+            return token, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as sessions:
+            results = list(sessions.map(login, emails))
+        elapsed = time.perf_counter() - start
+        print(f"login            {args.users / elapsed:9,.1f} /s   {_percentiles([r[1] for r in results])}")
+
+        tokens = [token for token, _ in results]
+        service.sessions.hits = service.sessions.misses = 0
+        start = time.perf_counter()
+        for i in range(args.validations):
+            service.validate(tokens[i % len(tokens)])
+        elapsed = time.perf_counter() - start
+        print(f"validate cached  {args.validations / elapsed:9,.0f} /s   "
+              f"{elapsed / args.validations * 1e6:.2f} us each, "
+              f"hit rate {service.sessions.hits / args.validations:.1%}")
+
+        service.sessions = auth.TTLCache()
+        start = time.perf_counter()
+        for token in tokens:
+            service.validate(token)
+        elapsed = time.perf_counter() - start
+        print(f"validate cold    {len(tokens) / elapsed:9,.0f} /s   {elapsed / len(tokens) * 1e6:.2f} us each (SQLite)")
+
+        service.limiter = auth.TokenBucket()
+        for _ in range(auth.LOGIN_BURST):
+            service.limiter.allow("attacker")
+        start = time.perf_counter()
+        rejected = 0
+        for _ in range(args.validations):
+            try:
+                service.login_async(emails[0], "guess", client_key="attacker")
+            except auth.RateLimited:
+                rejected += 1
+        elapsed = time.perf_counter() - start
+        print(f"rate-limited     {rejected / elapsed:9,.0f} /s   {elapsed / rejected * 1e6:.2f} us each, no hashing")
+
+
+if __name__ == "__main__":
+    main()
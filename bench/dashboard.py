@@ -0,0 +1,114 @@
+"""Dashboard chart: view payload against history length, tile cache, pushed updates.
+
+    python -m bench.dashboard --rows 10000 100000 1000000 --width 1200 --clients 50
+
+For each history length, loads the "All" view the way the browser does
+(meta + tiles) and compares it with sending every point. Then keeps
+``--clients`` SSE streams open, appends one bar to the store and measures
+how many bytes reach each client and how fast.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmark3x import auth, charts, dashboard, features
+
+
+def _build(root, rows):
+    store = features.FeatureStore.create(root)
+    dates = features.business_days("1950-01-03", rows + 10)
+    for start in range(0, rows, 1_000_000):
+        stop = min(rows, start + 1_000_000)
+        store.append(dates[start:stop], features.synthetic_columns(stop - start, seed=start))
+    return store, dates[rows:]
+
+
+def _view(board, start, end, width):
+    """Fetch a view like the browser; returns (z, tiles, points, bytes, seconds)."""
+    begin = time.perf_counter()
+    meta = board.meta()
+    z, tiles = dashboard.tiles_for(start, end, width, board.tiles.tile_points)
+    bodies = [board.tiles.tile(z, t)[0] for t in tiles]
+    elapsed = time.perf_counter() - begin
+    points = sum(len(json.loads(body)["i"]) for body in bodies)
+    return z, len(tiles), points, sum(map(len, bodies)) + len(meta), elapsed
+
+
+async def _read_event(reader):
+    event = b""
+    while not event.endswith(b"\n\n"):
+        event += await reader.readuntil(b"\n")
+    return event
+
+
+async def _push(board, next_dates, clients):
+    server = await dashboard.httpd.start_server(dashboard.make_handler(board), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    token, _ = auth.issue_token(dashboard.TOKEN_SCOPE, "bench")
+    streams = []
+    for _ in range(clients):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET /v1/chart/stream?since={board.rows}&token={token} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+        await reader.readuntil(b"\r\n\r\n")
+        streams.append((reader, writer))
+    await asyncio.sleep(0.05)
+
+    waiting = [asyncio.ensure_future(_read_event(reader)) for reader, _ in streams]
+    start = time.perf_counter()
+    board.store.append(next_dates[:1], features.synthetic_columns(1, seed=99))
+    board.poll()
+    events = await asyncio.gather(*waiting)
+    elapsed = time.perf_counter() - start
+    for _, writer in streams:
+        writer.close()
+    # A few more appends make the server-side streams write into the closed sockets and end.
+    for i in range(1, 4):
+        board.store.append(next_dates[i:i + 1], features.synthetic_columns(1, seed=i))
+        board.poll()
+        await asyncio.sleep(0.05)
+    server.close()
+    return np.mean([len(e) for e in events]), elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--width", type=int, default=1200)
+    parser.add_argument("--clients", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    if charts.CHART_PATH.exists():
+        jpeg = charts.CHART_PATH.stat().st_size
+        print(f"static chart today: {jpeg / 1024:.0f} KB JPEG ({jpeg * 4 / 3 / 1024:.0f} KB as base64), "
+              f"re-rendered for any change")
+
+    n = 200_000
+    y = np.cumsum(np.random.default_rng(0).normal(size=n))
+    start = time.perf_counter()
+    dashboard.lttb(y, 1000)
+    print(f"lttb: {n:,} -> 1,000 points in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            store, next_dates = _build(Path(tmp) / "features", rows)
+            board = dashboard.ChartBoard(store)
+            full = len(dashboard.points_json(store, board.detector.labels, np.arange(rows)))
+
+            z, tiles, points, size, cold = _view(board, 0, rows, args.width)
+            warm = _view(board, 0, rows, args.width)[-1]
+            _, _, year_points, year_size, _ = _view(board, rows - 252, rows, args.width)
+            print(f"{rows:>10,} bars: All view z={z}, {tiles} tiles, {points:,} points, {size / 1024:,.0f} KB "
+                  f"(every point: {full / 1024:,.0f} KB); built in {cold * 1e3:.1f} ms, cached {warm * 1e3:.2f} ms; 1Y view {year_points} points, {year_size / 1024:.0f} KB")
+
+            event_bytes, elapsed = asyncio.run(_push(board, next_dates, args.clients))
+            print(f"{'':>16}append 1 bar -> {args.clients} clients: {event_bytes:.0f} B each, "
+                  f"all delivered in {elapsed * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Feature store: range-read latency, daily append cost and RSS across worker processes.
+
+    python -m bench.features --rows 5000000 --workers 4
+
+Workers either memory-map the store or load private copies (``np.load``);
+with mmap every worker shares one copy of the pages, so PSS per worker drops
+roughly by the worker count.
+"""
+import argparse
+import hashlib
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmark3x import features
+
+CHUNK = 1_000_000
+
+
+def _build(root, rows):
+    store = features.FeatureStore.create(root)
+    dates = features.business_days("1990-01-02", rows + 250)
+    for start in range(0, rows, CHUNK):
+        stop = min(rows, start + CHUNK)
+        cols = features.synthetic_columns(stop - start, seed=start)
+        store.append(dates[start:stop], cols)
+    return store, dates[rows:]
+
+
+def _range_reads(store, n, rng):
+    days = store.index
+    latencies = np.empty(n)
+    touch = np.empty(n)
+    for i in range(n):
+        a, b = np.sort(rng.integers(0, len(days), 2))
+        start, end = days[a].astype("datetime64[D]"), days[b].astype("datetime64[D]")
+        t0 = time.perf_counter()
+        cols = store.read(start, end)
+        t1 = time.perf_counter()
+        float(cols["close"].sum())
+        touch[i] = time.perf_counter() - t1
+        latencies[i] = t1 - t0
+    return latencies, touch
+
+
+def _data_digest(path, rows, itemsize):
+    with open(path, "rb") as f:
+        f.seek(features.HEADER_LEN)
+        return hashlib.sha256(f.read(rows * itemsize)).hexdigest()
+
+
+def _daily_appends(store, dates):
+    rows = len(store)
+    before = _data_digest(store.root / "close.npy", rows, 8)
+    latencies = []
+    for i, date in enumerate(dates):
+        cols = {name: values for name, values in features.synthetic_columns(1, seed=i).items()}
+        t0 = time.perf_counter()
+        store.append([date], cols)
+        latencies.append(time.perf_counter() - t0)
+    unchanged = _data_digest(store.root / "close.npy", rows, 8) == before
+    return np.array(latencies), unchanged
+
+
+def _smaps():
+    out = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                out[key] = int(value.split()[0])
+    return out
+
+
+def _worker(root, mode, barrier, queue):
+    if mode == "mmap":
+        store = features.FeatureStore(root)
+        cols = store.read()
+    else:
+        cols = {name: np.load(Path(root) / f"{name}.npy") for name in features.FEATURES}
+    total = sum(float(np.nansum(v)) for k, v in cols.items() if k != "date")
+    barrier.wait()  # all workers alive and holding their data at the same time
+    queue.put((_smaps(), total))
+    barrier.wait()
+
+
+def _rss(root, mode, workers):
+    ctx = multiprocessing.get_context("spawn")  # clean children, nothing inherited from this process
+    barrier = ctx.Barrier(workers)
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(root, mode, barrier, queue)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--reads", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "features"
+        t0 = time.perf_counter()
+        store, future_dates = _build(root, args.rows)
+        size = sum(p.stat().st_size for p in root.glob("*.npy"))
+        print(f"ingest: {args.rows:,} rows x {len(features.FEATURES)} features in {time.perf_counter() - t0:.2f} s "
+              f"({size / 2**20:,.0f} MiB on disk)")
+
+        latencies, touch = _range_reads(store, args.reads, np.random.default_rng(0))
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+        t50 = np.percentile(touch, 50) * 1e3
+        print(f"range read (all 14 columns, views): p50 {p50:.1f} us  p99 {p99:.1f} us; "
+              f"summing close over the range: p50 {t50:.2f} ms")
+
+        appends, unchanged = _daily_appends(store, future_dates)
+        p50, p99 = np.percentile(appends, [50, 99]) * 1e3
+        print(f"daily append ({len(future_dates)} days): p50 {p50:.2f} ms  p99 {p99:.2f} ms; "
+              f"history bytes unchanged: {unchanged}")
+
+        for mode in ("mmap", "copy"):
+            results = _rss(root, mode, args.workers)
+            rss = np.mean([s["Rss"] for s, _ in results]) / 1024
+            pss = np.mean([s["Pss"] for s, _ in results]) / 1024
+            private = np.mean([s.get("Private_Clean", 0) + s.get("Private_Dirty", 0) for s, _ in results]) / 1024
+            print(f"{args.workers} workers, {mode:<4}: RSS {rss:7.1f} MiB  PSS {pss:7.1f} MiB  "
+                  f"private {private:7.1f} MiB per worker")
+
+
+if __name__ == "__main__":
+    main()
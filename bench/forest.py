@@ -0,0 +1,84 @@
+"""Packed forest inference: parity, single-row latency and bulk rows/sec.
+
+    python -m bench.forest --trees 300 --depth 12 --rows 1000000
+
+Uses random trees with the shape of a trained forest; when scikit-learn is
+installed, also fits a real RandomForestClassifier and checks parity against
+its predict_proba.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmark3x import forest
+
+
+def _sklearn_parity(rng, n_features):
+    try:
+        from sklearn.ensemble import RandomForestClassifier
+    except ImportError:
+        return None
+    X = rng.normal(size=(5000, n_features))
+    y = (X[:, 0] + 0.5 * X[:, 1] - X[:, 2] ** 2 + rng.normal(0, 0.5, 5000) > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=50, max_depth=10, random_state=0).fit(X, y)
+    packed = forest.pack_sklearn(model)
+    X_test = rng.normal(size=(5000, n_features))
+    return np.abs(packed.predict_proba(X_test) - model.predict_proba(X_test)).max()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--features", type=int, default=14)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    trees = forest.random_trees(args.trees, args.depth, args.features, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = forest.pack(trees, args.features).save(Path(tmp) / "forest.npz")
+        start = time.perf_counter()
+        model = forest.load(path)
+        load_ms = (time.perf_counter() - start) * 1e3
+    nodes = model.feature.shape[0]
+    print(f"{model.n_trees} trees, {nodes:,} nodes, depth {model.depth}; load {load_ms:.1f} ms "
+          f"(paid once per process, not per request)")
+
+    X_check = rng.normal(size=(1000, args.features))
+    start = time.perf_counter()
+    reference = forest.reference_predict_proba(trees, X_check)
+    reference_rows_per_sec = X_check.shape[0] / (time.perf_counter() - start)
+    # Both paths: all trees at once (few rows) and tree by tree (batches).
+    diff = max(np.abs(model.predict_proba(X_check) - reference).max(),
+               np.abs(model.predict_proba(X_check[:forest.SMALL_BATCH]) - reference[:forest.SMALL_BATCH]).max())
+    agree = (model.predict(X_check) == model.classes[reference.argmax(axis=1)]).mean()
+    print(f"parity vs reference walk: max |dp| {diff:.2e}, predictions agree {agree:.1%}")
+    sklearn_diff = _sklearn_parity(rng, args.features)
+    print("parity vs sklearn: " + ("not installed" if sklearn_diff is None else f"max |dp| {sklearn_diff:.2e}"))
+
+    row = rng.normal(size=(1, args.features))
+    for _ in range(200):
+        model.predict_proba(row)
+    latencies = np.empty(5000)
+    for i in range(latencies.shape[0]):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        latencies[i] = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+    print(f"single row: p50 {p50:.0f} us  p99 {p99:.0f} us "
+          f"(reference walk: {1e6 / reference_rows_per_sec:.0f} us/row)")
+
+    X = rng.normal(size=(args.rows, args.features)).astype(np.float32)
+    start = time.perf_counter()
+    model.predict_proba(X)
+    elapsed = time.perf_counter() - start
+    print(f"bulk: {args.rows:,} rows in {elapsed:.2f} s = {args.rows / elapsed:,.0f} rows/s "
+          f"({args.rows / elapsed / reference_rows_per_sec:.0f}x the reference walk)")
+
+
+if __name__ == "__main__":
+    main()
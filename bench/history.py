@@ -0,0 +1,161 @@
+"""Signal history store: query latency under concurrent readers, with a live writer.
+
+    python -m bench.history --years 20 --readers 1 4 16
+
+Loads a synthetic history into a temporary database, then for each reader
+count runs that many threads issuing a mix of queries (signal on a date,
+switches in a year, rolling 1-year stats on a date, a month of signals)
+while one writer appends a day every ``--write-interval`` seconds. The same
+questions are also answered by rescanning the in-memory record list and
+re-running the window backtest, which is what every request would cost
+without the store.
+"""
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from benchmark3x import backtest, history
+
+KINDS = ("signal_on", "switches_year", "performance_1y", "month")
+
+
+def _queries(records, n, seed):
+    rng = random.Random(seed)
+    first, last = records[0]["date"], records[-1]["date"]
+    years = range(int(first[:4]), int(last[:4]) + 1)
+    days = [r["date"] for r in records]
+    out = []
+    for _ in range(n):
+        kind = rng.choice(KINDS)
+        out.append((kind, rng.choice(years) if kind == "switches_year" else rng.choice(days)))
+    return out
+
+
+def _ask(store, kind, arg):
+    if kind == "signal_on":
+        return store.signal_on(arg)
+    if kind == "switches_year":
+        return store.switches("SPXL", f"{arg}-01-01", f"{arg + 1}-01-01")
+    if kind == "performance_1y":
+        return store.performance("SPXL", "1y", arg)
+    start = np.datetime64(arg, "D")
+    return store.signals("SPXL", str(start), str(start + 30))
+
+
+class Rescan:
+    """The same answers from the raw record list, scanned per query."""
+
+    def __init__(self, records):
+        self.records = records
+
+    def _upto(self, date):
+        return [r for r in self.records if r["date"] <= date]
+
+    def ask(self, kind, arg):
+        if kind == "signal_on":
+            return self._upto(arg)[-1]["SPXL"]
+        if kind == "switches_year":
+            signal = [r["SPXL"] for r in self.records]
+            dates = [r["date"] for r in self.records]
+            return [dates[i] for i in range(1, len(signal))
+                    if signal[i] != signal[i - 1] and dates[i].startswith(str(arg))]
+        if kind == "performance_1y":
+            rows = self._upto(arg)[-253:]
+            close = np.array([r["close"] for r in rows])
+            return backtest.summary(backtest.run_backtest(close, np.array([r["SPXL"] for r in rows]), "SPXL"))
+        end = str(np.datetime64(arg, "D") + 30)
+        return [r for r in self.records if arg <= r["date"] < end]
+
+
+def _run_readers(fn, queries, readers):
+    """Latencies per query kind and overall throughput for ``readers`` threads sharing ``queries``."""
+    latencies = {kind: [] for kind in KINDS}
+    chunks = [queries[i::readers] for i in range(readers)]
+
+    def reader(chunk):
+        local = []
+        for kind, arg in chunk:
+            start = time.perf_counter()
+            fn(kind, arg)
+            local.append((kind, time.perf_counter() - start))
+        return local
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(readers) as pool:
+        for local in pool.map(reader, chunks):
+            for kind, seconds in local:
+                latencies[kind].append(seconds)
+    elapsed = time.perf_counter() - start
+    report = {"readers": readers, "queries_per_s": len(queries) / elapsed}
+    for kind, values in latencies.items():
+        p50, p99 = np.percentile(values, [50, 99]) * 1e6
+        report[kind] = {"p50_us": round(float(p50), 1), "p99_us": round(float(p99), 1)}
+    return report
+
+
+def _writer(store, records, interval, stop):
+    written = 0
+    for record in records:
+        if stop.wait(interval):
+            break
+        store.extend([record])
+        written += 1
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--rescan-queries", type=int, default=400)
+    parser.add_argument("--write-interval", type=float, default=0.01)
+    parser.add_argument("--json", action="store_true", help="print a machine-readable report")
+    args = parser.parse_args(argv)
+
+    days = args.years * backtest.TRADING_DAYS
+    records = history.demo_records(days + 5000)
+    loaded, pending = records[:days], records[days:]
+    results = {"rows": days, "store": [], "rescan": None}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = history.SignalHistory(Path(tmp) / "history.sqlite3")
+        start = time.perf_counter()
+        store.extend(loaded)
+        results["load_s"] = round(time.perf_counter() - start, 3)
+
+        queries = _queries(loaded, args.queries, seed=1)
+        for readers in args.readers:
+            stop = threading.Event()
+            with ThreadPoolExecutor(1) as pool:
+                writes = pool.submit(_writer, store, pending, args.write_interval, stop)
+                report = _run_readers(lambda kind, arg: _ask(store, kind, arg), queries, readers)
+                stop.set()
+                report["appends"] = writes.result()
+            pending = pending[report["appends"]:]
+            results["store"].append(report)
+
+        rescan = Rescan(loaded)
+        results["rescan"] = _run_readers(rescan.ask, queries[:args.rescan_queries], 1)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{days:,} days loaded in {results['load_s']:.2f} s")
+    header = "".join(f"{kind:>24}" for kind in KINDS)
+    print(f"{'':<22}{'queries/s':>10}{header}   (p50 / p99 us)")
+    for label, r in [(f"store, readers={r['readers']}", r) for r in results["store"]] + [
+            ("rescan, readers=1", results["rescan"])]:
+        cells = "".join(f"{r[kind]['p50_us']:>12,.1f} /{r[kind]['p99_us']:>10,.1f}" for kind in KINDS)
+        appends = f"   {r['appends']} appends" if "appends" in r else ""
+        print(f"{label:<22}{r['queries_per_s']:>10,.0f}{cells}{appends}")
+
+
+if __name__ == "__main__":
+    main()
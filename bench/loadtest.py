@@ -0,0 +1,270 @@
+"""Concurrent Streamlit sessions against one app_live.py server, with a JSON report.
+
+    python -m bench.loadtest --sessions 1 10 25 50 --out report.json
+    python -m bench.loadtest --compare report.json      # exit 1 on regressions
+
+Starts the app headless and, for each concurrency level, opens that many
+simulated browser sessions at once over the websocket protocol: half load
+``?page=landing``, half load ``?page=login`` and fill in the form (type email
+and password, tick "Remember me", press Sign In). All sessions of a level
+stay connected until the last one finishes, so the server holds them all.
+
+Per level the report records time to first render, bytes per session per
+page, client-observed time of every rerun, server CPU utilisation and RSS
+growth per connected session. The saturation point is the first level where
+throughput stops growing (sessions/s up by less than 10%). The simulated
+clients run in this process; their CPU share is reported too, since on a
+machine with few cores they compete with the server. ``--compare`` checks
+page weight and rerun times against an earlier report.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import streamlit
+
+from bench import streamlit_session
+from benchmark3x import auth
+
+ROOT = streamlit_session.ROOT
+EMAIL, PASSWORD = "load@benchmark3x.com", "correct horse"
+LOGIN_STEPS = (
+    ("type email", "Email", EMAIL),
+    ("type password", "Password", PASSWORD),
+    ("tick remember", "Remember me", True),
+    ("sign in", "Sign In", None),
+)
+CPU_BOUND = 0.9  # server CPU share (of one core: scripts share the GIL) that counts as saturated
+MIN_SPEEDUP = 1.1  # throughput gain per level below which the server has stopped scaling
+REPORT_VERSION = 1
+
+
+# --- SERVER SAMPLING ---
+def _server_sample(pid):
+    """(cpu seconds, rss bytes) of the server process."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    with open(f"/proc/{pid}/status") as f:
+        rss = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) * 1024
+    return cpu, rss
+
+
+# --- SESSIONS ---
+async def _visit(port, page, start_delay):
+    await asyncio.sleep(start_delay)
+    started = time.perf_counter()
+    session = streamlit_session.Session(streamlit_session.stream_url(port), f"page={page}")
+    await session.connect()
+    connected = time.perf_counter() - started
+    load = await session.rerun()
+    runs = [("page load", load)]
+    if page == "login":
+        for name, label, value in LOGIN_STEPS:
+            stats = await session.interact(label, value)
+            if stats is not None:
+                runs.append((name, stats))
+    return session, {
+        "page": page,
+        "ttfr": connected + load.get("first_element", load["elapsed"]),
+        "bytes": sum(stats["bytes"] for _, stats in runs),
+        "runs": [(name, stats["elapsed"], stats["bytes"], stats["status"]) for name, stats in runs],
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+async def _level(port, pid, n, login_share, ramp):
+    cpu0, rss0 = _server_sample(pid)
+    client0 = time.process_time()
+    start = time.perf_counter()
+    pages = ["login" if i < round(n * login_share) else "landing" for i in range(n)]
+    results = await asyncio.gather(
+        *(_visit(port, page, ramp * i / n) for i, page in enumerate(pages)), return_exceptions=True
+    )
+    wall = time.perf_counter() - start
+    cpu1, rss1 = _server_sample(pid)
+    client_cpu = time.process_time() - client0
+    sessions = [r for r in results if not isinstance(r, BaseException)]
+    errors = [repr(r) for r in results if isinstance(r, BaseException)]
+    await asyncio.gather(*(session.close() for session, _ in sessions))
+    level = _summarize(n, [v for _, v in sessions], errors, wall, cpu1 - cpu0, rss0, rss1)
+    level["client_cpu_util"] = client_cpu / wall if wall else 0.0
+    return level
+
+
+def _pct(values, q):
+    return float(np.percentile(values, q)) if values else None
+
+
+def _summarize(n, visits, errors, wall, cpu, rss0, rss1):
+    reruns = {}
+    for visit in visits:
+        for name, elapsed, _, status in visit["runs"]:
+            reruns.setdefault(name, []).append(elapsed * 1e3)
+    pages = {}
+    for page in ("landing", "login"):
+        of_page = [v for v in visits if v["page"] == page]
+        if of_page:
+            pages[page] = {
+                "sessions": len(of_page),
+                "bytes_per_session": int(np.mean([v["bytes"] for v in of_page])),
+                "ttfr_ms_p50": _pct([v["ttfr"] * 1e3 for v in of_page], 50),
+                "ttfr_ms_p95": _pct([v["ttfr"] * 1e3 for v in of_page], 95),
+            }
+    return {
+        "sessions": n,
+        "completed": len(visits),
+        "errors": errors[:5],
+        "error_count": len(errors),
+        "wall_s": wall,
+        "sessions_per_s": len(visits) / wall if wall else 0.0,
+        "ttfr_ms_p50": _pct([v["ttfr"] * 1e3 for v in visits], 50),
+        "ttfr_ms_p95": _pct([v["ttfr"] * 1e3 for v in visits], 95),
+        "pages": pages,
+        "reruns": {name: {"count": len(ms), "ms_p50": _pct(ms, 50), "ms_p95": _pct(ms, 95)}
+                   for name, ms in reruns.items()},
+        "server_cpu_s": cpu,
+        "server_cpu_util": cpu / wall if wall else 0.0,
+        "server_cpu_bound": cpu / wall >= CPU_BOUND if wall else False,
+        "server_rss_mb_before": rss0 / 2 ** 20,
+        "server_rss_mb_connected": rss1 / 2 ** 20,
+        "server_rss_kb_per_session": (rss1 - rss0) / 1024 / n,
+    }
+
+
+def saturation(levels):
+    """The first level that no longer raises throughput, and the best throughput before it."""
+    for previous, level in zip(levels, levels[1:]):
+        if level["sessions_per_s"] < previous["sessions_per_s"] * MIN_SPEEDUP:
+            return {
+                "sessions": level["sessions"],
+                "max_sessions_per_s": max(lv["sessions_per_s"] for lv in levels),
+                "server_cpu_bound": level["server_cpu_bound"],
+            }
+    return None
+
+
+# --- COMPARISON ---
+def compare(old, new, bytes_tolerance, time_tolerance):
+    """Regressions of ``new`` against ``old`` (matching levels only), as messages."""
+    problems = []
+    old_levels = {level["sessions"]: level for level in old["levels"]}
+    for level in new["levels"]:
+        before = old_levels.get(level["sessions"])
+        if before is None:
+            continue
+        tag = f"{level['sessions']} sessions"
+        for page, stats in level["pages"].items():
+            then = before["pages"].get(page)
+            if then and stats["bytes_per_session"] > then["bytes_per_session"] * (1 + bytes_tolerance):
+                problems.append(f"{tag}: {page} page weight {then['bytes_per_session']:,} -> "
+                                f"{stats['bytes_per_session']:,} bytes")
+        for name, stats in level["reruns"].items():
+            then = before["reruns"].get(name)
+            if then and stats["ms_p50"] > then["ms_p50"] * (1 + time_tolerance):
+                problems.append(f"{tag}: '{name}' rerun p50 {then['ms_p50']:.1f} -> {stats['ms_p50']:.1f} ms")
+        if level["error_count"] > before["error_count"]:
+            problems.append(f"{tag}: errors {before['error_count']} -> {level['error_count']}")
+    return problems
+
+
+def _print(report):
+    print(f"{'sessions':>8}{'done':>6}{'sess/s':>8}{'TTFR p50':>10}{'p95':>8}{'landing B':>11}{'login B':>10}"
+          f"{'load p50':>10}{'sign-in p50':>13}{'CPU':>6}{'client':>8}{'RSS/sess':>10}")
+    for lv in report["levels"]:
+        pages, reruns = lv["pages"], lv["reruns"]
+        sign_in = reruns.get("sign in", {}).get("ms_p50")
+        print(f"{lv['sessions']:>8}{lv['completed']:>6}{lv['sessions_per_s']:>8.1f}{lv['ttfr_ms_p50']:>8.0f}ms"
+              f"{lv['ttfr_ms_p95']:>6.0f}ms{pages.get('landing', {}).get('bytes_per_session', 0):>11,}"
+              f"{pages.get('login', {}).get('bytes_per_session', 0):>10,}{reruns['page load']['ms_p50']:>8.0f}ms"
+              f"{(f'{sign_in:.0f}ms' if sign_in is not None else '-'):>13}{lv['server_cpu_util']:>6.0%}"
+              f"{lv['client_cpu_util']:>8.0%}"
+              f"{lv['server_rss_kb_per_session']:>8.0f}KB")
+    sat = report["saturation"]
+    if sat:
+        bound = "server CPU-bound" if sat["server_cpu_bound"] else "server not CPU-bound"
+        print(f"saturation: throughput stops growing at {sat['sessions']} sessions "
+              f"(peak {sat['max_sessions_per_s']:.1f} sessions/s, {bound})")
+    else:
+        print("saturation: not reached")
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--login-share", type=float, default=0.5, help="fraction of sessions on the login page")
+    parser.add_argument("--ramp", type=float, default=0.0, help="spread session starts over this many seconds")
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="earlier report to check for regressions")
+    parser.add_argument("--bytes-tolerance", type=float, default=0.05)
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="keep the real login rate limit (all sessions share 127.0.0.1)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {"B3X_AUTH_DB": str(Path(tmp) / "auth.sqlite3"),
+               "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+        if not args.rate_limit:
+            env.update(B3X_LOGIN_RATE="1000000", B3X_LOGIN_BURST="1000000")
+        auth.AuthService(env["B3X_AUTH_DB"]).create_user(EMAIL, PASSWORD)
+
+        port = streamlit_session.free_port()
+        started = time.perf_counter()
+        server = streamlit_session.start_server(ROOT / "app_live.py", port, env)
+        try:
+            startup_s = time.perf_counter() - started
+            asyncio.run(_level(port, server.pid, 2, 0.5, 0.0))  # warm the process-wide caches
+            levels = [asyncio.run(_level(port, server.pid, n, args.login_share, args.ramp))
+                      for n in args.sessions]
+        finally:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "version": REPORT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": {
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "streamlit": streamlit.__version__,
+            "cpus": os.cpu_count(),
+        },
+        "config": {"login_share": args.login_share, "ramp_s": args.ramp, "rate_limit": args.rate_limit},
+        "server_startup_s": startup_s,
+        "levels": levels,
+        "saturation": saturation(levels),
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+        _print(report)
+    else:
+        print(text)
+
+    if args.compare:
+        problems = compare(json.loads(Path(args.compare).read_text()), report,
+                           args.bytes_tolerance, args.time_tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Bytes sent and server time per login-card interaction, over a real websocket session.
+
+    python -m bench.login_form
+    python -m bench.login_form --rev HEAD~1    # same scenario against an older app_live.py
+
+Loads ``?page=login``, then types an email and password, ticks "Remember me"
+and presses Sign In, recording what the browser would receive for each step.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+from bench import streamlit_session
+from benchmark3x import auth
+
+ROOT = streamlit_session.ROOT
+STEPS = (
+    ("type email", "Email", "demo@benchmark3x.com"),
+    ("type password", "Password", "correct horse"),
+    ("tick remember", "Remember me", True),
+    ("press Sign In", "Sign In", None),
+)
+
+
+async def _scenario(port):
+    session = await streamlit_session.Session(streamlit_session.stream_url(port), "page=login").connect()
+    try:
+        rows = [("page load", await session.rerun())]
+        for name, label, value in STEPS:
+            rows.append((name, await session.interact(label, value)))
+        return rows
+    finally:
+        await session.close()
+
+
+def _print(rows):
+    print(f"{'step':<16}{'bytes':>10}{'msgs':>6}{'elements':>10}{'cache refs':>12}{'time':>10}  run")
+    interactions = 0
+    for name, stats in rows:
+        if stats is None:
+            print(f"{name:<16}{0:>10,}{0:>6}{0:>10}{0:>12}{'-':>10}  (no rerun: form field)")
+            continue
+        if name != "page load":
+            interactions += stats["bytes"]
+        print(f"{name:<16}{stats['bytes']:>10,}{stats['messages']:>6}{stats['elements']:>10}"
+              f"{stats['cache_refs']:>12}{stats['elapsed'] * 1e3:>8.1f}ms  {stats['status']}")
+    print(f"bytes for the four interactions: {interactions:,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rev", help="git revision of app_live.py to measure instead of the working tree")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script = ROOT / "app_live.py"
+        if args.rev:
+            script = Path(tmp) / "app_live.py"
+            script.write_bytes(subprocess.check_output(["git", "show", f"{args.rev}:app_live.py"], cwd=ROOT))
+        env = {"B3X_AUTH_DB": str(Path(tmp) / "auth.sqlite3"),
+               "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+        auth.AuthService(env["B3X_AUTH_DB"]).create_user("demo@benchmark3x.com", "correct horse")
+
+        port = streamlit_session.free_port()
+        server = streamlit_session.start_server(script, port, env)
+        try:
+            asyncio.run(_scenario(port))  # warm caches (chart, assets, stats) before measuring
+            _print(asyncio.run(_scenario(port)))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Monte Carlo simulator: paths/sec, peak RSS under memory caps, memoized reruns.
+
+    python -m bench.montecarlo --paths 50000 --years 10 --workers 4
+
+Every run happens in a fresh process so its peak RSS is its own. Results
+must be identical whatever the memory cap or worker count, since paths are
+seeded per block rather than per chunk.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from benchmark3x import artifacts, montecarlo
+
+
+def _peak_rss_mib():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:")) / 1024
+
+
+def _child(queue, params, workers, memory_cap):
+    start = time.perf_counter()
+    result = montecarlo.run(params, workers, memory_cap)
+    queue.put((result, time.perf_counter() - start, _peak_rss_mib()))
+
+
+def _run(params, workers, memory_cap):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(queue, params, workers, memory_cap))
+    proc.start()
+    out = queue.get()
+    proc.join()
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, default=50_000)
+    parser.add_argument("--years", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+    params = dict(montecarlo.DEFAULTS, paths=args.paths, years=args.years)
+    days = int(round(args.years * 252))
+    print(f"{args.paths:,} paths x {days:,} days = {args.paths * days / 1e6:,.0f}M path-days, "
+          f"{len(params['products']) * 2 + 1} scenarios each")
+
+    reference = None
+    for workers, cap_mib in ((1, 2048), (1, 256), (1, 64), (args.workers, 256)):
+        result, elapsed, rss = _run(params, workers, cap_mib * 2 ** 20)
+        scenarios = json.dumps(result["scenarios"], sort_keys=True)
+        reference = reference or scenarios
+        chunk = montecarlo.chunk_blocks(days, workers, cap_mib * 2 ** 20) * montecarlo.BLOCK_PATHS
+        print(f"workers={workers} cap {cap_mib:5,} MiB (chunks of {chunk:,} paths): {elapsed:5.2f} s, "
+              f"{args.paths / elapsed:8,.0f} paths/s, peak RSS {rss:5.0f} MiB (parent); "
+              f"same result: {scenarios == reference}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = artifacts.ArtifactCache(tmp)
+        small = dict(paths=5000, years=args.years)
+        timings = []
+        for label in ("first run", "same inputs (in process)"):
+            start = time.perf_counter()
+            montecarlo.simulate(cache=cache, **small)
+            timings.append((label, time.perf_counter() - start))
+        montecarlo._memo.clear()
+        start = time.perf_counter()
+        montecarlo.simulate(cache=cache, **small)
+        timings.append(("same inputs (new process, disk)", time.perf_counter() - start))
+        print("calculator, 5,000 paths: " + ", ".join(f"{label} {t * 1e3:,.2f} ms" for label, t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Optimizer throughput: evaluations/sec by worker count, and memo-cache reuse."""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmark3x import optimize
+
+
+def _run(prices, param_sets, workers, cache_dir):
+    start = time.perf_counter()
+    results = list(optimize.optimize(prices, param_sets, workers=workers, cache_dir=cache_dir))
+    return results, time.perf_counter() - start
+
+
+def main(n=200_000):
+    rng = np.random.default_rng(0)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0.0, 0.004, n)))
+    param_sets = list(optimize.grid(optimize.PARAM_SPACE))
+    cores = os.cpu_count() or 1
+
+    print(f"{len(param_sets)} evaluations on {n:,} bars, {cores} cores")
+    counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    baseline = None
+    for workers in counts:
+        _, elapsed = _run(prices, param_sets, workers, cache_dir=None)
+        rate = len(param_sets) / elapsed
+        baseline = baseline or rate
+        print(f"workers={workers:<3} {rate:8.1f} evals/s  speedup x{rate / baseline:.2f}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        half = param_sets[: len(param_sets) // 2]
+        _run(prices, half, cores, cache_dir)
+        results, elapsed = _run(prices, param_sets, cores, cache_dir)
+        print(f"overlapping sweep (half memoized): {len(results) / elapsed:8.1f} evals/s")
+        params, stats = optimize.best(results)
+        print(f"best CAGR {stats['cagr']:.1%} with {params}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Regime detection throughput: full fits and incremental daily updates."""
+import time
+
+import numpy as np
+
+from benchmark3x import regime
+
+
+def _prices(n, sigma, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0.0, sigma, n)))
+
+
+def _best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    for label, n, sigma in (("20y daily", 252 * 20, 0.012), ("5M intraday", 5_000_000, 0.001)):
+        prices = _prices(n, sigma)
+        fit = _best_of(lambda: regime.RegimeDetector().fit(prices).runs())
+        print(f"{label:<12} n={n:>9,}  fit+runs {fit * 1e3:8.2f} ms  ({n / fit / 1e6:6.1f} M bars/s)")
+
+    prices = _prices(252 * 20 + 252, 0.012)
+    detector = regime.RegimeDetector().fit(prices[:-252])
+    start = time.perf_counter()
+    for i in range(252 * 20, prices.shape[0]):
+        detector.update(prices[i:i + 1])
+    per_update = (time.perf_counter() - start) / 252
+    print(f"incremental  1 bar/update over 20y history  {per_update * 1e6:8.1f} us/update")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Per-route script time and server memory, each route in a fresh server process.
+
+    python -m bench.routes
+    python -m bench.routes --rev HEAD~1    # same routes against an older app_live.py
+
+For every ``?page=`` route: starts the app, loads only that route (the first,
+cold run builds whatever the route needs), then reruns it ``--reruns`` times
+(warm). Reports both run times and the server's RSS before the first
+session and after the route has loaded. ``--unwarmed`` removes the generated
+artifacts (chart, static assets, stats) before each route, like a fresh
+checkout, and warms the tree again at the end. A cold run is dominated by the
+chart render and varies by a few hundred ms between servers, so compare
+revisions with ``--repeat``: every route is measured that many times,
+interleaved, and the median is reported with the cold-run spread.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from bench import streamlit_session
+from benchmark3x import artifacts, assets, charts, warmup
+
+ROOT = streamlit_session.ROOT
+ROUTES = ("landing", "login", "dashboard")
+
+
+def _remove_artifacts():
+    shutil.rmtree(artifacts.CACHE_DIR, ignore_errors=True)
+    charts.CHART_PATH.unlink(missing_ok=True)
+    charts.STATS_PATH.unlink(missing_ok=True)
+    shutil.rmtree(assets.STATIC_DIR, ignore_errors=True)
+
+
+def _rss_mib(pid):
+    with open(f"/proc/{pid}/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) / 1024
+
+
+async def _route(port, page, reruns):
+    session = await streamlit_session.Session(streamlit_session.stream_url(port), f"page={page}").connect()
+    try:
+        cold = await session.rerun()
+        warm = [(await session.rerun())["elapsed"] for _ in range(reruns)]
+        return cold, warm
+    finally:
+        await session.close()
+
+
+def measure(script, page, reruns, env):
+    port = streamlit_session.free_port()
+    server = streamlit_session.start_server(script, port, env)
+    try:
+        idle = _rss_mib(server.pid)
+        cold, warm = asyncio.run(_route(port, page, reruns))
+        loaded = _rss_mib(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "cold_ms": cold["elapsed"] * 1e3,
+        "warm_ms_p50": float(np.median(warm)) * 1e3,
+        "bytes": cold["bytes"],
+        "rss_idle_mib": idle,
+        "rss_loaded_mib": loaded,
+        "rss_route_mib": loaded - idle,
+    }
+
+
+def _median(samples):
+    """Per-field medians over repeated measurements, plus the cold-run range."""
+    out = {key: float(np.median([s[key] for s in samples])) for key in samples[0]}
+    cold = [s["cold_ms"] for s in samples]
+    out.update(cold_ms_min=min(cold), cold_ms_max=max(cold), repeat=len(samples))
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rev", help="git revision of app_live.py to measure instead of the working tree")
+    parser.add_argument("--routes", nargs="+", default=list(ROUTES))
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=1, help="fresh servers per route; medians are reported")
+    parser.add_argument("--unwarmed", action="store_true", help="start every route without generated artifacts")
+    parser.add_argument("--json", action="store_true", help="print a machine-readable report")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script = ROOT / "app_live.py"
+        if args.rev:
+            script = Path(tmp) / "app_live.py"
+            script.write_bytes(subprocess.check_output(["git", "show", f"{args.rev}:app_live.py"], cwd=ROOT))
+        env = {"B3X_AUTH_DB": str(Path(tmp) / "auth.sqlite3"), "B3X_METRICS_PORT": "0",
+               "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+        runs = {page: [] for page in args.routes}
+        try:
+            for _ in range(args.repeat):
+                for page in args.routes:
+                    if args.unwarmed:
+                        _remove_artifacts()
+                    runs[page].append(measure(script, page, args.reruns, env))
+        finally:
+            if args.unwarmed:
+                warmup.run()
+    results = {page: _median(samples) for page, samples in runs.items()}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    if args.repeat > 1:
+        print(f"medians of {args.repeat} servers per route; cold range in brackets")
+    print(f"{'route':<12}{'cold':>10}{'warm p50':>10}{'bytes':>9}{'RSS idle':>10}{'loaded':>9}{'route':>9}")
+    for page, r in results.items():
+        spread = f"  [{r['cold_ms_min']:.0f}-{r['cold_ms_max']:.0f} ms]" if args.repeat > 1 else ""
+        print(f"{page:<12}{r['cold_ms']:>8.1f}ms{r['warm_ms_p50']:>8.1f}ms{r['bytes']:>9,.0f}"
+              f"{r['rss_idle_mib']:>8.1f}MB{r['rss_loaded_mib']:>7.1f}MB{r['rss_route_mib']:>+7.1f}MB{spread}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Local load test for the signal API: keep-alive GETs, p50/p99 latency and req/s.
+
+    python -m bench.signal_api --connections 64 --processes 4 --duration 10
+
+Starts the API in a subprocess unless --url points at a running one.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+async def _connection(host, port, path, deadline, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter_ns()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line[:15].lower() == b"content-length:":
+                    length = int(line[15:])
+            if length:
+                await reader.readexactly(length)
+            latencies.append(time.perf_counter_ns() - start)
+    finally:
+        writer.close()
+
+
+def _client_process(host, port, path, connections, duration, queue):
+    latencies = []
+
+    async def run():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(_connection(host, port, path, deadline, latencies) for _ in range(connections)))
+
+    asyncio.run(run())
+    queue.put(np.array(latencies, dtype=np.int64))
+
+
+def _wait_until_up(host, port, timeout=10.0):
+    import socket
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), 0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("signal API did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="existing server, e.g. http://127.0.0.1:8503")
+    parser.add_argument("--path", default="/v1/signal")
+    parser.add_argument("--connections", type=int, default=64, help="per client process")
+    parser.add_argument("--processes", type=int, default=max(1, (multiprocessing.cpu_count() or 2) - 1))
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port
+    else:
+        host, port = "127.0.0.1", 8593
+        server = subprocess.Popen([sys.executable, "-m", "benchmark3x.signal_api", "--port", str(port)],
+                                  stdout=subprocess.DEVNULL)
+    try:
+        _wait_until_up(host, port)
+        queue = multiprocessing.Queue()
+        clients = [
+            multiprocessing.Process(
+                target=_client_process, args=(host, port, args.path, args.connections, args.duration, queue)
+            )
+            for _ in range(args.processes)
+        ]
+        for client in clients:
+            client.start()
+        latencies = np.concatenate([queue.get() for _ in clients])
+        for client in clients:
+            client.join()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9]) / 1e3
+    print(
+        f"{latencies.shape[0]:,} requests over {args.processes}x{args.connections} connections: "
+        f"{latencies.shape[0] / args.duration:,.0f} req/s  "
+        f"p50 {p50:.0f} us  p99 {p99:.0f} us  p99.9 {p999:.0f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Cold-start cost of the Streamlit app: import time, first byte and RSS.
+
+    python -m bench.startup
+
+Runs each scenario in a fresh server process: "cold" with every generated
+artifact removed (what a new container saw before the warm-up step), then
+"warm" after ``python -m benchmark3x.warmup``. Leaves the tree warmed.
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import subprocess
+import sys
+import time
+
+from bench import streamlit_session
+from benchmark3x import artifacts, assets, charts, warmup
+
+ROOT = streamlit_session.ROOT
+HEAVY = ("numpy", "matplotlib", "PIL")
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import streamlit
+after_streamlit = time.perf_counter()
+from benchmark3x import assets, auth, charts, images, templates
+done = time.perf_counter()
+print(json.dumps({
+    "streamlit": after_streamlit - start,
+    "app_modules": done - after_streamlit,
+    "heavy": [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+def _remove_artifacts():
+    shutil.rmtree(artifacts.CACHE_DIR, ignore_errors=True)
+    charts.CHART_PATH.unlink(missing_ok=True)
+    charts.STATS_PATH.unlink(missing_ok=True)
+    shutil.rmtree(assets.STATIC_DIR, ignore_errors=True)
+
+
+def _rss_kib(pid):
+    fields = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            fields[key] = value.split()[0] if value.split() else ""
+    return int(fields["VmRSS"]), int(fields["VmHWM"])
+
+
+async def _first_page(port, page):
+    session = await streamlit_session.Session(streamlit_session.stream_url(port), page).connect()
+    try:
+        return await session.rerun()
+    finally:
+        await session.close()
+
+
+def _measure(page):
+    probe = subprocess.run([sys.executable, "-c", IMPORT_PROBE % (HEAVY,)], cwd=ROOT,
+                           capture_output=True, text=True, check=True)
+    imports = json.loads(probe.stdout)
+
+    port = streamlit_session.free_port()
+    launched = time.perf_counter()
+    server = streamlit_session.start_server(ROOT / "app_live.py", port, {"PYTHONPATH": str(ROOT)})
+    listening = time.perf_counter() - launched
+    try:
+        first = asyncio.run(_first_page(port, page))
+        rss, peak = _rss_kib(server.pid)
+        second = asyncio.run(_first_page(port, page))
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "import_streamlit_ms": imports["streamlit"] * 1e3,
+        "import_app_modules_ms": imports["app_modules"] * 1e3,
+        "heavy_modules_at_import": imports["heavy"],
+        "listening_ms": listening * 1e3,
+        "first_byte_ms": first["first_byte"] * 1e3,
+        "first_run_ms": first["elapsed"] * 1e3,
+        "second_run_ms": second["elapsed"] * 1e3,
+        "rss_mib": rss / 1024,
+        "peak_rss_mib": peak / 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page", default="", help='query string, e.g. "page=login"')
+    parser.add_argument("--json", action="store_true", help="print a machine-readable report")
+    args = parser.parse_args(argv)
+
+    _remove_artifacts()
+    cold = _measure(args.page)
+    warmup_ms = sum(warmup.run().values()) * 1e3
+    warm = _measure(args.page)
+
+    if args.json:
+        print(json.dumps({"cold": cold, "warm": warm, "warmup_ms": warmup_ms}, indent=2))
+        return
+    print(f"warm-up command: {warmup_ms:.0f} ms (run once per deploy)")
+    print(f"{'':<26}{'cold':>12}{'warm':>12}")
+    for key in cold:
+        a, b = cold[key], warm[key]
+        if isinstance(a, list):
+            print(f"{key:<26}{','.join(a) or '-':>12}{','.join(b) or '-':>12}")
+        else:
+            print(f"{key:<26}{a:>12.1f}{b:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Minimal Streamlit browser stand-in: drives a session over the websocket protocol.
+
+Speaks just enough of ``/_stcore/stream`` for benchmarks: sends rerun
+requests the way the frontend does (all widget states, fragment id, cached
+message hashes) and records what the server sends back until the run ends.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = Path(__file__).resolve().parent.parent
+WIDGET_TYPES = ("text_input", "checkbox", "button")
+
+
+class Widget:
+    __slots__ = ("id", "type", "label", "form_id", "fragment_id", "is_form_submitter")
+
+    def __init__(self, proto, kind, fragment_id):
+        self.id = proto.id
+        self.type = kind
+        self.label = proto.label
+        self.form_id = proto.form_id
+        self.fragment_id = fragment_id
+        self.is_form_submitter = kind == "button" and proto.is_form_submitter
+
+
+class Session:
+    """One browser tab. ``await rerun(...)`` returns a stats dict for that run."""
+
+    def __init__(self, url, page=""):
+        self.url = url
+        self.query_string = page
+        self.widgets = {}
+        self.values = {}
+        self.cached_hashes = set()
+        self._ws = None
+
+    async def connect(self):
+        self._ws = await websockets.connect(
+            self.url, subprotocols=["streamlit"], max_size=None, compression=None
+        )
+        return self
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+
+    async def rerun(self, triggers=(), fragment_id=""):
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.query_string = self.query_string
+        state.fragment_id = fragment_id
+        state.cached_message_hashes.extend(sorted(self.cached_hashes))
+        for widget_id, value in self.values.items():
+            _set_value(state.widget_states.widgets.add(), widget_id, value)
+        for widget_id in triggers:
+            widget = state.widget_states.widgets.add()
+            widget.id = widget_id
+            widget.trigger_value = True
+        start = time.perf_counter()
+        await self._ws.send(msg.SerializeToString())
+        return await self._receive(start)
+
+    async def _receive(self, start):
+        stats = {"bytes": 0, "messages": 0, "elements": 0, "cache_refs": 0}
+        while True:
+            data = await self._ws.recv()
+            stats.setdefault("first_byte", time.perf_counter() - start)
+            stats["bytes"] += len(data)
+            stats["messages"] += 1
+            fmsg = ForwardMsg()
+            fmsg.ParseFromString(data)
+            kind = fmsg.WhichOneof("type")
+            if fmsg.metadata.cacheable:
+                self.cached_hashes.add(fmsg.hash)
+            if kind == "ref_hash":
+                stats["cache_refs"] += 1
+            if kind in ("ref_hash", "delta"):
+                stats.setdefault("first_element", time.perf_counter() - start)
+            if kind == "delta" and fmsg.delta.WhichOneof("type") == "new_element":
+                stats["elements"] += 1
+                self._record_widget(fmsg.delta)
+            elif kind == "script_finished":
+                stats["elapsed"] = time.perf_counter() - start
+                stats["status"] = ForwardMsg.ScriptFinishedStatus.Name(fmsg.script_finished)
+                return stats
+
+    def _record_widget(self, delta):
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        if kind in WIDGET_TYPES:
+            widget = Widget(getattr(element, kind), kind, delta.fragment_id)
+            self.widgets[widget.label] = widget
+
+    async def interact(self, label, value=None):
+        """Change a widget like a user would; returns run stats, or None if the browser sends nothing.
+
+        Widgets inside a form only update client-side state until the form's
+        submit button is pressed; widgets inside a fragment rerun just that
+        fragment.
+        """
+        widget = self.widgets[label]
+        if widget.type == "button":
+            return await self.rerun(triggers=[widget.id], fragment_id=widget.fragment_id)
+        self.values[widget.id] = value
+        if widget.form_id:
+            return None
+        return await self.rerun(fragment_id=widget.fragment_id)
+
+
+def _set_value(widget, widget_id, value):
+    widget.id = widget_id
+    if isinstance(value, bool):
+        widget.bool_value = value
+    else:
+        widget.string_value = value
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(script, port, env=None):
+    """Start ``streamlit run script`` headless; returns the Popen once it accepts connections."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(script), "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=dict(os.environ, **(env or {})),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), 0.2).close()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("streamlit exited during startup")
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("streamlit did not start")
+
+
+def stream_url(port):
+    return f"ws://127.0.0.1:{port}/_stcore/stream"
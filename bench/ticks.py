@@ -0,0 +1,143 @@
+"""Tick ingestion: ticks/sec, peak RSS against input size, and crash/resume.
+
+    python -m bench.ticks --days 20 --ticks-per-day 2000000 --workers 4
+
+Writes synthetic per-day tick files (CSV and binary), ingests them into
+1-minute bars and checks the bars against a single in-memory aggregation.
+Each ingest runs in a fresh process so its peak RSS is its own; with
+streaming, peak RSS stays flat as the per-file tick count grows.
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmark3x import features, ticks
+
+DAY_NS = 86400 * 10 ** 9
+SESSION_START_NS = (13 * 60 + 30) * 60 * 10 ** 9  # 09:30 New York, in UTC
+SESSION_NS = 390 * 60 * 10 ** 9
+
+
+def _write_day(path, day, n, seed, price):
+    rng = np.random.default_rng(seed)
+    out = np.empty(n, dtype=ticks.TICK_DTYPE)
+    start = np.datetime64("2020-01-02", "D").astype(np.int64) + day
+    out["ts"] = start * DAY_NS + SESSION_START_NS + np.sort(rng.integers(0, SESSION_NS, n))
+    out["price"] = price * np.exp(np.cumsum(rng.normal(0, 2e-5, n)))
+    out["size"] = rng.integers(1, 500, n)
+    if path.suffix == ".csv":
+        with open(path, "w") as f:
+            f.write("ts_ns,price,size\n")
+            np.savetxt(f, np.column_stack((out["ts"], out["price"], out["size"])), fmt="%d,%.4f,%d")
+    else:
+        out.tofile(path)
+    return float(out["price"][-1])
+
+
+def _write_days(root, days, n, suffix):
+    root.mkdir(parents=True, exist_ok=True)
+    price = 300.0
+    paths = []
+    for day in range(days):
+        path = root / f"{day:04d}{suffix}"
+        price = _write_day(path, day, n, seed=day, price=price)
+        paths.append(path)
+    return paths
+
+
+def _child(queue, paths, out, bar, workers, chunk_rows):
+    queue.put(ticks.ingest(paths, out, bar, workers, chunk_rows))
+
+
+def _ingest(paths, out, bar="1min", workers=1, chunk_rows=ticks.CHUNK_ROWS):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(queue, paths, out, bar, workers, chunk_rows))
+    proc.start()
+    report = queue.get()
+    proc.join()
+    return report
+
+
+def _expected(paths, bar_ns):
+    """Every file aggregated in one piece, no chunking."""
+    parts = []
+    for path in paths:
+        aggregator = ticks.BarAggregator(bar_ns)
+        data = np.concatenate(list(ticks.read_chunks(path, 10 ** 8)))
+        parts += [aggregator.push(data), aggregator.flush()]
+    return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+
+def _matches(out, expected):
+    store = features.FeatureStore(out)
+    cols = store.read()
+    if len(store) != expected["bar"].shape[0]:
+        return False
+    return all(np.allclose(cols[name], expected[name], rtol=1e-12, atol=0) for name in ticks.BAR_COLUMNS)
+
+
+def _crash_resume(paths, root, chunk_rows):
+    """Kill an ingest midway, resume it, and compare with the clean run."""
+    out = root / "crash"
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(queue, paths, out, "1min", 1, chunk_rows))
+    proc.start()
+    checkpoint = out / ticks.CHECKPOINT_NAME
+    while proc.is_alive() and (not checkpoint.exists() or checkpoint.read_text().count("\n") < len(paths) // 2):
+        time.sleep(0.005)
+    if proc.is_alive():
+        os.kill(proc.pid, signal.SIGKILL)
+    proc.join()
+    stored = len(features.FeatureStore(out))
+    report = _ingest(paths, out, chunk_rows=chunk_rows)
+    return stored, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=20)
+    parser.add_argument("--ticks-per-day", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-rows", type=int, default=ticks.CHUNK_ROWS)
+    args = parser.parse_args(argv)
+    bar_ns = ticks.BARS["1min"][0]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        total = args.days * args.ticks_per_day
+        for suffix in (".bin", ".csv"):
+            paths = _write_days(root / f"in{suffix}", args.days, args.ticks_per_day, suffix)
+            size = sum(p.stat().st_size for p in paths)
+            expected = _expected(paths, bar_ns)
+            for workers in sorted({1, args.workers}):
+                out = root / f"bars{suffix}.{workers}"
+                report = _ingest(paths, out, workers=workers, chunk_rows=args.chunk_rows)
+                print(f"{suffix[1:]:<3} {total:,} ticks ({size / 2**20:,.0f} MiB), {workers} worker(s): "
+                      f"{report['ticks_per_sec']:,.0f} ticks/s, {report['bars']:,} bars, "
+                      f"peak RSS {report['peak_rss_mib']:.0f} MiB (workers {report['peak_worker_rss_mib']:.0f} MiB); "
+                      f"bars match: {_matches(out, expected)}")
+
+        # Peak RSS as one file grows: the chunk bounds it, not the file.
+        for n in (args.ticks_per_day // 4, args.ticks_per_day, args.ticks_per_day * 4):
+            paths = _write_days(root / f"size{n}", 1, n, ".bin")
+            report = _ingest(paths, root / f"size{n}.bars", chunk_rows=args.chunk_rows)
+            print(f"one file of {n:>11,} ticks ({paths[0].stat().st_size / 2**20:6,.0f} MiB): "
+                  f"peak RSS {report['peak_rss_mib']:.0f} MiB")
+
+        paths = sorted((root / "in.bin").iterdir())
+        # Small chunks so the kill usually lands between two appends of one file.
+        stored, report = _crash_resume(paths, root, max(1, args.chunk_rows // 20))
+        print(f"crash/resume: killed with {stored:,} bars stored; resume skipped {report['skipped_files']} files, "
+              f"added {report['bars']:,} bars; bars match: {_matches(root / 'crash', _expected(paths, bar_ns))}")
+
+
+if __name__ == "__main__":
+    main()
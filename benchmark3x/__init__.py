@@ -0,0 +1 @@
+"""Support modules for the Benchmark3x app (asset serving, engines, services)."""
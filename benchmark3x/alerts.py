@@ -0,0 +1,377 @@
+"""Pre-market alert fan-out over SMTP.
+
+The alert is rendered once per signal into wire-ready bytes, then fanned out
+by a fixed pool of asyncio workers. Each worker keeps one SMTP connection open
+and sends batches of up to ``batch_size`` envelope recipients per transaction
+(pipelined when the server supports it). Failed batches are retried with
+exponential backoff, and every finished batch is appended to a checkpoint file
+so a crashed run resumes where it stopped instead of alerting subscribers
+twice:
+
+    data = render_alert({"date": "2025-06-02", "SPXL": 1, "SSO": 1})
+    report = asyncio.run(dispatch("2025-06-02", recipients, data))
+
+Email-to-SMS gateway addresses go through the same path.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import ssl
+import threading
+import time
+from email.message import EmailMessage
+from email.policy import SMTP as SMTP_POLICY
+from email.utils import formatdate, make_msgid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CHECKPOINT_DIR = ROOT / ".cache" / "alerts"
+SMTP_HOST = os.environ.get("B3X_SMTP_HOST", "127.0.0.1")
+SMTP_PORT = int(os.environ.get("B3X_SMTP_PORT", "25"))
+SMTP_USER = os.environ.get("B3X_SMTP_USER")
+SMTP_PASSWORD = os.environ.get("B3X_SMTP_PASSWORD")
+SENDER = os.environ.get("B3X_ALERT_SENDER", "alerts@benchmark3x.com")
+
+BATCH_SIZE = 100  # RFC 5321 requires servers to accept at least 100 recipients
+WORKERS = 16
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 0.5
+TRANSACTIONS_PER_CONNECTION = 500
+# Per connect and per reply: a stalled server must not hold a worker past the send window.
+SMTP_TIMEOUT = float(os.environ.get("B3X_SMTP_TIMEOUT", 30))
+
+
+class SMTPError(Exception):
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+    @property
+    def transient(self):
+        return 400 <= self.code < 500
+
+
+# --- MESSAGE ---
+def render_alert(signal, sender=SENDER):
+    """Render the alert once into dot-stuffed, CRLF-terminated DATA bytes."""
+    position = "LONG" if signal.get("SPXL") else "CASH"
+    msg = EmailMessage()
+    msg["From"] = f"Benchmark3x Alerts <{sender}>"
+    msg["To"] = "undisclosed-recipients:;"
+    msg["Subject"] = f"Benchmark3x signal for {signal['date']}: {position}"
+    msg["Date"] = formatdate(localtime=False, usegmt=True)
+    msg["Message-ID"] = make_msgid(domain=sender.partition("@")[2] or None)
+    msg.set_content(
+        f"Pre-market signal for {signal['date']}\n\n"
+        f"SPXL (3x): {signal.get('SPXL', 0)}\n"
+        f"SSO (2x):  {signal.get('SSO', 0)}\n\n"
+        "1 = Long, 0 = Cash. Place a Market On Open order in your brokerage account.\n"
+        "This is not financial advice.\n"
+    )
+    data = msg.as_bytes(policy=SMTP_POLICY)
+    # Dot-stuff lines that start with "." (RFC 5321 section 4.5.2).
+    data = data.replace(b"\r\n.", b"\r\n..")
+    if data.startswith(b"."):
+        data = b"." + data
+    if not data.endswith(b"\r\n"):
+        data += b"\r\n"
+    return data
+
+
+# --- SMTP CLIENT ---
+class SMTPConnection:
+    """Just enough async SMTP for bulk sending: EHLO, STARTTLS, AUTH PLAIN, PIPELINING."""
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, username=SMTP_USER, password=SMTP_PASSWORD,
+                 starttls=False, local_hostname="benchmark3x", timeout=SMTP_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.local_hostname = local_hostname
+        self.timeout = timeout
+        self.extensions = set()
+        self.transactions = 0
+        self._reader = None
+        self._writer = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        try:
+            await self._expect(220)
+            await self._ehlo()
+            if self.starttls:
+                await self._command(b"STARTTLS", 220)
+                await asyncio.wait_for(
+                    self._writer.start_tls(ssl.create_default_context(), server_hostname=self.host), self.timeout
+                )
+                await self._ehlo()
+            if self.username:
+                token = base64.b64encode(f"\0{self.username}\0{self.password}".encode()).decode()
+                await self._command(f"AUTH PLAIN {token}".encode(), 235)
+        except BaseException:
+            self._writer.close()  # the caller never gets this connection, so nobody else would
+            self._writer = None
+            raise
+        return self
+
+    async def _ehlo(self):
+        _, lines = await self._command(f"EHLO {self.local_hostname}".encode(), 250)
+        self.extensions = {line.split(" ", 1)[0].upper() for line in lines[1:]}
+
+    async def _reply(self):
+        lines = []
+        while True:
+            try:
+                raw = await asyncio.wait_for(self._reader.readline(), self.timeout)
+            except (ValueError, asyncio.LimitOverrunError) as exc:
+                # An over-long reply line: the stream is out of sync, treat it as a dead connection.
+                raise ConnectionError(f"bad SMTP reply: {exc}") from None
+            line = raw.decode("latin-1").rstrip("\r\n")
+            if len(line) < 3:
+                raise ConnectionError("SMTP connection closed")
+            lines.append(line[4:])
+            if line[3:4] != "-":
+                return int(line[:3]), lines
+
+    async def _expect(self, *codes):
+        code, lines = await self._reply()
+        if code not in codes:
+            raise SMTPError(code, " ".join(lines))
+        return code, lines
+
+    async def _command(self, line, *codes):
+        self._writer.write(line + b"\r\n")
+        return await self._expect(*codes)
+
+    async def send(self, sender, recipients, data):
+        """One transaction to many recipients; returns ``{recipient: code}`` for rejected ones."""
+        invalid = [r for r in recipients if not valid_address(r)]
+        if invalid or not valid_address(sender):
+            raise ValueError(f"refusing to send to invalid addresses: {invalid or [sender]}")
+        envelope = [f"MAIL FROM:<{sender}>".encode()] + [f"RCPT TO:<{r}>".encode() for r in recipients]
+        rejected = {}
+        if "PIPELINING" in self.extensions:
+            # Send the whole envelope in one write and read the replies in order.
+            self._writer.write(b"\r\n".join(envelope) + b"\r\nDATA\r\n")
+            replies = [await self._reply() for _ in range(len(envelope) + 1)]
+        else:
+            replies = []
+            for line in envelope:
+                self._writer.write(line + b"\r\n")
+                replies.append(await self._reply())
+            replies.append(None)
+
+        mail_code, mail_lines = replies[0]
+        if mail_code != 250:
+            await self._abort(replies[-1])
+            raise SMTPError(mail_code, " ".join(mail_lines))
+        for recipient, (code, _) in zip(recipients, replies[1:-1]):
+            if code not in (250, 251):
+                rejected[recipient] = code
+        if len(rejected) == len(recipients):
+            await self._abort(replies[-1])
+            return rejected
+
+        if replies[-1] is None:
+            self._writer.write(b"DATA\r\n")
+            replies[-1] = await self._reply()
+        code, lines = replies[-1]
+        if code != 354:
+            raise SMTPError(code, " ".join(lines))
+        self._writer.write(data + b".\r\n")
+        await self._expect(250)
+        self.transactions += 1
+        return rejected
+
+    async def _abort(self, data_reply):
+        # A pipelined DATA may have been accepted even though every RCPT failed.
+        if data_reply is not None and data_reply[0] == 354:
+            self._writer.write(b".\r\n")
+            await self._reply()
+        await self._command(b"RSET", 250)
+
+    async def close(self):
+        if self._writer is None:
+            return
+        try:
+            await asyncio.wait_for(self._command(b"QUIT", 221), 5)
+        except (OSError, SMTPError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass
+        self._writer.close()
+        self._writer = None
+
+
+def valid_address(address):
+    """A plain ``local@domain`` that cannot break out of ``RCPT TO:<...>`` (no controls, spaces or brackets)."""
+    return (
+        isinstance(address, str) and "@" in address and address.isascii()
+        and not any(c in address for c in "<> \t") and address.isprintable()
+    )
+
+
+# --- CHECKPOINT ---
+class Checkpoint:
+    """Append-only record of finished batches for one alert run.
+
+    Each line holds a hash of the batch's recipients and a short digest of
+    every recipient it reached, not just the batch position. A resume skips
+    batches whose hash matches and drops recipients already reached, so a
+    recipient list that changed in between neither skips nor repeats anyone.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = None
+        self._lock = threading.Lock()  # marks arrive from executor threads
+
+    def load(self):
+        done = {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crash
+                    if "hash" in entry:  # older checkpoints were keyed by position only
+                        done[entry["hash"]] = entry
+        except FileNotFoundError:
+            pass
+        return done
+
+    def mark(self, batch, batch_hash, delivered, failed):
+        """Append and fsync one batch's entry; blocking, so async callers run it in a thread."""
+        entry = {"batch": batch, "hash": batch_hash, "sent": len(delivered),
+                 "delivered": [recipient_digest(r) for r in delivered], "failed": failed}
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def batch_hash(recipients):
+    return hashlib.sha256("\n".join(recipients).encode()).hexdigest()
+
+
+def recipient_digest(recipient):
+    return hashlib.sha256(recipient.encode()).hexdigest()[:16]
+
+
+# --- DISPATCH ---
+def _backoff(attempt):
+    return BACKOFF_BASE * (2 ** attempt) * (0.5 + random.random())
+
+
+async def _send_batch(get_connection, drop_connection, sender, recipients, data):
+    """Send one batch with retries; returns (sent, failed) recipient counts/lists."""
+    remaining = list(recipients)
+    failed = []
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            connection = await get_connection()
+            rejected = await connection.send(sender, remaining, data)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, SMTPError) as exc:
+            await drop_connection()
+            if isinstance(exc, SMTPError) and not exc.transient:
+                failed.extend(remaining)
+                remaining = []
+                break
+            await asyncio.sleep(_backoff(attempt))
+            continue
+        failed.extend(r for r, code in rejected.items() if code >= 500)
+        remaining = [r for r, code in rejected.items() if code < 500]
+        if not remaining:
+            break
+        await asyncio.sleep(_backoff(attempt))
+    failed.extend(remaining)
+    return len(recipients) - len(failed), failed
+
+
+async def dispatch(run_id, recipients, data, sender=SENDER, workers=WORKERS, batch_size=BATCH_SIZE,
+                   checkpoint_dir=CHECKPOINT_DIR, connect=None):
+    """Deliver ``data`` to every recipient; resumable by ``run_id`` (e.g. the signal date).
+
+    ``connect`` is an async factory returning a connected SMTPConnection; by
+    default it uses the B3X_SMTP_* settings. Returns a report dict; addresses
+    that could inject SMTP commands are never sent and are listed as failed.
+    """
+    connect = connect or (lambda: SMTPConnection().connect())
+    total = len(recipients)
+    invalid = [r for r in recipients if not valid_address(r)]
+    if invalid:
+        recipients = [r for r in recipients if valid_address(r)]
+    checkpoint = Checkpoint(Path(checkpoint_dir) / f"{run_id}.jsonl")
+    done = checkpoint.load()
+    if done:
+        reached = {d for entry in done.values() for d in entry.get("delivered", ())}
+        recipients = [r for r in recipients if recipient_digest(r) not in reached]
+    batches = [recipients[i:i + batch_size] for i in range(0, len(recipients), batch_size)]
+    queue = asyncio.Queue()
+    for index, batch in enumerate(batches):
+        key = batch_hash(batch)
+        if key not in done:
+            queue.put_nowait((index, key, batch))
+    totals = {"sent": 0, "failed": list(invalid)}
+
+    async def worker():
+        connection = None
+
+        async def get_connection():
+            nonlocal connection
+            if connection is not None and connection.transactions >= TRANSACTIONS_PER_CONNECTION:
+                await drop_connection()
+            if connection is None:
+                connection = await connect()
+            return connection
+
+        async def drop_connection():
+            nonlocal connection
+            if connection is not None:
+                await connection.close()
+                connection = None
+
+        try:
+            while True:
+                try:
+                    index, key, batch = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                sent, failed = await _send_batch(get_connection, drop_connection, sender, batch, data)
+                missed = set(failed)
+                # The fsync runs off the event loop, so other workers keep sending meanwhile.
+                await asyncio.to_thread(checkpoint.mark, index, key, [r for r in batch if r not in missed], failed)
+                totals["sent"] += sent
+                totals["failed"].extend(failed)
+        finally:
+            await drop_connection()
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(workers, max(queue.qsize(), 1)))))
+    finally:
+        checkpoint.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "recipients": total,
+        "sent": totals["sent"],
+        "failed": totals["failed"],
+        "resumed_batches": len(done),
+        "elapsed": elapsed,
+        "messages_per_sec": totals["sent"] / elapsed if elapsed > 0 else 0.0,
+    }
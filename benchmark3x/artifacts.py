@@ -0,0 +1,181 @@
+"""Content-addressed artifact cache shared by every process on the host.
+
+Artifacts (rendered charts, encoded images) are stored under a key derived
+from the generator's parameters and a code version, so a change to either
+produces a new entry instead of overwriting one a reader may be using:
+
+    path = ArtifactCache().get_or_build("regime_chart", params, render, ".jpg", version)
+
+Writes go to a unique temp file and are renamed into place, so readers never
+see a partial file. A per-key ``fcntl`` lock makes one process build while the
+others block, then find the finished file. Entries are evicted least recently
+used first once the cache exceeds ``max_bytes``; a hit refreshes the entry's
+mtime, which is what eviction orders by.
+"""
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = Path(os.environ.get("B3X_ARTIFACT_DIR", ROOT / ".cache" / "artifacts"))
+MAX_BYTES = int(os.environ.get("B3X_ARTIFACT_MAX_BYTES", 256 * 1024 * 1024))
+LOCK_SUFFIX = ".lock"
+
+
+@contextlib.contextmanager
+def file_lock(path, shared=False):
+    """Hold an ``flock`` on ``path`` (created if needed). Not reentrant: don't nest on one path."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def temp_path(path):
+    # Unique per process and thread, so concurrent writers never share a temp file.
+    path = Path(path)
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def atomic_write(path, data):
+    tmp = temp_path(path)
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def publish(src, dest):
+    """Atomically make ``dest`` a copy of ``src`` (a hard link when possible)."""
+    tmp = temp_path(dest)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        atomic_write(tmp, Path(src).read_bytes())
+    os.replace(tmp, dest)
+
+
+def source_version(*paths):
+    """Code version from the source files that generate an artifact."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def artifact_key(name, params, version):
+    raw = json.dumps([name, params, version], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ArtifactCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0  # hits that blocked while another process built the entry
+
+    def path_for(self, key, suffix=""):
+        return self.root / key[:2] / (key + suffix)
+
+    def get_or_build(self, name, params, build, suffix="", version="", rebuild=False):
+        """Return the path of the artifact, calling ``build(tmp_path)`` on a miss.
+
+        ``build`` must write the artifact to the path it is given.
+        """
+        key = artifact_key(name, params, version)
+        path = self.path_for(key, suffix)
+        if not rebuild and self._touch(path):
+            self.hits += 1
+            return path
+
+        with file_lock(path.with_name(key + LOCK_SUFFIX)):
+            if not rebuild and self._touch(path):
+                self.hits += 1
+                self.waits += 1
+                return path
+            tmp = temp_path(path)
+            try:
+                build(tmp)
+                os.replace(tmp, path)
+            finally:
+                Path(tmp).unlink(missing_ok=True)
+        self.misses += 1
+        self.evict(keep=path)
+        return path
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def entries(self):
+        """``(mtime, size, path)`` for every cached artifact, oldest first."""
+        found = []
+        if not self.root.exists():
+            return found
+        for bucket in self.root.iterdir():
+            if not bucket.is_dir():
+                continue
+            for path in bucket.iterdir():
+                if path.name.endswith((LOCK_SUFFIX, ".tmp")):
+                    continue
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                found.append((st.st_mtime, st.st_size, path))
+        found.sort()
+        return found
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits in ``max_bytes``."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            # Lock files stay: another process may be waiting on one.
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        entries = self.entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "waits": self.waits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+_default = None
+
+
+def default_cache():
+    """The process-wide cache, so hit/miss counters accumulate across callers."""
+    global _default
+    if _default is None:
+        _default = ArtifactCache()
+    return _default
@@ -0,0 +1,224 @@
+"""Content-hashed static assets.
+
+Images are copied to ``static/`` under fingerprinted names such as
+``logo_R1.3f9a0c2b71de.jpg`` and referenced by URL instead of being inlined as
+base64 data URIs. A fingerprinted file never changes, so browsers may cache it
+forever and reruns only resend the (short) URL.
+
+By default URLs point at Streamlit's own static route (``app/static/...``,
+enabled in ``.streamlit/config.toml``), which already answers with ETags and
+304s. Set ``B3X_ASSET_BASE_URL`` to use the dedicated asset server instead,
+which adds ``Cache-Control: immutable``:
+
+    python -m benchmark3x.assets build
+    python -m benchmark3x.assets serve --port 8502
+
+A rebuild does not delete the fingerprints it replaces: pages rendered before
+it (open tabs, the static site's index.html) still reference them. They are
+recorded as superseded, stay servable, and are removed by an explicit
+
+    python -m benchmark3x.assets gc
+
+once they are older than ``SUPERSEDED_GRACE``.
+"""
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import time
+from pathlib import Path
+
+from benchmark3x import artifacts
+
+ROOT = Path(__file__).resolve().parent.parent
+STATIC_DIR = ROOT / "static"
+MANIFEST_NAME = "manifest.json"
+SUPERSEDED_NAME = "superseded.json"
+SUPERSEDED_GRACE = int(os.environ.get("B3X_ASSET_GRACE_DAYS", 7)) * 24 * 3600
+BUILD_LOCK = ".build.lock"
+SOURCE_FILES = ("logo_R1.jpg", "computer.jpg", "gears.png", "downturn_chart.jpg")
+BASE_URL = os.environ.get("B3X_ASSET_BASE_URL", "app/static").rstrip("/")
+IMMUTABLE = "public, max-age=31536000, immutable"
+HASH_LEN = 12
+
+
+def file_digest(path, length=HASH_LEN):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()[:length]
+
+
+def fingerprinted_name(path):
+    path = Path(path)
+    return f"{path.stem}.{file_digest(path)}{path.suffix}"
+
+
+def build(sources=SOURCE_FILES, src_dir=ROOT, out_dir=STATIC_DIR):
+    """Copy each source into out_dir under its fingerprinted name and write the manifest.
+
+    Safe to run from several processes at once: builds of one out_dir are
+    serialized by a file lock and every file is replaced atomically.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with artifacts.file_lock(out_dir / BUILD_LOCK):
+        manifest = load_manifest(out_dir)
+        for name in sources:
+            src = Path(src_dir) / name
+            try:
+                # Hash and copy the same bytes, in case the source is replaced meanwhile.
+                data = src.read_bytes()
+            except FileNotFoundError:
+                manifest.pop(name, None)
+                continue
+            hashed = f"{src.stem}.{hashlib.sha256(data).hexdigest()[:HASH_LEN]}{src.suffix}"
+            target = out_dir / hashed
+            if not target.exists():
+                artifacts.atomic_write(target, data)
+            stale = manifest.get(name)
+            if stale and stale != hashed:
+                retire(out_dir, [stale])
+            manifest[name] = hashed
+        write_manifest(out_dir, manifest)
+    return manifest
+
+
+def load_manifest(out_dir=STATIC_DIR):
+    try:
+        with open(Path(out_dir) / MANIFEST_NAME) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(out_dir, manifest):
+    artifacts.atomic_write(Path(out_dir) / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode())
+
+
+def load_superseded(out_dir=STATIC_DIR):
+    """``{file: superseded_at}`` for fingerprints replaced by a rebuild and not yet collected."""
+    try:
+        with open(Path(out_dir) / SUPERSEDED_NAME) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def retire(out_dir, files, now=None):
+    """Record replaced fingerprints instead of deleting them; call with the build lock held."""
+    superseded = load_superseded(out_dir)
+    now = time.time() if now is None else now
+    for name in files:
+        superseded.setdefault(name, now)
+    artifacts.atomic_write(Path(out_dir) / SUPERSEDED_NAME, json.dumps(superseded, indent=2, sort_keys=True).encode())
+
+
+def collect(out_dir=STATIC_DIR, grace=SUPERSEDED_GRACE, now=None):
+    """Delete superseded files older than ``grace`` seconds; returns their names.
+
+    Files the manifest references again (a reverted source) are kept and
+    dropped from the superseded list.
+    """
+    out_dir = Path(out_dir)
+    now = time.time() if now is None else now
+    with artifacts.file_lock(out_dir / BUILD_LOCK):
+        current = set(load_manifest(out_dir).values())
+        superseded = load_superseded(out_dir)
+        removed = []
+        for name, since in list(superseded.items()):
+            if name in current:
+                del superseded[name]
+            elif now - since >= grace:
+                (out_dir / name).unlink(missing_ok=True)
+                del superseded[name]
+                removed.append(name)
+        artifacts.atomic_write(out_dir / SUPERSEDED_NAME, json.dumps(superseded, indent=2, sort_keys=True).encode())
+    return removed
+
+
+def asset_url(name, manifest, fallback="", base_url=BASE_URL):
+    hashed = manifest.get(name)
+    return f"{base_url}/{hashed}" if hashed else fallback
+
+
+# --- ASSET SERVER ---
+def make_handler(out_dir=STATIC_DIR, prefix="/assets/"):
+    """Serve fingerprinted files with immutable caching, ETags and 304s."""
+    # Imported here so the Streamlit app, which only builds URLs, skips asyncio.
+    from benchmark3x import httpd
+
+    out_dir = Path(out_dir)
+
+    def servable():
+        # Superseded fingerprints stay reachable until ``collect`` removes them.
+        return set(load_manifest(out_dir).values()) | set(load_superseded(out_dir))
+
+    allowed = servable()
+    cache = {}
+
+    def handler(request):
+        if request.method not in ("GET", "HEAD"):
+            return httpd.text_response(405, "Method Not Allowed")
+        if not request.path.startswith(prefix):
+            return httpd.text_response(404, "Not Found")
+        name = request.path[len(prefix):]
+        if name not in allowed:
+            # The manifest may have been rebuilt since startup.
+            allowed.update(servable())
+            if name not in allowed:
+                return httpd.text_response(404, "Not Found")
+
+        entry = cache.get(name)
+        if entry is None:
+            try:
+                body = (out_dir / name).read_bytes()
+            except OSError:
+                return httpd.text_response(404, "Not Found")
+            # The fingerprint in the name is the content hash, so it doubles as the ETag.
+            etag = '"%s"' % name.rsplit(".", 2)[-2]
+            content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            entry = cache[name] = (body, etag, content_type)
+
+        body, etag, content_type = entry
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE}
+        if httpd.etag_matches(request, etag):
+            return httpd.Response(304, headers=headers)
+        headers["Content-Type"] = content_type
+        return httpd.Response(200, body, headers)
+
+    return handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build, serve or garbage-collect fingerprinted assets.")
+    parser.add_argument("command", choices=("build", "serve", "gc"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--grace-days", type=float, default=SUPERSEDED_GRACE / 86400,
+                        help="gc: keep superseded fingerprints this long")
+    args = parser.parse_args(argv)
+
+    if args.command == "gc":
+        removed = collect(grace=args.grace_days * 86400)
+        print(f"removed {len(removed)} superseded file(s)")
+        for name in removed:
+            print(f"  {name}")
+        return
+
+    from benchmark3x import httpd, images
+
+    build()
+    images.build()
+    manifest = load_manifest()
+    if args.command == "build":
+        for name, hashed in sorted(manifest.items()):
+            print(f"{name} -> {hashed}")
+        return
+    httpd.serve(make_handler(), args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
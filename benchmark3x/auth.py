@@ -0,0 +1,348 @@
+"""Authentication backend for the login page.
+
+- Passwords are hashed with scrypt (memory-hard, stdlib) on a bounded worker
+  pool, so at most ``HASH_WORKERS`` hashes (16 MiB each) run at once and the
+  Streamlit script threads only wait on a future. OpenSSL's scrypt releases the
+  GIL, so a thread pool is enough; pass a ProcessPoolExecutor to isolate it.
+- A token-bucket rate limiter rejects abusive clients before any hashing. The
+  per-account bucket is keyed by client too, so nobody can lock a user out.
+- Validated session tokens are kept in an in-memory LRU+TTL cache, so page
+  reruns skip the database and the hash entirely.
+- Users and sessions live in SQLite (WAL), with a unique index on email.
+"""
+import argparse
+import base64
+import collections
+import getpass
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DB_PATH = Path(os.environ.get("B3X_AUTH_DB", ROOT / ".cache" / "auth.sqlite3"))
+
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 14, 8, 1
+SCRYPT_MAXMEM = 64 * 1024 * 1024
+HASH_WORKERS = min(4, os.cpu_count() or 1)
+
+SESSION_TTL = 12 * 3600
+REMEMBER_TTL = 30 * 24 * 3600
+SESSION_CACHE_SIZE = 10_000
+SESSION_CACHE_TTL = 300  # re-check the database at most this often per token
+
+# Sustained attempts per second per client, and the burst allowed on top
+# (raised by the load test, where every simulated session shares one IP).
+LOGIN_RATE = float(os.environ.get("B3X_LOGIN_RATE", 0.2))
+LOGIN_BURST = int(os.environ.get("B3X_LOGIN_BURST", 5))
+RATE_LIMIT_CLIENTS = 100_000
+
+
+class AuthError(Exception):
+    pass
+
+
+class RateLimited(AuthError):
+    pass
+
+
+# --- PASSWORD HASHING ---
+def hash_password(password, salt=None):
+    salt = salt or os.urandom(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, maxmem=SCRYPT_MAXMEM)
+    b64 = base64.b64encode
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${b64(salt).decode()}${b64(digest).decode()}"
+
+
+def verify_password(password, encoded):
+    try:
+        _, n, r, p, salt, expected = encoded.split("$")
+        digest = hashlib.scrypt(
+            password.encode(), salt=base64.b64decode(salt), n=int(n), r=int(r), p=int(p), maxmem=SCRYPT_MAXMEM
+        )
+        return hmac.compare_digest(digest, base64.b64decode(expected))
+    except ValueError:  # also binascii.Error: a corrupt or foreign hash in the database
+        raise AuthError("This account cannot sign in. Please contact support.") from None
+
+
+# --- RATE LIMITER ---
+class TokenBucket:
+    """Per-client token buckets in a bounded LRU; ``allow`` is O(1) and lock-protected."""
+
+    def __init__(self, rate=LOGIN_RATE, burst=LOGIN_BURST, max_clients=RATE_LIMIT_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            return allowed
+
+
+# --- SESSION CACHE ---
+class TTLCache:
+    def __init__(self, max_size=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[1] <= now:
+                if item is not None:
+                    del self._items[key]
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, ttl=None):
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._items.move_to_end(key)
+            if len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+
+# --- USER STORE ---
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS users_email ON users (email);
+CREATE TABLE IF NOT EXISTS sessions (
+    token_hash TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users (id),
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires_at);
+"""
+
+
+def _normalize_email(email):
+    return email.strip().lower()
+
+
+def _token_hash(token):
+    # Only a hash is stored, so a leaked database does not leak live sessions.
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class AuthService:
+    def __init__(self, db_path=DB_PATH, executor=None, limiter=None, session_cache=None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.executor = executor or ThreadPoolExecutor(HASH_WORKERS, thread_name_prefix="auth-hash")
+        self.limiter = limiter or TokenBucket()
+        self.sessions = session_cache or TTLCache()
+        self._local = threading.local()
+        # Verified against unknown emails so their response time matches real
+        # accounts; hashed once, on the pool, before any login can need it.
+        self._dummy_hash = self.executor.submit(hash_password, secrets.token_hex(8))
+        with self._db() as db:
+            db.executescript(SCHEMA)
+
+    def _db(self):
+        # sqlite3 connections are per thread; Streamlit runs each session on its own thread.
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def create_user(self, email, password):
+        encoded = self.executor.submit(hash_password, password).result()
+        try:
+            self._db().execute(
+                "INSERT INTO users (email, password_hash, created_at) VALUES (?, ?, ?)",
+                (_normalize_email(email), encoded, time.time()),
+            )
+        except sqlite3.IntegrityError:
+            raise AuthError("An account with this email already exists.") from None
+
+    def login_async(self, email, password, client_key, remember=False):
+        """Start a login; returns a Future resolving to a session token.
+
+        Rate limiting and the user lookup happen synchronously (cheap); only
+        the hash runs on the pool.
+        """
+        # Per account *and* client: an attacker guessing one email cannot lock its owner out.
+        account_key = f"email:{_normalize_email(email)}:{client_key}"
+        if not self.limiter.allow(client_key) or not self.limiter.allow(account_key):
+            raise RateLimited("Too many sign-in attempts. Please wait a minute and try again.")
+        row = self._db().execute(
+            "SELECT id, email, password_hash FROM users WHERE email = ?", (_normalize_email(email),)
+        ).fetchone()
+        # Only waits if a login arrives while the startup dummy hash is still on the pool.
+        encoded = row[2] if row else self._dummy_hash.result()
+        future = self.executor.submit(verify_password, password, encoded)
+        ttl = REMEMBER_TTL if remember else SESSION_TTL
+
+        def finish(ok):
+            if not ok or row is None:
+                raise AuthError("Incorrect email or password.")
+            return self._create_session(row[0], row[1], ttl)
+
+        return _chain(future, finish)
+
+    def login(self, email, password, client_key, remember=False):
+        return self.login_async(email, password, client_key, remember).result()
+
+    def _create_session(self, user_id, email, ttl):
+        token = secrets.token_urlsafe(32)
+        expires_at = time.time() + ttl
+        db = self._db()
+        db.execute(
+            "INSERT INTO sessions (token_hash, user_id, expires_at) VALUES (?, ?, ?)",
+            (_token_hash(token), user_id, expires_at),
+        )
+        self.sessions.put(token, {"user_id": user_id, "email": email, "expires_at": expires_at})
+        return token
+
+    def validate(self, token):
+        """Return the session's user dict, or None. Cached, so reruns are O(1)."""
+        if not token:
+            return None
+        user = self.sessions.get(token)
+        if user is not None:
+            if user["expires_at"] > time.time():
+                return user
+            self.sessions.pop(token)
+            return None
+        row = self._db().execute(
+            "SELECT u.id, u.email, s.expires_at FROM sessions s JOIN users u ON u.id = s.user_id "
+            "WHERE s.token_hash = ? AND s.expires_at > ?",
+            (_token_hash(token), time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        user = {"user_id": row[0], "email": row[1], "expires_at": row[2]}
+        self.sessions.put(token, user)
+        return user
+
+    def logout(self, token):
+        self.sessions.pop(token)
+        self._db().execute("DELETE FROM sessions WHERE token_hash = ?", (_token_hash(token),))
+
+    def purge_expired_sessions(self):
+        self._db().execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+
+
+def _chain(future, fn):
+    """A future for ``fn(future.result())``, run on the thread that resolves the result."""
+    chained = Future()
+
+    def done(f):
+        try:
+            chained.set_result(fn(f.result()))
+        except BaseException as exc:
+            chained.set_exception(exc)
+
+    future.add_done_callback(done)
+    return chained
+
+
+# --- SCOPED TOKENS ---
+# Short-lived signed tokens let a signed-in session call a sibling service
+# (the dashboard chart API) without handing it the session token itself.
+TOKEN_SECRET_PATH = Path(os.environ.get("B3X_TOKEN_SECRET_FILE", ROOT / ".cache" / "token.key"))
+SCOPED_TOKEN_TTL = 3600
+_secret = None
+
+
+def token_secret(path=TOKEN_SECRET_PATH):
+    """The HMAC key shared by the app and its services: B3X_TOKEN_SECRET, else a 0600 key file."""
+    global _secret
+    if _secret is None:
+        env = os.environ.get("B3X_TOKEN_SECRET")
+        if env:
+            _secret = env.encode()
+        else:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            except FileExistsError:
+                pass
+            else:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(secrets.token_bytes(32))
+            _secret = path.read_bytes()
+            if not _secret:
+                _secret = None
+                raise AuthError("token key file is empty")
+    return _secret
+
+
+def _sign(payload, secret):
+    return hmac.new(secret, payload.encode(), hashlib.sha256).hexdigest()
+
+
+def issue_token(scope, subject, ttl=SCOPED_TOKEN_TTL, secret=None):
+    """``(token, expires_at)`` granting ``scope`` to ``subject`` until it expires."""
+    expires_at = int(time.time() + ttl)
+    payload = f"{scope}:{expires_at}:{subject}"
+    signature = _sign(payload, secret or token_secret())
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=") + "." + signature, expires_at
+
+
+def check_token(token, scope, secret=None):
+    """The subject of a valid, unexpired ``scope`` token, else None."""
+    try:
+        encoded, signature = token.split(".", 1)
+        payload = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode()
+        token_scope, expires_at, subject = payload.split(":", 2)
+        expires_at = int(expires_at)
+    except (AttributeError, ValueError):  # binascii.Error and UnicodeDecodeError are ValueErrors
+        return None
+    if not hmac.compare_digest(signature, _sign(payload, secret or token_secret())):
+        return None
+    if token_scope != scope or expires_at <= time.time():
+        return None
+    return subject
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage login accounts.")
+    parser.add_argument("command", choices=("add-user",))
+    parser.add_argument("email")
+    args = parser.parse_args(argv)
+
+    service = AuthService()
+    service.create_user(args.email, getpass.getpass("Password: "))
+    print(f"Created {args.email}")
+
+
+if __name__ == "__main__":
+    main()
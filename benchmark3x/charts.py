@@ -0,0 +1,134 @@
+"""Figures and stat-card numbers shown on the landing page (synthetic demo data).
+
+numpy, matplotlib and the backtest engine are imported inside the functions
+that compute, so serving prebuilt artifacts (``python -m benchmark3x.warmup``)
+never loads them.
+"""
+import json
+import os
+from pathlib import Path
+
+from benchmark3x import artifacts
+
+ROOT = Path(__file__).resolve().parent.parent
+CHART_PATH = ROOT / "downturn_chart.jpg"
+STATS_PATH = ROOT / ".cache" / "landing_stats.json"
+# Shorter regime runs are too thin to read at chart resolution.
+MIN_BAND_DAYS = 10
+CHART_DPI = 150
+DEMO_DAYS = 2000
+DEMO_SEED = 101
+
+
+def demo_prices(days=DEMO_DAYS, seed=DEMO_SEED):
+    """Synthetic index: a calm uptrend interrupted by a few high-volatility spells."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    sigma = np.full(days, 0.007)
+    drift = np.full(days, 0.0010)
+    for start, length, scale in ((200, 150, 3.2), (600, 50, 2.0), (900, 100, 3.2), (1400, 200, 2.8), (1850, 50, 2.0)):
+        sigma[start:start + length] *= scale
+        drift[start:start + length] = -0.0012
+    returns = rng.normal(drift, sigma)
+    return 1000 * np.cumprod(1 + returns)
+
+
+def demo_signal(prices):
+    """1 (Long) while the volatility regime is Long, else 0 (Cash)."""
+    import numpy as np
+
+    from benchmark3x import regime
+
+    labels = regime.RegimeDetector().fit(prices).labels
+    return (labels == regime.LONG).astype(np.int8)
+
+
+def landing_stats(product="SPXL"):
+    """Backtest summary behind the CAGR / Profit Factor / Max Drawdown cards."""
+    from benchmark3x import backtest
+
+    prices = demo_prices()
+    return backtest.summary(backtest.run_backtest(prices, demo_signal(prices), product))
+
+
+def _stats_version():
+    here = Path(__file__)
+    return artifacts.source_version(here, here.with_name("regime.py"), here.with_name("backtest.py"))
+
+
+def write_landing_stats(stats_path=STATS_PATH):
+    """Compute the formatted stat cards and store them for ``load_landing_stats``."""
+    from benchmark3x import backtest
+
+    stats = backtest.format_stats(landing_stats())
+    stats_path = Path(stats_path)
+    stats_path.parent.mkdir(parents=True, exist_ok=True)
+    record = {"version": _stats_version(), "stats": stats}
+    artifacts.atomic_write(stats_path, json.dumps(record, ensure_ascii=False).encode())
+    return stats
+
+
+def load_landing_stats(stats_path=STATS_PATH):
+    """Formatted stat cards, from the warm-up file when it matches the current source."""
+    try:
+        with open(stats_path, encoding="utf-8") as f:
+            record = json.load(f)
+        if record["version"] == _stats_version():
+            return record["stats"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return write_landing_stats(stats_path)
+
+
+def ensure_regime_chart(chart_path=CHART_PATH, cache=None, rebuild=False):
+    """Place the regime chart at ``chart_path``, rendering it at most once per host.
+
+    The rendered JPEG lives in the shared artifact cache, keyed by the chart
+    parameters and the source of this module and the regime detector, and is
+    published to ``chart_path`` by atomic rename.
+    """
+    cache = cache or artifacts.default_cache()
+    params = {"days": DEMO_DAYS, "seed": DEMO_SEED, "dpi": CHART_DPI, "min_band_days": MIN_BAND_DAYS}
+    version = artifacts.source_version(Path(__file__), Path(__file__).with_name("regime.py"))
+    cached = cache.get_or_build("regime_chart", params, render_regime_chart, ".jpg", version, rebuild)
+    try:
+        if os.path.samefile(cached, chart_path):
+            return chart_path
+    except FileNotFoundError:
+        pass
+    artifacts.publish(cached, chart_path)
+    return chart_path
+
+
+def render_regime_chart(path):
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    from benchmark3x import regime
+
+    prices = demo_prices()
+    x = np.arange(prices.shape[0])
+    starts, ends, labels = regime.RegimeDetector().fit(prices).runs(min_length=MIN_BAND_DAYS)
+
+    plt.figure(figsize=(10, 5))
+    plt.plot(x, prices, color='#111111', linewidth=1.2, label='Market Index')
+    for label, color, name in ((regime.CASH, '#e74c3c', 'Volatility Regime (Cash)'), (regime.CHOPPY, '#f1c40f', 'Choppy/Warning')):
+        mask = labels == label
+        for i, (start, end) in enumerate(zip(starts[mask], ends[mask])):
+            plt.axvspan(start, end, color=color, alpha=0.15, label=name if i == 0 else None)
+
+    plt.title("Historical Regime Detection (2015-2025)", fontsize=12, fontweight='bold', color='#333', loc='left', pad=15)
+    plt.legend(loc='upper left', fontsize=8, frameon=True, fancybox=False, framealpha=0.95)
+
+    ax = plt.gca()
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('#888')
+    ax.spines['bottom'].set_color('#888')
+    plt.grid(True, axis='y', alpha=0.2, linestyle='-')
+    plt.grid(True, axis='x', alpha=0.1, linestyle='-')
+
+    plt.tight_layout()
+    plt.savefig(path, format='jpg', dpi=CHART_DPI, bbox_inches='tight')
+    plt.close()
@@ -0,0 +1,305 @@
+"""Live dashboard chart data: LTTB-downsampled price/regime tiles and pushed bars.
+
+Runs next to the Streamlit app and reads the feature store:
+
+    python -m benchmark3x.dashboard --port 8504 --root .cache/features
+
+Endpoints (``/v1/chart/*`` need ``token=``, a ``chart`` token from
+``auth.issue_token`` that the app hands to signed-in sessions):
+
+    GET /v1/chart/meta                   row count, date range, tile size
+    GET /v1/chart/tile?z=<zoom>&t=<n>    tile ``n`` of zoom level ``z``
+    GET /v1/chart/stream?since=<rows>    server-sent events with the bars appended after ``since``
+
+At zoom level ``z`` the history is cut into tiles of ``TILE_POINTS << z``
+bars, each downsampled with Largest-Triangle-Three-Buckets to
+``TILE_POINTS`` points (level 0 is full resolution). A view of ``bars`` bars
+drawn ``width`` pixels wide uses the level where a point covers about
+``bars / width`` bars, so it needs at most ``width / TILE_POINTS + 2`` tiles:
+the payload follows the chart's width, not the length of the history.
+
+Complete tiles never change (the store is append-only): they are serialized
+once, kept in an LRU and served as immutable so browsers cache them too.
+Appended bars are pushed to every open chart as one pre-built event; only
+the last, partial tile of each level is rebuilt.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import math
+import os
+
+import numpy as np
+
+from benchmark3x import auth, features, httpd, regime
+
+TILE_POINTS = 512
+MAX_TILES = 4096
+MAX_PUSH_BARS = 1000  # larger catch-ups tell the client to reload its tiles
+POLL_INTERVAL = 1.0
+SSE_HEARTBEAT = 15.0
+# The chart is embedded in the Streamlit page, which is served from another origin.
+CORS = {"Access-Control-Allow-Origin": "*"}
+JSON_HEADERS = dict(CORS, **{"Content-Type": "application/json"})
+IMMUTABLE = "private, max-age=31536000, immutable"
+TOKEN_SCOPE = "chart"
+
+
+# --- DOWNSAMPLING ---
+def lttb(y, n_out, x=None):
+    """Indices of the ``n_out`` points Largest-Triangle-Three-Buckets keeps from ``y``.
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previous pick and the
+    mean of the next bucket, which preserves peaks and troughs.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = y.shape[0]
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:n_out]
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+    # n_out - 2 buckets over the points between the first and the last.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    # The "next bucket" of the last bucket is the final point.
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - mean_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (mean_y[i] - ay))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def zoom_for(bars, width):
+    """The tile level at which ``bars`` bars fit in ``width`` points."""
+    return max(0, math.ceil(math.log2(max(bars, 1) / max(width, 1))))
+
+
+def tiles_for(start, end, width, tile_points=TILE_POINTS):
+    """``(z, [t, ...])`` covering rows ``[start, end)`` drawn ``width`` points wide."""
+    z = zoom_for(end - start, width)
+    span = tile_points << z
+    return z, list(range(start // span, (max(end, start + 1) - 1) // span + 1))
+
+
+# --- TILES ---
+class TileCache:
+    """Downsampled tiles per zoom level, serialized once and kept in an LRU."""
+
+    def __init__(self, store, labels, column="close", tile_points=TILE_POINTS, max_tiles=MAX_TILES):
+        self.store = store
+        self.labels = labels  # callable returning the regime label per row
+        self.column = column
+        self.tile_points = tile_points
+        self.max_tiles = max_tiles
+        self._tiles = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def max_level(self, rows):
+        """The coarsest level a client can ask for: ``zoom_for(rows, 1)``, a one-pixel-wide view."""
+        return max(rows, 1).bit_length()
+
+    def tile(self, z, t):
+        """``(body, etag, complete)`` for tile ``t`` of level ``z``; IndexError past the end."""
+        rows = len(self.store)
+        # Bound z before shifting: a huge z would build a huge integer.
+        if not 0 <= z <= self.max_level(rows) or t < 0:
+            raise IndexError(f"no tile {z}/{t}")
+        span = self.tile_points << z
+        lo = t * span
+        if lo >= rows:
+            raise IndexError(f"no tile {z}/{t}")
+        hi = min(lo + span, rows)
+        key = (z, t)
+        # The last tile of a level is reused until rows are appended to it.
+        cached = self._tiles.get(key)
+        if cached is not None and cached[3] == hi:
+            self._tiles.move_to_end(key)
+            self.hits += 1
+            return cached[:3]
+        self.misses += 1
+        complete = hi == lo + span
+        rows_kept = lo + lttb(self.store.column(self.column)[lo:hi], self.tile_points)
+        body = points_json(self.store, self.labels(), rows_kept, self.column, z=z, t=t, complete=complete)
+        entry = (body, f'"{z}-{t}-{hi}"', complete, hi)
+        self._tiles[key] = entry
+        if len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return entry[:3]
+
+
+def points_json(store, labels, at, column="close", **extra):
+    """Serialize the points at row numbers ``at``: row, date, value and regime label."""
+    values = store.column(column)[at]
+    payload = dict(
+        extra,
+        i=at.tolist(),
+        d=store.index[at].tolist(),
+        y=np.round(values.astype(np.float64), 4).tolist(),
+        r=labels[at].tolist(),
+    )
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+# --- LIVE BOARD ---
+class ChartBoard:
+    """The store, its regime labels and tiles, and the event for the latest append."""
+
+    def __init__(self, store, column="close", tile_points=TILE_POINTS):
+        self.store = store
+        self.column = column
+        self.detector = regime.RegimeDetector().fit(store.column(column))
+        self.rows = len(store)
+        self.tiles = TileCache(store, lambda: self.detector.labels, column, tile_points)
+        self.version = self._version()
+        self.event = None  # (from_rows, rows, SSE bytes) of the latest append
+        self._changed = asyncio.Event()
+
+    def _version(self):
+        # Changes when the store is recreated, so clients drop cached tiles.
+        st = os.stat(self.store.root / f"{features.DATES_NAME}.npy")
+        return f"{st.st_ino:x}{st.st_dev:x}"
+
+    def meta(self):
+        dates = self.store.index
+        return json.dumps({
+            "rows": self.rows,
+            "first": int(dates[0]) if self.rows else None,
+            "last": int(dates[-1]) if self.rows else None,
+            "unit": self.store.unit,
+            "tile_points": self.tiles.tile_points,
+            "version": self.version,
+            "regimes": {str(k): v for k, v in regime.REGIME_NAMES.items()},
+        }, separators=(",", ":")).encode()
+
+    def bars_since(self, since):
+        """SSE event carrying rows ``[since, rows)``, or a reset when that is too many."""
+        if since < 0 or self.rows - since > MAX_PUSH_BARS:
+            body = json.dumps({"from": since, "rows": self.rows, "reset": True}).encode()
+        else:
+            rows = np.arange(since, self.rows)
+            body = points_json(self.store, self.detector.labels, rows, self.column, **{"from": since, "rows": self.rows})
+        return b"id: %d\nevent: bars\ndata: %s\n\n" % (self.rows, body)
+
+    def poll(self):
+        """Pick up rows appended to the store; returns True when there were any."""
+        self.store.refresh()
+        rows = len(self.store)
+        if rows <= self.rows:
+            return False
+        previous = self.rows
+        self.detector.update(self.store.column(self.column)[previous:rows])
+        self.rows = rows
+        # Built once here, shared by every connected chart.
+        self.event = (previous, rows, self.bars_since(previous))
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+        return True
+
+    async def wait_for_change(self, since, timeout):
+        changed = self._changed
+        if self.rows > since:
+            return True
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+async def _event_stream(board, since):
+    if board.rows > since:
+        yield board.bars_since(since)
+    seen = board.rows
+    while True:
+        if await board.wait_for_change(seen, SSE_HEARTBEAT):
+            previous, rows, event = board.event
+            # A client that fell behind more than one append gets its own catch-up.
+            yield event if previous == seen else board.bars_since(seen)
+            seen = rows
+        else:
+            yield b": keep-alive\n\n"
+
+
+def make_handler(board, secret=None):
+    """``secret`` signs the chart tokens (default: ``auth.token_secret()``)."""
+    secret = secret or auth.token_secret()
+
+    async def handler(request):
+        if request.method not in ("GET", "HEAD"):
+            return httpd.text_response(405, "Method Not Allowed")
+        path = request.path
+        if path.startswith("/v1/chart/") and auth.check_token(request.arg("token"), TOKEN_SCOPE, secret) is None:
+            return httpd.Response(401, b"Unauthorized", dict(CORS, **{"Content-Type": "text/plain; charset=utf-8"}))
+        if path == "/v1/chart/tile":
+            try:
+                body, etag, complete = board.tiles.tile(int(request.arg("z", "")), int(request.arg("t", "")))
+            except ValueError:
+                return httpd.text_response(400, "Bad Request")
+            except IndexError:
+                return httpd.text_response(404, "Not Found")
+            headers = dict(JSON_HEADERS, ETag=etag)
+            headers["Cache-Control"] = IMMUTABLE if complete else "no-cache"
+            if httpd.etag_matches(request, etag):
+                return httpd.Response(304, headers=headers)
+            return httpd.Response(200, body, headers)
+        if path == "/v1/chart/meta":
+            return httpd.Response(200, board.meta(), dict(JSON_HEADERS, **{"Cache-Control": "no-cache"}))
+        if path == "/v1/chart/stream":
+            try:
+                since = int(request.headers.get("last-event-id") or request.arg("since", "0"))
+            except ValueError:
+                return httpd.text_response(400, "Bad Request")
+            headers = dict(CORS, **{"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+            return httpd.StreamResponse(_event_stream(board, since), headers=headers)
+        if path == "/healthz":
+            return httpd.text_response(200, "ok")
+        return httpd.text_response(404, "Not Found")
+
+    return handler
+
+
+async def follow(board, interval=POLL_INTERVAL):
+    """Poll the store for appended rows (reading meta.json is all an idle poll costs)."""
+    while True:
+        await asyncio.sleep(interval)
+        board.poll()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve dashboard chart tiles and live bar updates.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8504)
+    parser.add_argument("--root", default=str(features.FEATURE_DIR), help="feature store directory")
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL, help="seconds between store checks")
+    args = parser.parse_args(argv)
+
+    async def run():
+        board = ChartBoard(features.FeatureStore(args.root))
+        server = await httpd.start_server(make_handler(board), args.host, args.port)
+        print(f"Serving {board.rows:,} rows on http://{args.host}:{args.port}")
+        async with server:
+            await asyncio.gather(server.serve_forever(), follow(board, args.poll))
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
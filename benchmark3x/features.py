@@ -0,0 +1,246 @@
+"""Columnar, memory-mapped store for the model's daily market features.
+
+Layout of a store directory::
+
+    meta.json        feature names, dtypes, index unit and the committed row count
+    dates.npy        int64 periods (days by default) since 1970-01-01, strictly increasing
+    <feature>.npy    one contiguous column per feature
+
+Every column is a regular ``.npy`` file that is memory-mapped read-only, so
+``read()`` returns views into the page cache: no copy, and processes mapping
+the same store share its pages. Date ranges are found by binary search on the
+date column:
+
+    store = FeatureStore(FEATURE_DIR)
+    cols = store.read("2015-01-01", "2025-01-01", ["close", "vix"])
+    RegimeDetector().fit(cols["close"])      # float64 view, no copy
+
+``append()`` only writes past the end of each file; history is never
+rewritten. ``meta.json`` holds the committed row count and is replaced last,
+so readers never see a torn append. A crash mid-append leaves extra bytes
+that the next append truncates away.
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from benchmark3x import artifacts
+
+ROOT = Path(__file__).resolve().parent.parent
+FEATURE_DIR = Path(os.environ.get("B3X_FEATURE_DIR", ROOT / ".cache" / "features"))
+META_NAME = "meta.json"
+DATES_NAME = "dates"
+WRITE_LOCK = ".write.lock"
+
+# The 14 predictors described on the landing page. Prices stay float64 so the
+# backtest and regime code can use them without a dtype conversion.
+FEATURES = {
+    "close": "float64",
+    "realized_vol_20": "float32",
+    "vix": "float32",
+    "vix3m": "float32",
+    "vix_term": "float32",
+    "dpi": "float32",
+    "gex": "float32",
+    "yield_2y": "float32",
+    "yield_10y": "float32",
+    "spread_10y_2y": "float32",
+    "spread_10y_3m": "float32",
+    "hy_spread": "float32",
+    "put_call": "float32",
+    "adv_decl": "float32",
+}
+
+# Fixed .npy header size, so growing the shape never moves the data.
+HEADER_LEN = 128
+_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def _header(dtype, rows):
+    d = {"descr": np.dtype(dtype).str, "fortran_order": False, "shape": (rows,)}
+    text = repr(d).encode("latin1")
+    pad = HEADER_LEN - len(_MAGIC) - 2 - len(text) - 1
+    return _MAGIC + (HEADER_LEN - len(_MAGIC) - 2).to_bytes(2, "little") + text + b" " * pad + b"\n"
+
+
+def to_index(dates, unit="D"):
+    """Dates (strings, datetime64 or integers) as int64 ``unit`` periods since the epoch."""
+    dates = np.asarray(dates)
+    if dates.dtype.kind in "iu":
+        return dates.astype(np.int64, copy=False)
+    return dates.astype(f"datetime64[{unit}]").astype(np.int64)
+
+
+class FeatureStore:
+    def __init__(self, root=FEATURE_DIR):
+        self.root = Path(root)
+        self._maps = {}
+        self._mapped_rows = -1
+        self.refresh()
+
+    @classmethod
+    def create(cls, root=FEATURE_DIR, features=FEATURES, unit="D"):
+        """Create an empty store; ``unit`` is the index resolution ("D", "m", "s", ...)."""
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        if (root / META_NAME).exists():
+            raise FileExistsError(f"feature store already exists at {root}")
+        columns = dict(features, **{DATES_NAME: "int64"})
+        for name, dtype in columns.items():
+            artifacts.atomic_write(root / f"{name}.npy", _header(dtype, 0))
+        _write_meta(root, {"features": dict(features), "unit": unit, "rows": 0})
+        return cls(root)
+
+    def refresh(self):
+        """Pick up rows appended by another process since the last call."""
+        with open(self.root / META_NAME) as f:
+            self.meta = json.load(f)
+        self.features = self.meta["features"]
+        self.unit = self.meta.get("unit", "D")
+        if self.meta["rows"] != self._mapped_rows:
+            self._maps = {}
+            self._mapped_rows = self.meta["rows"]
+        return self
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def _column(self, name):
+        column = self._maps.get(name)
+        if column is None:
+            dtype = "int64" if name == DATES_NAME else self.features[name]
+            rows = self.meta["rows"]
+            if rows == 0:
+                column = np.empty(0, dtype=dtype)
+            else:
+                # Map only the committed rows; bytes past them belong to an unfinished append.
+                # A plain ndarray view of the map: slicing a memmap subclass costs microseconds.
+                column = np.memmap(self.root / f"{name}.npy", dtype=dtype, mode="r",
+                                   offset=HEADER_LEN, shape=(rows,)).view(np.ndarray)
+            self._maps[name] = column
+        return column
+
+    @property
+    def index(self):
+        """The raw int64 date column."""
+        return self._column(DATES_NAME)
+
+    @property
+    def dates(self):
+        return self.index.view(f"datetime64[{self.unit}]")
+
+    def index_range(self, start=None, end=None):
+        """Row slice for dates in ``[start, end)``; either bound may be None."""
+        index = self.index
+        lo = 0 if start is None else int(np.searchsorted(index, self._key(start), "left"))
+        hi = len(index) if end is None else int(np.searchsorted(index, self._key(end), "left"))
+        return slice(lo, max(lo, hi))
+
+    def _key(self, date):
+        return int(to_index([date], self.unit)[0])
+
+    def column(self, name, start=None, end=None):
+        return self._column(name)[self.index_range(start, end)]
+
+    def read(self, start=None, end=None, features=None):
+        """Zero-copy views ``{name: array}`` for ``[start, end)``, plus ``"date"``."""
+        rows = self.index_range(start, end)
+        out = {"date": self.dates[rows]}
+        for name in features or self.features:
+            out[name] = self._column(name)[rows]
+        return out
+
+    def append(self, dates, columns):
+        """Append rows for dates after the last stored one.
+
+        ``columns`` maps feature names to arrays the length of ``dates``;
+        missing features are stored as NaN.
+        """
+        keys = to_index(dates, self.unit)
+        n = keys.shape[0]
+        if n == 0:
+            return self
+        if np.any(np.diff(keys) <= 0):
+            raise ValueError("dates must be strictly increasing")
+        unknown = set(columns) - set(self.features)
+        if unknown:
+            raise KeyError(f"unknown features: {sorted(unknown)}")
+
+        with artifacts.file_lock(self.root / WRITE_LOCK):
+            self.refresh()
+            rows = self.meta["rows"]
+            if rows and keys[0] <= int(self._column(DATES_NAME)[-1]):
+                raise ValueError("append-only: dates must be after the last stored date")
+            blocks = {DATES_NAME: ("int64", keys)}
+            for name, dtype in self.features.items():
+                values = columns.get(name)
+                if values is None:
+                    values = np.full(n, np.nan)
+                values = np.asarray(values, dtype=dtype)
+                if values.shape != (n,):
+                    raise ValueError(f"{name}: expected {n} values, got {values.shape}")
+                blocks[name] = (dtype, values)
+            for name, (dtype, values) in blocks.items():
+                _append_column(self.root / f"{name}.npy", dtype, rows, values)
+            _write_meta(self.root, dict(self.meta, rows=rows + n))
+        return self.refresh()
+
+
+def _append_column(path, dtype, rows, values):
+    itemsize = np.dtype(dtype).itemsize
+    with open(path, "r+b") as f:
+        f.truncate(HEADER_LEN + rows * itemsize)  # drop a torn tail from a crashed append
+        f.seek(0, os.SEEK_END)
+        f.write(values.tobytes())
+        f.seek(0)
+        f.write(_header(dtype, rows + values.shape[0]))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _write_meta(root, meta):
+    artifacts.atomic_write(Path(root) / META_NAME, json.dumps(meta, indent=2).encode())
+
+
+def business_days(start, count):
+    """``count`` weekdays from ``start`` as datetime64[D]."""
+    first = np.datetime64(start, "D")
+    # ~7/5 calendar days per business day, plus slack.
+    calendar = first + np.arange(int(count * 1.45) + 10)
+    return calendar[np.is_busday(calendar)][:count]
+
+
+def synthetic_columns(rows, seed=7):
+    """Plausible random data for every feature, for demos and benchmarks."""
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.cumprod(1 + rng.normal(0.0004, 0.011, rows))
+    out = {"close": close}
+    for name in FEATURES:
+        if name != "close":
+            out[name] = rng.normal(0, 1, rows).cumsum() * 0.01 + 1
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the feature store or create a synthetic demo store.")
+    parser.add_argument("command", choices=("info", "demo"))
+    parser.add_argument("--root", default=str(FEATURE_DIR))
+    parser.add_argument("--years", type=int, default=20, help="demo: years of daily rows")
+    args = parser.parse_args(argv)
+
+    if args.command == "demo":
+        store = FeatureStore.create(args.root)
+        rows = args.years * 252
+        store.append(business_days("2005-01-03", rows), synthetic_columns(rows))
+    store = FeatureStore(args.root)
+    if len(store):
+        print(f"{len(store):,} rows, {store.dates[0]} .. {store.dates[-1]}, {len(store.features)} features")
+    else:
+        print("empty store")
+
+
+if __name__ == "__main__":
+    main()
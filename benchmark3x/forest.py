@@ -0,0 +1,270 @@
+"""Packed Random Forest inference for the 1/0 signal.
+
+The trees are flattened into one set of node arrays (feature, threshold,
+left, right, value) shared by the whole forest. Rows are scored by walking
+them down a level per step with NumPy gathers, so the Python loop runs once
+per level instead of once per node, row and tree: across all trees at once
+for a few rows (single-row latency), tree by tree for large batches (cache
+locality). Leaves point at themselves, so finished walks just stay put.
+Missing values (NaN) follow each node's learned direction, as in sklearn;
+the extra check only runs when a model has right-going nodes and the input
+has NaNs.
+
+Trees come from a fitted scikit-learn ``RandomForestClassifier``
+(``pack_sklearn``) or from ``pack`` with sklearn-style per-tree arrays, and
+are saved as a plain ``.npz`` (no pickle). ``python -m
+benchmark3x.walkforward`` publishes the newest fold's model to ``MODEL_PATH``,
+which is loaded once per process: ``get_model()`` in the signal API
+(``/v1/signal/model``), ``st.cache_resource`` around ``load()`` on the app's
+dashboard.
+"""
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+MODEL_PATH = Path(os.environ.get("B3X_MODEL_PATH", ROOT / ".cache" / "models" / "forest.npz"))
+SMALL_BATCH = 64  # up to this many rows, walk all trees together
+BATCH_ROWS = 8192
+TREE_LEAF = -1
+
+
+class PackedForest:
+    def __init__(self, feature, threshold, left, right, value, roots, depth, n_features, classes,
+                 missing_left=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+        self.n_features = int(n_features)
+        self.classes = classes
+        # Models saved before missing directions were kept sent every NaN left.
+        self.missing_left = (np.ones(feature.shape[0], dtype=bool) if missing_left is None
+                             else np.asarray(missing_left, dtype=bool))
+        # Hot-loop layout: children interleaved so one gather picks the branch,
+        # and one contiguous value column per class (gathering rows of a 2-D
+        # array is several times slower than np.take on a 1-D one).
+        self._children = np.stack([left, right], axis=1).ravel().astype(np.int32)
+        self._feature = feature.astype(np.int32)
+        self._roots = roots.astype(np.int32)
+        self._class_values = [np.ascontiguousarray(value[:, c]) for c in range(value.shape[1])]
+        # sklearn compares float32 features with float64 thresholds. Rounding each
+        # threshold down to float32 keeps every comparison identical at half the bytes.
+        t32 = threshold.astype(np.float32)
+        self._threshold = np.where(t32 > threshold, np.nextafter(t32, np.float32(-np.inf)), t32)
+        self._missing_right = None if self.missing_left.all() else ~self.missing_left
+
+    @property
+    def n_trees(self):
+        return self.roots.shape[0]
+
+    def leaves(self, X):
+        """Leaf node index for every (tree, row): shape (n_trees, n_rows)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n = X.shape[0]
+        row_offsets = (np.arange(n, dtype=np.int32) * self.n_features)[None, :]
+        node = np.repeat(self._roots[:, None], n, axis=1)
+        return self._walk(X.ravel(), row_offsets, node, self._has_missing(X))
+
+    def _has_missing(self, X):
+        return self._missing_right is not None and bool(np.isnan(X).any())
+
+    def _walk(self, flat, row_offsets, node, missing=False):
+        feature, threshold, children = self._feature, self._threshold, self._children
+        missing_right = self._missing_right if missing else None
+        for _ in range(self.depth):
+            x = flat.take(row_offsets + feature.take(node))
+            right = x > threshold.take(node)
+            if missing_right is not None:
+                # NaN compares False (left); send it right where the tree learned to.
+                right |= np.isnan(x) & missing_right.take(node)
+            node = children.take(2 * node + right)
+        return node
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"expected {self.n_features} features, got {X.shape[1]}")
+        if X.shape[0] <= SMALL_BATCH:
+            # Few rows: walk all trees at once, ``depth`` NumPy steps in total.
+            node = self.leaves(X)
+            return np.stack([values.take(node).mean(axis=0) for values in self._class_values], axis=1)
+
+        # Many rows: one tree at a time, so its nodes stay in cache for the whole batch.
+        out = np.zeros((X.shape[0], len(self._class_values)))
+        missing = self._has_missing(X)
+        for start in range(0, X.shape[0], BATCH_ROWS):
+            chunk = X[start:start + BATCH_ROWS]
+            n = chunk.shape[0]
+            flat = chunk.ravel()
+            row_offsets = np.arange(n, dtype=np.int32) * self.n_features
+            acc = out[start:start + n]
+            for root in self._roots:
+                node = self._walk(flat, row_offsets, np.full(n, root, dtype=np.int32), missing)
+                for c, values in enumerate(self._class_values):
+                    acc[:, c] += values.take(node)
+        out /= self.n_trees
+        return out
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, path=MODEL_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                     value=self.value, roots=self.roots, depth=self.depth, n_features=self.n_features,
+                     classes=self.classes, missing_left=self.missing_left)
+        os.replace(tmp, path)
+        return path
+
+
+def load(path=MODEL_PATH):
+    with np.load(path, allow_pickle=False) as data:
+        return PackedForest(**{name: data[name] for name in data.files})
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model(path=MODEL_PATH):
+    """The process-wide model, loaded on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load(path)
+    return _model
+
+
+# --- PACKING ---
+def pack(trees, n_features, classes=(0, 1)):
+    """Flatten trees given as sklearn-style arrays.
+
+    Each tree is a dict with ``children_left``, ``children_right``,
+    ``feature``, ``threshold`` and ``value`` (n_nodes x n_classes counts or
+    fractions), and optionally ``missing_go_to_left`` (default: NaN goes
+    left); leaves have ``children_left == -1``.
+    """
+    parts = {"feature": [], "threshold": [], "left": [], "right": [], "value": [], "missing_left": []}
+    roots = []
+    depth = 0
+    offset = 0
+    for tree in trees:
+        left = np.asarray(tree["children_left"], dtype=np.int64)
+        right = np.asarray(tree["children_right"], dtype=np.int64)
+        n = left.shape[0]
+        index = np.arange(n)
+        leaf = left == TREE_LEAF
+        parts["left"].append(np.where(leaf, index, left) + offset)
+        parts["right"].append(np.where(leaf, index, right) + offset)
+        parts["feature"].append(np.where(leaf, 0, tree["feature"]))
+        parts["threshold"].append(np.where(leaf, 0.0, tree["threshold"]))
+        missing_left = tree.get("missing_go_to_left")
+        parts["missing_left"].append(np.ones(n, dtype=bool) if missing_left is None
+                                     else np.asarray(missing_left, dtype=bool) | leaf)
+        value = np.asarray(tree["value"], dtype=np.float64).reshape(n, -1)
+        parts["value"].append(value / value.sum(axis=1, keepdims=True))
+        roots.append(offset)
+        depth = max(depth, _tree_depth(left, right))
+        offset += n
+    return PackedForest(
+        feature=np.concatenate(parts["feature"]).astype(np.intp),
+        threshold=np.concatenate(parts["threshold"]).astype(np.float64),
+        left=np.concatenate(parts["left"]).astype(np.intp),
+        right=np.concatenate(parts["right"]).astype(np.intp),
+        value=np.concatenate(parts["value"]),
+        roots=np.asarray(roots, dtype=np.intp),
+        depth=depth,
+        n_features=n_features,
+        classes=np.asarray(classes),
+        missing_left=np.concatenate(parts["missing_left"]),
+    )
+
+
+def pack_sklearn(model):
+    """Pack a fitted ``sklearn.ensemble.RandomForestClassifier`` (binary or multiclass)."""
+    trees = []
+    for estimator in model.estimators_:
+        t = estimator.tree_
+        trees.append({
+            "children_left": t.children_left, "children_right": t.children_right,
+            "feature": t.feature, "threshold": t.threshold, "value": t.value[:, 0, :],
+            # sklearn >= 1.3; older versions cannot route NaN at all.
+            "missing_go_to_left": getattr(t, "missing_go_to_left", None),
+        })
+    return pack(trees, model.n_features_in_, model.classes_)
+
+
+def _tree_depth(left, right):
+    depth = 0
+    level = np.array([0])
+    while level.size:
+        inner = level[left[level] != TREE_LEAF]
+        if not inner.size:
+            break
+        depth += 1
+        level = np.concatenate((left[inner], right[inner]))
+    return depth
+
+
+# --- REFERENCE AND DEMO MODEL ---
+def reference_predict_proba(trees, X):
+    """Row-by-row, tree-by-tree walk of the unpacked trees; the parity baseline."""
+    X = np.asarray(X, dtype=np.float32)
+    out = np.zeros((X.shape[0], np.asarray(trees[0]["value"]).reshape(len(trees[0]["feature"]), -1).shape[1]))
+    for tree in trees:
+        left, right = tree["children_left"], tree["children_right"]
+        feature, threshold = tree["feature"], tree["threshold"]
+        missing_left = tree.get("missing_go_to_left")
+        value = np.asarray(tree["value"], dtype=np.float64).reshape(len(left), -1)
+        for i, row in enumerate(X):
+            node = 0
+            while left[node] != TREE_LEAF:
+                x = row[feature[node]]
+                if np.isnan(x):
+                    go_left = missing_left is None or missing_left[node]
+                else:
+                    go_left = x <= threshold[node]
+                node = left[node] if go_left else right[node]
+            out[i] += value[node] / value[node].sum()
+    return out / len(trees)
+
+
+def random_trees(n_trees=100, max_depth=10, n_features=14, seed=0, leaf_prob=0.15):
+    """Random sklearn-style trees with the shape of a trained forest, for tests and benchmarks."""
+    rng = np.random.default_rng(seed)
+    trees = []
+    for _ in range(n_trees):
+        left, right, feature, threshold, value = [], [], [], [], []
+
+        def grow(depth):
+            node = len(left)
+            left.append(TREE_LEAF)
+            right.append(TREE_LEAF)
+            feature.append(-2)
+            threshold.append(-2.0)
+            value.append(rng.integers(1, 50, 2).astype(np.float64))
+            if depth < max_depth and (depth < 2 or rng.random() > leaf_prob):
+                feature[node] = int(rng.integers(n_features))
+                threshold[node] = float(rng.normal())
+                left[node] = grow(depth + 1)
+                right[node] = grow(depth + 1)
+            return node
+
+        grow(0)
+        trees.append({
+            "children_left": np.array(left), "children_right": np.array(right),
+            "feature": np.array(feature), "threshold": np.array(threshold), "value": np.array(value),
+        })
+    return trees
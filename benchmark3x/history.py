@@ -0,0 +1,311 @@
+"""Persistent signal history with switch events and rolling performance.
+
+    history = SignalHistory()
+    history.extend([{"date": "2025-06-02", "close": 5935.9, "SPXL": 1, "SSO": 1}])
+    history.signal_on("2020-03-16", "SPXL")          # in effect on that date
+    history.switches("SPXL", "2020-01-01", "2021-01-01")
+    history.performance("SPXL", "1y")                # latest rolling 1-year stats
+
+Everything lives in SQLite (WAL, one connection per thread, so readers never
+block each other or the writer). Dates are stored as integer days since the
+epoch, and every table is a ``WITHOUT ROWID`` B-tree clustered on
+``(product, ..., day)``, so a point lookup is one index descent and a range is
+a descent plus a sequential read.
+
+Appends do the aggregation once, instead of every query redoing it:
+
+- ``signals`` keeps running totals per product (strategy equity, bars held,
+  sums of returns and squared returns), so stats between any two dates come
+  from two rows.
+- ``switches`` holds only the rows where the signal changed.
+- ``performance`` holds rolling CAGR, volatility, max drawdown and exposure
+  for each window in ``WINDOWS``, ending at every date.
+
+Strategy returns follow ``backtest``: a signal published at a close is held
+over the next bar, on the daily-reset product with its expense drag.
+"""
+import argparse
+import collections
+import itertools
+import math
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from benchmark3x import backtest
+
+ROOT = Path(__file__).resolve().parent.parent
+DB_PATH = Path(os.environ.get("B3X_HISTORY_DB", ROOT / ".cache" / "history.sqlite3"))
+PRODUCTS = ("SPXL", "SSO")
+WINDOWS = {"3m": 63, "1y": 252, "3y": 756}
+MIN_DAY, MAX_DAY = -2 ** 62, 2 ** 62  # open range bounds, as SQLite integers
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    product TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    signal INTEGER NOT NULL,
+    close REAL NOT NULL,
+    equity REAL NOT NULL,
+    held INTEGER NOT NULL,
+    sum_r REAL NOT NULL,
+    sum_r2 REAL NOT NULL,
+    PRIMARY KEY (product, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS switches (
+    product TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    signal INTEGER NOT NULL,
+    PRIMARY KEY (product, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS performance (
+    product TEXT NOT NULL,
+    window TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    cagr REAL NOT NULL,
+    volatility REAL NOT NULL,
+    max_drawdown REAL NOT NULL,
+    exposure REAL NOT NULL,
+    PRIMARY KEY (product, window, day)
+) WITHOUT ROWID;
+"""
+
+
+class HistoryError(ValueError):
+    pass
+
+
+def _day(date):
+    return int(np.datetime64(date, "D").astype(np.int64))
+
+
+def _date(day):
+    return str(np.datetime64(day, "D"))
+
+
+class SignalHistory:
+    def __init__(self, db_path=DB_PATH, products=PRODUCTS, windows=WINDOWS):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.products = tuple(products)
+        self.windows = dict(windows)
+        self._local = threading.local()
+        self._db().executescript(SCHEMA)
+
+    def _db(self):
+        # sqlite3 connections are per thread; Streamlit runs each session on its own thread.
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    # --- APPENDS ---
+    def extend(self, records):
+        """Append records ``{"date", "close", <product>: 0/1, ...}`` dated after the last stored one.
+
+        All products are written in one transaction; returns the number of records.
+        """
+        records = sorted(records, key=lambda r: _day(r["date"]))
+        if not records:
+            return 0
+        days = [_day(r["date"]) for r in records]
+        if any(a == b for a, b in zip(days, days[1:])):
+            raise HistoryError("duplicate dates")
+        closes = np.array([float(r["close"]) for r in records])
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for product in self.products:
+                signals = [int(bool(r[product])) for r in records]
+                self._extend_product(db, product, days, closes, signals)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return len(records)
+
+    def append(self, date, close, **signals):
+        return self.extend([dict(signals, date=date, close=close)])
+
+    def _extend_product(self, db, product, days, closes, signals):
+        longest = max(self.windows.values(), default=0)
+        tail = db.execute(
+            "SELECT day, signal, close, equity, held, sum_r, sum_r2 FROM signals"
+            " WHERE product = ? ORDER BY day DESC LIMIT ?", (product, longest + 1),
+        ).fetchall()[::-1]
+        if tail and days[0] <= tail[-1][0]:
+            raise HistoryError(f"append-only: {product} already has {_date(tail[-1][0])}")
+        # The last ``longest + 1`` totals are all a rolling window needs.
+        recent = collections.deque(((row[3], row[4], row[5], row[6]) for row in tail), maxlen=longest + 1)
+
+        spec = backtest.PRODUCTS[product]
+        previous_close = tail[-1][2] if tail else closes[0]
+        underlying = closes / np.concatenate(([previous_close], closes[:-1])) - 1.0
+        product_returns = backtest.leveraged_returns(underlying, spec["leverage"], spec["expense_ratio"])
+
+        signal = tail[-1][1] if tail else None
+        equity, held, sum_r, sum_r2 = recent[-1] if recent else (1.0, 0, 0.0, 0.0)
+        rows, switches, performance = [], [], []
+        for i, day in enumerate(days):
+            if signal is not None:
+                r = float(product_returns[i]) if signal else 0.0
+                equity *= 1.0 + r
+                held += signal
+                sum_r += r
+                sum_r2 += r * r
+            if signals[i] != signal:
+                switches.append((product, day, signals[i]))
+            signal = signals[i]
+            rows.append((product, day, signal, float(closes[i]), equity, held, sum_r, sum_r2))
+            recent.append((equity, held, sum_r, sum_r2))
+            for name, bars in self.windows.items():
+                if len(recent) > bars:
+                    performance.append((product, name, day) + _window_stats(recent, bars))
+
+        db.executemany("INSERT INTO signals VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        db.executemany("INSERT INTO switches VALUES (?, ?, ?)", switches)
+        db.executemany("INSERT INTO performance VALUES (?, ?, ?, ?, ?, ?, ?)", performance)
+
+    # --- QUERIES ---
+    def signal_on(self, date, product="SPXL"):
+        """The signal in effect on ``date``: the last one published on or before it."""
+        row = self._db().execute(
+            "SELECT day, signal, close FROM signals WHERE product = ? AND day <= ? ORDER BY day DESC LIMIT 1",
+            (product, _day(date)),
+        ).fetchone()
+        return None if row is None else {"date": _date(row[0]), "signal": row[1], "close": row[2]}
+
+    def latest(self, product="SPXL"):
+        row = self._db().execute(
+            "SELECT day, signal, close FROM signals WHERE product = ? ORDER BY day DESC LIMIT 1", (product,)
+        ).fetchone()
+        return None if row is None else {"date": _date(row[0]), "signal": row[1], "close": row[2]}
+
+    def signals(self, product="SPXL", start=None, end=None):
+        """``{"date", "signal", "close"}`` for dates in ``[start, end)``."""
+        rows = self._db().execute(
+            "SELECT day, signal, close FROM signals WHERE product = ? AND day >= ? AND day < ? ORDER BY day",
+            (product, *_bounds(start, end)),
+        )
+        return [{"date": _date(day), "signal": signal, "close": close} for day, signal, close in rows]
+
+    def switches(self, product="SPXL", start=None, end=None):
+        """Regime switches in ``[start, end)``: the dates the signal changed and its new value."""
+        rows = self._db().execute(
+            "SELECT day, signal FROM switches WHERE product = ? AND day >= ? AND day < ? ORDER BY day",
+            (product, *_bounds(start, end)),
+        )
+        return [{"date": _date(day), "signal": signal} for day, signal in rows]
+
+    def performance(self, product="SPXL", window="1y", date=None):
+        """Rolling stats over ``window`` ending on ``date`` (or the last date before it; latest when None)."""
+        row = self._db().execute(
+            "SELECT day, cagr, volatility, max_drawdown, exposure FROM performance"
+            " WHERE product = ? AND window = ? AND day <= ? ORDER BY day DESC LIMIT 1",
+            (product, window, _day(date) if date else MAX_DAY),
+        ).fetchone()
+        return None if row is None else _performance_dict(row)
+
+    def performance_series(self, product="SPXL", window="1y", start=None, end=None):
+        rows = self._db().execute(
+            "SELECT day, cagr, volatility, max_drawdown, exposure FROM performance"
+            " WHERE product = ? AND window = ? AND day >= ? AND day < ? ORDER BY day",
+            (product, window, *_bounds(start, end)),
+        )
+        return [_performance_dict(row) for row in rows]
+
+    def between(self, product="SPXL", start=None, end=None):
+        """Strategy return and CAGR from the first to the last date in ``[start, end)``, from two rows."""
+        lo, hi = _bounds(start, end)
+        query = ("SELECT day, equity FROM signals WHERE product = ? AND day >= ? AND day < ?"
+                 " ORDER BY day {} LIMIT 1")
+        db = self._db()
+        first = db.execute(query.format("ASC"), (product, lo, hi)).fetchone()
+        last = db.execute(query.format("DESC"), (product, lo, hi)).fetchone()
+        if first is None or last[0] == first[0]:
+            return None
+        growth = last[1] / first[1]
+        years = (last[0] - first[0]) / 365.25
+        return {"start": _date(first[0]), "end": _date(last[0]), "return": growth - 1.0,
+                "cagr": growth ** (1.0 / years) - 1.0 if growth > 0 else -1.0}
+
+    def __len__(self):
+        return self._db().execute(
+            "SELECT count(*) FROM signals WHERE product = ?", (self.products[0],)
+        ).fetchone()[0]
+
+
+def _bounds(start, end):
+    return (MIN_DAY if start is None else _day(start)), (MAX_DAY if end is None else _day(end))
+
+
+def _window_stats(recent, bars):
+    """(cagr, volatility, max_drawdown, exposure) over the last ``bars`` returns."""
+    start, end = recent[-bars - 1], recent[-1]
+    growth = end[0] / start[0]
+    mean = (end[2] - start[2]) / bars
+    variance = max((end[3] - start[3]) / bars - mean * mean, 0.0) * bars / (bars - 1)
+    equity = np.fromiter((row[0] for row in itertools.islice(recent, len(recent) - bars - 1, None)), float)
+    return (
+        growth ** (backtest.TRADING_DAYS / bars) - 1.0 if growth > 0 else -1.0,
+        math.sqrt(variance * backtest.TRADING_DAYS),
+        backtest.max_drawdown(equity),
+        (end[1] - start[1]) / bars,
+    )
+
+
+def _performance_dict(row):
+    day, cagr, volatility, max_drawdown, exposure = row
+    return {"date": _date(day), "cagr": cagr, "volatility": volatility, "max_drawdown": max_drawdown,
+            "exposure": exposure}
+
+
+def demo_records(days=5040, start="2005-01-03", seed=7):
+    """Synthetic closes with the volatility-regime signal, for demos and benchmarks."""
+    from benchmark3x import features, optimize, regime
+
+    close = features.synthetic_columns(days, seed)["close"]
+    labels = regime.RegimeDetector().fit(close).labels
+    # SSO waits out the chop; SPXL follows the raw regime.
+    spxl = (labels == regime.LONG).astype(np.int8)
+    sso = optimize.reentry_signal(labels, 3)
+    dates = features.business_days(start, days)
+    return [{"date": str(d), "close": float(c), "SPXL": int(a), "SSO": int(b)}
+            for d, c, a, b in zip(dates, close, spxl, sso)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the signal history or load a synthetic demo history.")
+    parser.add_argument("command", choices=("info", "demo", "on", "switches", "performance"))
+    parser.add_argument("date", nargs="?", help="on: the date; switches: a year or start date")
+    parser.add_argument("--db", default=str(DB_PATH))
+    parser.add_argument("--product", choices=PRODUCTS, default="SPXL")
+    parser.add_argument("--window", choices=sorted(WINDOWS), default="1y")
+    parser.add_argument("--years", type=int, default=20, help="demo: years of daily rows")
+    args = parser.parse_args(argv)
+
+    history = SignalHistory(args.db)
+    if args.command == "demo":
+        history.extend(demo_records(args.years * backtest.TRADING_DAYS))
+    if args.command in ("info", "demo"):
+        latest = history.latest(args.product)
+        print(f"{len(history):,} days, latest {latest}" if latest else "empty history")
+    elif args.command == "on":
+        print(history.signal_on(args.date, args.product))
+    elif args.command == "switches":
+        start = f"{args.date}-01-01" if args.date and len(args.date) == 4 else args.date
+        end = f"{int(args.date) + 1}-01-01" if args.date and len(args.date) == 4 else None
+        for switch in history.switches(args.product, start, end):
+            print(switch["date"], "Long" if switch["signal"] else "Cash")
+    else:
+        print(history.performance(args.product, args.window, args.date))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Minimal asyncio HTTP/1.1 server shared by the small services next to Streamlit.
+
+Handlers are plain callables (sync or async) taking a Request and returning a
+Response. Connections are kept alive between requests; there are no external
+dependencies so the services start in milliseconds.
+"""
+import asyncio
+import time
+from email.utils import formatdate
+from urllib.parse import parse_qs, unquote
+
+REASONS = {
+    200: "OK",
+    204: "No Content",
+    301: "Moved Permanently",
+    302: "Found",
+    304: "Not Modified",
+    400: "Bad Request",
+    401: "Unauthorized",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+KEEPALIVE_TIMEOUT = 15.0
+
+
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "body")
+
+    def __init__(self, method, path, query, headers, body=b""):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def arg(self, name, default=None):
+        values = self.query.get(name)
+        return values[0] if values else default
+
+
+class Response:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status=200, body=b"", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+
+class StreamResponse:
+    """A response whose body is produced incrementally (e.g. server-sent events).
+
+    ``chunks`` is an async iterator of bytes. The connection is closed when it
+    is exhausted, since the length is not known up front.
+    """
+
+    __slots__ = ("status", "headers", "chunks")
+
+    def __init__(self, chunks, status=200, headers=None):
+        self.status = status
+        self.chunks = chunks
+        self.headers = headers or {}
+
+
+def text_response(status, message):
+    return Response(status, message.encode(), {"Content-Type": "text/plain; charset=utf-8"})
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+# --- DATE HEADER (formatted at most once per second) ---
+_date_cache = [0, ""]
+
+
+def http_date():
+    now = int(time.time())
+    if _date_cache[0] != now:
+        _date_cache[0] = now
+        _date_cache[1] = formatdate(now, usegmt=True)
+    return _date_cache[1]
+
+
+def _serialize(response, keep_alive, head_only):
+    streaming = isinstance(response, StreamResponse)
+    body = b"" if streaming else response.body
+    lines = [f"HTTP/1.1 {response.status} {REASONS.get(response.status, 'Unknown')}"]
+    headers = dict(response.headers)
+    headers.setdefault("Date", http_date())
+    if response.status not in (204, 304) and not streaming:
+        headers["Content-Length"] = str(len(body))
+    headers["Connection"] = "keep-alive" if keep_alive else "close"
+    for name, value in headers.items():
+        value = str(value)
+        # A CR/LF in a value would start a new header (response splitting).
+        if "\r" in value or "\n" in value or "\r" in name or "\n" in name:
+            raise ValueError(f"invalid header {name!r}")
+        lines.append(f"{name}: {value}")
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")  # UnicodeEncodeError is a ValueError
+    if head_only or response.status in (204, 304):
+        return head
+    return head + body
+
+
+def _parse_head(raw):
+    lines = raw.decode("latin-1").split("\r\n")
+    method, target, version = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    path, _, query = target.partition("?")
+    return method.upper(), unquote(path), parse_qs(query) if query else {}, version, headers
+
+
+async def _read_request(reader):
+    # asyncio.timeout avoids the extra task wait_for() creates per request.
+    async with asyncio.timeout(KEEPALIVE_TIMEOUT):
+        raw = await reader.readuntil(b"\r\n\r\n")
+    method, path, query, version, headers = _parse_head(raw)
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY_BYTES:
+        raise ValueError("body too large")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method, path, query, headers, body), version
+
+
+def _wants_keep_alive(version, headers):
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+async def _serve_connection(reader, writer, handler):
+    try:
+        while True:
+            try:
+                request, version = await _read_request(reader)
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                break
+            except (asyncio.LimitOverrunError, ValueError):
+                writer.write(_serialize(text_response(400, "Bad Request"), False, False))
+                break
+
+            try:
+                response = handler(request)
+                if asyncio.iscoroutine(response):
+                    response = await response
+            except Exception:
+                response = text_response(500, "Internal Server Error")
+
+            if isinstance(response, StreamResponse):
+                try:
+                    head = _serialize(response, False, True)
+                except ValueError:
+                    writer.write(_serialize(text_response(500, "Internal Server Error"), False, False))
+                    break
+                writer.write(head)
+                await writer.drain()
+                if request.method != "HEAD":
+                    async for chunk in response.chunks:
+                        writer.write(chunk)
+                        await writer.drain()
+                break
+
+            keep_alive = _wants_keep_alive(version, request.headers)
+            try:
+                data = _serialize(response, keep_alive, request.method == "HEAD")
+            except ValueError:
+                # The handler produced a header that cannot go on the wire.
+                keep_alive = False
+                data = _serialize(text_response(500, "Internal Server Error"), False, request.method == "HEAD")
+            writer.write(data)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(handler, host="127.0.0.1", port=8502):
+    return await asyncio.start_server(
+        lambda r, w: _serve_connection(r, w, handler), host, port, limit=MAX_HEADER_BYTES
+    )
+
+
+def serve(handler, host="127.0.0.1", port=8502):
+    async def main():
+        server = await start_server(handler, host, port)
+        print(f"Serving on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,163 @@
+"""Offline responsive-image stage.
+
+Builds resized AVIF/WebP variants (plus a JPEG/PNG fallback) for the landing
+images and a pre-grayscaled, downsampled gears background, so the browser picks
+the smallest file for its viewport and the page no longer applies a grayscale
+filter at paint time. Outputs are registered in the asset manifest under keys
+like ``computer.jpg@768w.webp`` and cached by source hash in ``images.json``:
+an image is only re-encoded when its source (or its spec) changes.
+
+    python -m benchmark3x.images        # build and report bytes saved
+"""
+import hashlib
+import io
+import json
+from pathlib import Path
+
+from benchmark3x import artifacts, assets
+
+CACHE_NAME = "images.json"
+PIPELINE_VERSION = 1
+
+# Widths larger than the source are clamped to the source width.
+SPECS = {
+    "computer.jpg": {"widths": (480, 768, 1024), "formats": ("avif", "webp", "jpeg")},
+    "downturn_chart.jpg": {"widths": (480, 800, 1200), "formats": ("avif", "webp", "jpeg")},
+    "gears.png": {"widths": (320,), "formats": ("webp", "jpeg"), "grayscale": True},
+}
+
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg", "png": "image/png"}
+EXTENSIONS = {"avif": "avif", "webp": "webp", "jpeg": "jpg", "png": "png"}
+SAVE_OPTIONS = {
+    "avif": {"quality": 50},
+    "webp": {"quality": 80, "method": 6},
+    "jpeg": {"quality": 82, "optimize": True, "progressive": True},
+    "png": {"optimize": True},
+}
+
+
+def _supported_formats(formats):
+    from PIL import features
+
+    return [f for f in formats if f not in ("avif", "webp") or features.check(f)]
+
+
+def _encode(image, fmt):
+    buf = io.BytesIO()
+    image.save(buf, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+    return buf.getvalue()
+
+
+def _cache_key(source_hash, spec):
+    raw = json.dumps([PIPELINE_VERSION, source_hash, spec], sort_keys=True, default=list)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def _process(src, spec, out_dir):
+    from PIL import Image
+
+    variants = {}
+    with Image.open(src) as original:
+        image = original.convert("L" if spec.get("grayscale") else "RGB")
+    widths = sorted({min(w, image.width) for w in spec["widths"]})
+    for width in widths:
+        height = round(image.height * width / image.width)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in _supported_formats(spec["formats"]):
+            data = _encode(resized, fmt)
+            digest = hashlib.sha256(data).hexdigest()[: assets.HASH_LEN]
+            filename = f"{Path(src).stem}-{width}w.{digest}.{EXTENSIONS[fmt]}"
+            target = out_dir / filename
+            if not target.exists():
+                artifacts.atomic_write(target, data)
+            variants[f"{width}w.{fmt}"] = {"file": filename, "width": width, "format": fmt, "bytes": len(data)}
+    return variants
+
+
+def build(specs=SPECS, src_dir=assets.ROOT, out_dir=assets.STATIC_DIR):
+    """Build missing or outdated variants and register them in the asset manifest.
+
+    Holds the same lock as ``assets.build``, so concurrent builds encode each
+    variant once and never lose each other's manifest entries.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    cache_path = out_dir / CACHE_NAME
+    with artifacts.file_lock(out_dir / assets.BUILD_LOCK):
+        try:
+            cache = json.loads(cache_path.read_text())
+        except (OSError, ValueError):
+            cache = {}
+
+        entries = {}
+        for name, spec in specs.items():
+            src = Path(src_dir) / name
+            if not src.exists():
+                continue
+            key = _cache_key(assets.file_digest(src), spec)
+            cached = cache.get(name)
+            fresh = cached and cached["key"] == key and all(
+                (out_dir / v["file"]).exists() for v in cached["variants"].values()
+            )
+            if not fresh:
+                variants = _process(src, spec, out_dir)
+                if cached:
+                    keep = {v["file"] for v in variants.values()}
+                    assets.retire(out_dir, [old["file"] for old in cached["variants"].values()
+                                            if old["file"] not in keep])
+                cached = cache[name] = {"key": key, "source_bytes": src.stat().st_size, "variants": variants}
+            for variant_key, variant in cached["variants"].items():
+                entries[f"{name}@{variant_key}"] = variant["file"]
+
+        artifacts.atomic_write(cache_path, json.dumps(cache, indent=2, sort_keys=True).encode())
+        manifest = _manifest_without_variants(out_dir, specs)
+        manifest.update(entries)
+        assets.write_manifest(out_dir, manifest)
+    return cache
+
+
+def _manifest_without_variants(out_dir, specs):
+    manifest = assets.load_manifest(out_dir)
+    return {k: v for k, v in manifest.items() if k.partition("@")[0] not in specs or "@" not in k}
+
+
+def responsive_image(name, manifest, fallback="", base_url=assets.BASE_URL):
+    """Return ``{"src": url, "sources": {mime: [(width, url), ...]}}`` for a source image.
+
+    Sources are ordered best format first, with the universally supported
+    fallback format last. When the variants have not been built this degrades
+    to the plain fingerprinted file (or ``fallback``) with no sources.
+    """
+    by_format = {}
+    prefix = name + "@"
+    for key, hashed in manifest.items():
+        if key.startswith(prefix):
+            width, fmt = key[len(prefix):].split("w.", 1)
+            by_format.setdefault(fmt, []).append((int(width), f"{base_url}/{hashed}"))
+    if not by_format:
+        return {"src": assets.asset_url(name, manifest, fallback, base_url), "sources": {}}
+
+    sources = {MIME_TYPES[fmt]: sorted(by_format[fmt]) for fmt in MIME_TYPES if fmt in by_format}
+    largest_fallback = list(sources.values())[-1][-1][1]
+    return {"src": largest_fallback, "sources": sources}
+
+
+def report(cache):
+    rows = []
+    for name, entry in sorted(cache.items()):
+        source_bytes = entry["source_bytes"]
+        for key, variant in sorted(entry["variants"].items(), key=lambda kv: (kv[1]["width"], kv[1]["format"])):
+            saved = source_bytes - variant["bytes"]
+            rows.append(
+                f"{name:<20} {key:<12} {variant['bytes']:>9,} B  "
+                f"saved {saved:>9,} B ({100 * saved / source_bytes:5.1f}%) vs {source_bytes:,} B source"
+            )
+    return "\n".join(rows)
+
+
+if __name__ == "__main__":
+    from benchmark3x import charts
+
+    charts.ensure_regime_chart()
+    assets.build()
+    print(report(build()))
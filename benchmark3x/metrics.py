@@ -0,0 +1,344 @@
+"""In-process metrics for the Streamlit app, served as Prometheus text.
+
+    REGISTRY.histogram("b3x_render_seconds", "...", ("function",))
+    with metrics.timed("render_landing_page"): ...
+    metrics.start_server()          # GET http://127.0.0.1:9108/metrics
+
+Recording is a ``perf_counter`` pair, a bisect over the bucket bounds and
+an increment under a per-metric lock (a few microseconds), so it stays on
+in production. Values that already live elsewhere (cache counters, open
+sessions) are read by collectors only when the endpoint is scraped.
+
+With ``B3X_PROFILER=1`` the endpoint also serves ``/debug/profile``: it
+samples every thread's stack for a few seconds and returns collapsed stacks
+(``frame;frame;frame count`` lines, the input of flamegraph tools). Nothing
+is sampled until it is requested.
+"""
+import asyncio
+import bisect
+import collections
+import functools
+import os
+import sys
+import threading
+import time
+
+from benchmark3x import httpd
+
+PORT = int(os.environ.get("B3X_METRICS_PORT", 9108))  # 0 disables the endpoint
+PROFILER = os.environ.get("B3X_PROFILER", "") == "1"
+PROFILE_MAX_SECONDS = 60
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+# --- METRIC TYPES ---
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _label_text(self, key, extra=""):
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values = collections.defaultdict(float)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] += amount
+
+    def set_total(self, value, **labels):
+        """Mirror a total counted elsewhere (read by a collector at scrape time)."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._label_text(key)} {_number(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+    set = Counter.set_total
+
+
+class Histogram(_Metric):
+    """Cumulative buckets as Prometheus expects; per label set ``[counts..., sum]``."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=TIME_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def count(self, **labels):
+        series = self._series.get(self._key(labels))
+        return sum(series[:-1]) if series else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series[:-1]):
+                running += n
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                labels = self._label_text(key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {running}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {running}")
+        return lines
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+# --- REGISTRY ---
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labels, **kwargs)
+            elif not isinstance(metric, cls) or metric.labels != tuple(labels):
+                raise ValueError(f"metric {name} already registered differently")
+            return metric
+
+    def counter(self, name, help, labels=()):
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help, labels=()):
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name, help, labels=(), buckets=TIME_BUCKETS):
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def collector(self, fn):
+        """Call ``fn()`` on every scrape, before rendering (to set gauges from live state)."""
+        with self._lock:
+            self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        for fn in list(self._collectors):
+            try:
+                fn()
+            except Exception:
+                pass  # a broken collector must not take the endpoint down
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode()
+
+
+REGISTRY = Registry()
+SECONDS = REGISTRY.histogram("b3x_function_seconds", "Time spent in instrumented app functions.", ("function",))
+RERUN_SECONDS = REGISTRY.histogram("b3x_rerun_seconds", "Page renders by route, router included.", ("page",))
+HTML_BYTES = REGISTRY.histogram("b3x_html_bytes", "HTML/CSS emitted per page render, by page.", ("page",), BYTE_BUCKETS)
+CACHE_LOOKUPS = REGISTRY.counter("b3x_cache_lookups_total", "Lookups of instrumented caches.", ("cache", "result"))
+SESSIONS = REGISTRY.gauge("b3x_sessions", "Streamlit sessions connected to this process.")
+
+
+# --- RECORDING ---
+class timed:
+    """Context manager and decorator recording the elapsed time under ``function``."""
+
+    __slots__ = ("function", "histogram", "_start")
+
+    def __init__(self, function, histogram=SECONDS):
+        self.function = function
+        self.histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self._start, function=self.function)
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.histogram.observe(time.perf_counter() - start, function=self.function)
+        return wrapper
+
+
+def cached(name, cache):
+    """Wrap ``cache`` (e.g. ``st.cache_resource``) so lookups count as hits or misses.
+
+    Misses are the calls that reach the function body; its run time is
+    recorded under ``name`` too.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def build(*args, **kwargs):
+            build.missed.flag = True
+            with timed(name):
+                return fn(*args, **kwargs)
+        build.missed = threading.local()
+        inner = cache(build)
+
+        @functools.wraps(fn)
+        def lookup(*args, **kwargs):
+            build.missed.flag = False
+            result = inner(*args, **kwargs)
+            CACHE_LOOKUPS.inc(cache=name, result="miss" if build.missed.flag else "hit")
+            return result
+        lookup.clear = getattr(inner, "clear", None)
+        return lookup
+    return decorate
+
+
+def count_lookups(name, hits, misses):
+    """Mirror hit/miss counters an object keeps itself (call from a collector)."""
+    CACHE_LOOKUPS.set_total(hits, cache=name, result="hit")
+    CACHE_LOOKUPS.set_total(misses, cache=name, result="miss")
+
+
+_run = threading.local()
+
+
+class route:
+    """One script run of ``page``: records its duration and the HTML it emitted."""
+
+    __slots__ = ("page", "_start")
+
+    def __init__(self, page):
+        self.page = page
+
+    def __enter__(self):
+        _run.html_bytes = 0
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        RERUN_SECONDS.observe(time.perf_counter() - self._start, page=self.page)
+        HTML_BYTES.observe(_run.html_bytes, page=self.page)
+        _run.html_bytes = None
+
+
+def emitted(n_bytes):
+    """Count ``n_bytes`` of HTML towards the current script run, if there is one."""
+    if getattr(_run, "html_bytes", None) is not None:
+        _run.html_bytes += n_bytes
+
+
+# --- SAMPLING PROFILER ---
+def profile(seconds, hz=100, exclude=None):
+    """Collapsed stacks of all threads sampled ``hz`` times a second for ``seconds``."""
+    exclude = exclude or threading.get_ident()
+    counts = collections.Counter()
+    interval = 1.0 / hz
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == exclude:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            counts[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
+
+
+# --- ENDPOINT ---
+def make_handler(registry=REGISTRY, profiler=PROFILER):
+    async def handler(request):
+        if request.path == "/metrics":
+            headers = {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+            return httpd.Response(200, registry.render(), headers)
+        if request.path == "/debug/profile" and profiler:
+            try:
+                seconds = min(float(request.arg("seconds", "5")), PROFILE_MAX_SECONDS)
+                hz = min(max(int(request.arg("hz", "100")), 1), 1000)
+            except ValueError:
+                return httpd.text_response(400, "Bad Request")
+            return httpd.text_response(200, await asyncio.to_thread(profile, seconds, hz))
+        if request.path == "/healthz":
+            return httpd.text_response(200, "ok")
+        return httpd.text_response(404, "Not Found")
+
+    return handler
+
+
+def start_server(host="127.0.0.1", port=PORT, registry=REGISTRY, profiler=PROFILER):
+    """Serve the registry from a daemon thread; returns the thread, or None when disabled or taken."""
+    if not port:
+        return None
+    started = threading.Event()
+    failed = []
+
+    async def serve():
+        try:
+            server = await httpd.start_server(make_handler(registry, profiler), host, port)
+        except OSError as e:
+            # Another app process on this machine already serves the port.
+            failed.append(e)
+            started.set()
+            return
+        started.set()
+        async with server:
+            await server.serve_forever()
+
+    thread = threading.Thread(target=asyncio.run, args=(serve(),), name="b3x-metrics", daemon=True)
+    thread.start()
+    started.wait(5)
+    return None if failed else thread
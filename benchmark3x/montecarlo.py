@@ -0,0 +1,346 @@
+"""Monte Carlo volatility decay and position sizing for the 2x/3x products.
+
+    result = simulate(position=0.5, years=10, paths=20_000)
+    result["scenarios"]["SPXL"]["filtered"]["ruin_probability"]
+
+The underlying is simulated as a two-state (calm / stressed) market: daily
+returns for all paths are drawn as one time-major 2-D array, and the
+leveraged product compounds ``leverage`` times them with daily reset
+(``backtest.leveraged_returns``), so volatility decay shows up on its own.
+Each product is run unfiltered (always invested) and behind the volatility
+filter (in the product only while the 20-day realized volatility of the path
+is below the Choppy threshold, decided at the previous close). ``position``
+is the fraction of the account kept in the product, rebalanced daily, the
+rest in cash.
+
+Paths are generated in fixed blocks with their own seeds, so results do not
+depend on how the run is split: chunks of blocks sized to ``memory_cap`` go
+to a process pool, and only per-path summaries come back. Results are
+memoized by their parameters in this process and in the artifact cache, so
+the calculator answers a repeated question without simulating.
+
+``simulate()`` runs on one pool per process (``B3X_MC_WORKERS`` workers) and
+takes memory for each chunk from a process-wide budget of ``MEMORY_CAP``, so
+concurrent users of the app queue for the same CPUs and memory instead of
+each starting their own pool.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import numpy as np
+
+from benchmark3x import artifacts, backtest, regime
+
+MEMORY_CAP = int(os.environ.get("B3X_MC_MEMORY_MB", 512)) * 2 ** 20  # per process, all simulations together
+POOL_WORKERS = int(os.environ.get("B3X_MC_WORKERS", os.cpu_count() or 1))
+BLOCK_PATHS = 250  # unit of seeding; results are identical for any chunking
+BYTES_PER_STEP = 32  # measured peak working set per path per day
+DTYPE = np.float32  # ample for compounding a few thousand days; half the memory traffic
+QUANTILES = (0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+
+DEFAULTS = {
+    "position": 1.0,         # fraction of the account in the product
+    "years": 10,
+    "paths": 20_000,
+    "products": ["SSO", "SPXL"],
+    "ruin": 0.5,             # ruined once equity falls to this fraction of the start
+    "seed": 0,
+    # Underlying: annualized drift/volatility per state and daily switch probabilities.
+    "calm_drift": 0.16,
+    "calm_vol": 0.12,
+    "stress_drift": -0.20,
+    "stress_vol": 0.40,
+    "p_stress": 1 / 250,
+    "p_calm": 1 / 40,
+    # Filter
+    "window": 20,
+    "filter_vol": regime.CHOPPY_VOL,
+    "financing_rate": 0.0,
+}
+
+
+# --- SIMULATION ---
+def market_returns(seeds, days, params):
+    """Daily underlying returns, shape ``(days, paths)``, one block of paths per seed."""
+    per_day = backtest.TRADING_DAYS
+    uniform, normal = [], []
+    for seed in seeds:
+        rng = np.random.default_rng(seed)
+        uniform.append(rng.random((days, BLOCK_PATHS), dtype=DTYPE))
+        normal.append(rng.standard_normal((days, BLOCK_PATHS), dtype=DTYPE))
+    u = np.concatenate(uniform, axis=1)
+    z = np.concatenate(normal, axis=1)
+    del uniform, normal
+
+    # Two-state Markov chain per path; the loop runs over days, vectorized over paths.
+    stressed = np.empty(u.shape, dtype=bool)
+    state = np.zeros(u.shape[1], dtype=bool)
+    for t in range(days):
+        state = np.where(state, u[t] >= params["p_calm"], u[t] < params["p_stress"])
+        stressed[t] = state
+    del u
+
+    vol = np.array([params["calm_vol"], params["stress_vol"]], dtype=DTYPE) / math.sqrt(per_day)
+    drift = np.array([params["calm_drift"], params["stress_drift"]], dtype=DTYPE) / per_day
+    index = stressed.view(np.uint8)
+    z *= vol.take(index)
+    z += drift.take(index)
+    np.maximum(z, -1.0, out=z)
+    return z
+
+
+def filter_held(returns, window, threshold, periods_per_year=backtest.TRADING_DAYS):
+    """In the product over day ``t`` when the trailing realized volatility at ``t - 1`` is below ``threshold``.
+
+    Same rolling estimate as ``regime.rolling_volatility``, along axis 0 of a 2-D array.
+    """
+    r = np.log1p(returns)
+    r -= r.mean(axis=0)
+    c = np.zeros((r.shape[0] + 1, r.shape[1]), dtype=r.dtype)
+    np.cumsum(r, axis=0, out=c[1:])
+    s1 = c[window:] - c[:-window]
+    np.multiply(r, r, out=r)
+    np.cumsum(r, axis=0, out=c[1:])
+    del r
+    var = c[window:] - c[:-window]
+    var -= s1 * s1 / window
+    var *= periods_per_year / (window - 1)
+    # vol[k] covers returns k .. k + window - 1 and is known after that day closes.
+    held = np.zeros(returns.shape, dtype=bool)
+    held[window:] = var[:-1] < threshold * threshold
+    return held
+
+
+def path_summaries(returns):
+    """Terminal wealth, max drawdown and the lowest equity of each path (per column)."""
+    equity = np.add(returns, 1.0)
+    np.cumprod(equity, axis=0, out=equity)
+    terminal = equity[-1].copy()
+    low = np.minimum(equity.min(axis=0), 1.0)
+    peak = np.maximum.accumulate(equity, axis=0)
+    np.maximum(peak, 1.0, out=peak)
+    np.divide(equity, peak, out=equity)
+    drawdown = equity.min(axis=0) - 1.0
+    return terminal, np.minimum(drawdown, 0.0), low
+
+
+def simulate_chunk(seeds, params):
+    """Per-path summaries for the blocks seeded by ``seeds`` (pool worker)."""
+    days = int(round(params["years"] * backtest.TRADING_DAYS))
+    returns = market_returns(seeds, days, params)
+    held = filter_held(returns, params["window"], params["filter_vol"])
+    out = {"underlying": path_summaries(returns * params["position"])}
+    for product in params["products"]:
+        spec = backtest.PRODUCTS[product]
+        lev = backtest.leveraged_returns(returns, spec["leverage"], spec["expense_ratio"], params["financing_rate"])
+        lev *= params["position"]
+        out[f"{product}/unfiltered"] = path_summaries(lev)
+        lev *= held
+        out[f"{product}/filtered"] = path_summaries(lev)
+        del lev
+    return out
+
+
+def _distribution(terminal, drawdown, low, ruin, years):
+    qs = list(QUANTILES)
+    cagr = np.power(np.maximum(terminal, 0.0), 1.0 / years) - 1.0
+    return {
+        "terminal_wealth": dict(zip(map(str, qs), np.quantile(terminal, qs).tolist())),
+        "max_drawdown": dict(zip(map(str, qs), np.quantile(drawdown, qs).tolist())),
+        "median_cagr": float(np.median(cagr)),
+        "mean_terminal_wealth": float(terminal.mean()),
+        "probability_of_loss": float((terminal < 1.0).mean()),
+        "ruin_probability": float((low <= ruin).mean()),
+    }
+
+
+def chunk_blocks(days, workers, memory_cap=MEMORY_CAP):
+    """Blocks per chunk so ``workers`` chunks in flight stay within ``memory_cap``."""
+    per_block = days * BLOCK_PATHS * BYTES_PER_STEP
+    return max(1, memory_cap // (max(workers, 1) * per_block))
+
+
+# --- SHARED POOL AND MEMORY BUDGET ---
+class MemoryBudget:
+    """Bytes that chunks in flight may use, across every simulation in the process."""
+
+    def __init__(self, total):
+        self.total = total
+        self.available = total
+        self._cond = threading.Condition()
+
+    def acquire(self, n):
+        n = min(n, self.total)  # one oversized chunk still runs, alone
+        with self._cond:
+            self._cond.wait_for(lambda: self.available >= n)
+            self.available -= n
+        return n
+
+    def release(self, n):
+        with self._cond:
+            self.available += n
+            self._cond.notify_all()
+
+
+BUDGET = MemoryBudget(MEMORY_CAP)
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def shared_pool(workers=POOL_WORKERS):
+    """The process-wide simulation pool, created on first use; None with a single worker."""
+    global _pool
+    if workers <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # forkserver: the caller may be a threaded server (the Streamlit app), which must not be forked.
+            _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("forkserver"))
+        return _pool
+
+
+def _discard_pool(pool):
+    """Drop a broken shared pool so the next simulation starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _chunk_bytes(days, n_seeds):
+    return days * n_seeds * BLOCK_PATHS * BYTES_PER_STEP
+
+
+def run(params, workers=1, memory_cap=MEMORY_CAP, pool=None, budget=None):
+    """Simulate without memoization; returns the result dict.
+
+    With ``pool`` (and its worker count as ``workers``) chunks go to that
+    pool; otherwise a private pool of ``workers`` is started. With ``budget``
+    each chunk first reserves its memory from it.
+    """
+    days = int(round(params["years"] * backtest.TRADING_DAYS))
+    n_blocks = max(1, math.ceil(params["paths"] / BLOCK_PATHS))
+    seeds = np.random.SeedSequence(params["seed"]).spawn(n_blocks)
+    per_chunk = chunk_blocks(days, workers, memory_cap)
+    chunks = [seeds[i:i + per_chunk] for i in range(0, n_blocks, per_chunk)]
+
+    if pool is not None or (workers > 1 and len(chunks) > 1):
+        private = pool is None
+        if private:
+            # forkserver: the caller may be a threaded server (the Streamlit app), which must not be forked.
+            context = multiprocessing.get_context("forkserver")
+            pool = ProcessPoolExecutor(min(workers, len(chunks)), mp_context=context)
+        try:
+            futures = []
+            for chunk in chunks:
+                reserved = budget.acquire(_chunk_bytes(days, len(chunk))) if budget else 0
+                future = pool.submit(simulate_chunk, chunk, params)
+                if budget:
+                    future.add_done_callback(lambda _, n=reserved: budget.release(n))
+                futures.append(future)
+            parts = [future.result() for future in futures]
+        finally:
+            if private:
+                pool.shutdown(cancel_futures=True)
+    else:
+        parts = []
+        for chunk in chunks:
+            reserved = budget.acquire(_chunk_bytes(days, len(chunk))) if budget else 0
+            try:
+                parts.append(simulate_chunk(chunk, params))
+            finally:
+                if budget:
+                    budget.release(reserved)
+
+    summaries = {
+        name: [np.concatenate([p[name][k] for p in parts]) for k in range(3)] for name in parts[0]
+    }
+    scenarios = {}
+    for name, (terminal, drawdown, low) in summaries.items():
+        dist = _distribution(terminal, drawdown, low, params["ruin"], params["years"])
+        product, _, mode = name.partition("/")
+        scenarios.setdefault(product, {})[mode or "buy_and_hold"] = dist
+    return {"params": params, "paths": n_blocks * BLOCK_PATHS, "days": days, "scenarios": scenarios}
+
+
+# --- MEMOIZATION ---
+_memo = {}
+_memo_lock = threading.Lock()
+MEMO_SIZE = 256
+
+
+def _version():
+    here = Path(__file__)
+    return artifacts.source_version(here, here.with_name("backtest.py"))
+
+
+def simulate(workers=None, memory_cap=MEMORY_CAP, cache=None, **overrides):
+    """Memoized ``run()``: the same parameters return the stored result."""
+    unknown = set(overrides) - set(DEFAULTS)
+    if unknown:
+        raise TypeError(f"unknown parameters: {sorted(unknown)}")
+    params = dict(DEFAULTS, **overrides)
+    params["products"] = list(params["products"])
+    for name in ("position", "years", "ruin"):
+        params[name] = float(params[name])
+    params["paths"] = int(params["paths"])
+    key = json.dumps(params, sort_keys=True)
+    with _memo_lock:
+        hit = _memo.get(key)
+    if hit is not None:
+        return hit
+
+    def build(path):
+        if workers is None:
+            # Shared pool and budget: concurrent callers queue instead of multiplying CPUs and memory.
+            pool = shared_pool()
+            try:
+                result = run(params, POOL_WORKERS, memory_cap, pool=pool, budget=BUDGET)
+            except BrokenProcessPool:
+                _discard_pool(pool)
+                raise
+        else:
+            result = run(params, workers, memory_cap)
+        artifacts.atomic_write(path, json.dumps(result).encode())
+
+    cache = cache or artifacts.default_cache()
+    path = cache.get_or_build("montecarlo", params, build, ".json", _version())
+    with open(path) as f:
+        result = json.load(f)
+    with _memo_lock:
+        if len(_memo) >= MEMO_SIZE:
+            _memo.pop(next(iter(_memo)))
+        _memo[key] = result
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate volatility decay and ruin risk for a position size.")
+    parser.add_argument("--position", type=float, default=DEFAULTS["position"])
+    parser.add_argument("--years", type=float, default=DEFAULTS["years"])
+    parser.add_argument("--paths", type=int, default=DEFAULTS["paths"])
+    parser.add_argument("--ruin", type=float, default=DEFAULTS["ruin"])
+    parser.add_argument("--seed", type=int, default=DEFAULTS["seed"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    result = simulate(position=args.position, years=args.years, paths=args.paths, ruin=args.ruin,
+                      seed=args.seed, workers=args.workers)
+    print(f"{result['paths']:,} paths x {result['days']:,} days, position {args.position:.0%}")
+    for product, modes in result["scenarios"].items():
+        for mode, d in modes.items():
+            print(f"{product:<10} {mode:<12} median wealth {d['terminal_wealth']['0.5']:6.2f}x  "
+                  f"median CAGR {d['median_cagr']:7.1%}  median max DD {d['max_drawdown']['0.5']:7.1%}  "
+                  f"P(loss) {d['probability_of_loss']:5.1%}  P(ruin) {d['ruin_probability']:5.1%}")
+
+
+if __name__ == "__main__":
+    main()
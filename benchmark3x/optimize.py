@@ -0,0 +1,164 @@
+"""Parameter optimization engine (grid and random search).
+
+Each evaluation runs the regime detector and a backtest for one parameter set.
+Evaluations are spread over a ProcessPoolExecutor; the price array is placed in
+``multiprocessing.shared_memory`` once, and workers map it instead of receiving
+a pickled copy with every task. Results stream back as they complete and are
+memoized on disk by a hash of (parameters, product, data, engine source), so
+overlapping sweeps only evaluate the new points:
+
+    for params, stats in optimize(prices, grid(PARAM_SPACE)):
+        ...
+"""
+import hashlib
+import itertools
+import json
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from benchmark3x import artifacts, backtest, regime
+
+ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = ROOT / ".cache" / "optimize"
+
+PARAM_SPACE = {
+    "window": [10, 20, 40, 60],
+    "choppy_vol": [0.15, 0.18, 0.20, 0.25],
+    "cash_vol": [0.25, 0.30, 0.35, 0.45],
+    "reentry_delay": [0, 1, 3, 5],
+}
+
+
+def grid(space):
+    names = list(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_params(space, n, seed=0):
+    """Sample ``n`` parameter sets; list values are choices, (lo, hi) tuples are uniform ranges."""
+    rng = random.Random(seed)
+    for _ in range(n):
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                lo, hi = values
+                params[name] = rng.randint(lo, hi) if isinstance(lo, int) else rng.uniform(lo, hi)
+            else:
+                params[name] = rng.choice(values)
+        yield params
+
+
+def reentry_signal(labels, delay):
+    """Long only after ``delay + 1`` consecutive Long bars, so re-entries wait out the chop."""
+    long = labels == regime.LONG
+    if delay <= 0:
+        return long.astype(np.int8)
+    run = delay + 1
+    counts = np.concatenate(([0], np.cumsum(long)))
+    signal = np.zeros(long.shape[0], dtype=np.int8)
+    signal[run - 1:] = (counts[run:] - counts[:-run]) == run
+    return signal
+
+
+def evaluate(prices, params, product="SPXL"):
+    detector = regime.RegimeDetector(params["window"], params["choppy_vol"], params["cash_vol"])
+    signal = reentry_signal(detector.fit(prices).labels, params.get("reentry_delay", 0))
+    return backtest.summary(backtest.run_backtest(prices, signal, product))
+
+
+# --- WORKERS ---
+_worker_shm = None
+_worker_prices = None
+
+
+def _attach(name, shape, dtype):
+    global _worker_shm, _worker_prices
+    # Workers share the parent's resource tracker, so attaching here does not
+    # change ownership: the parent unlinks the segment when the sweep ends.
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_prices = np.ndarray(shape, dtype=dtype, buffer=_worker_shm.buf)
+
+
+def _evaluate_batch(batch, product):
+    return [(key, params, evaluate(_worker_prices, params, product)) for key, params in batch]
+
+
+# --- MEMO CACHE ---
+def _version():
+    # Any edit to evaluate() or what it calls invalidates the memoized results.
+    here = Path(__file__)
+    return artifacts.source_version(here, here.with_name("regime.py"), here.with_name("backtest.py"))
+
+
+def _param_key(params, product, data_hash, version):
+    raw = json.dumps([version, product, data_hash, params], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _cache_path(cache_dir, key):
+    return Path(cache_dir) / key[:2] / f"{key}.json"
+
+
+def _load_cached(cache_dir, key):
+    try:
+        return json.loads(_cache_path(cache_dir, key).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _store(cache_dir, key, stats):
+    path = _cache_path(cache_dir, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    artifacts.atomic_write(path, json.dumps(stats).encode())
+
+
+def optimize(prices, param_sets, product="SPXL", workers=None, cache_dir=CACHE_DIR, batch_size=4):
+    """Yield ``(params, stats)`` for every parameter set, memoized results first.
+
+    Uncached sets are evaluated in batches of ``batch_size`` (to amortize IPC on
+    short series) and yielded in completion order.
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    data_hash = hashlib.sha256(prices.tobytes()).hexdigest()
+    version = _version()
+
+    pending = []
+    for params in param_sets:
+        key = _param_key(params, product, data_hash, version)
+        cached = _load_cached(cache_dir, key) if cache_dir else None
+        if cached is not None:
+            yield params, cached
+        else:
+            pending.append((key, params))
+    if not pending:
+        return
+
+    shm = shared_memory.SharedMemory(create=True, size=max(prices.nbytes, 1))
+    try:
+        np.ndarray(prices.shape, dtype=prices.dtype, buffer=shm.buf)[:] = prices
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_attach, initargs=(shm.name, prices.shape, prices.dtype)
+        )
+        try:
+            futures = [pool.submit(_evaluate_batch, batch, product) for batch in batches]
+            for future in as_completed(futures):
+                for key, params, stats in future.result():
+                    if cache_dir:
+                        _store(cache_dir, key, stats)
+                    yield params, stats
+        finally:
+            # A caller that stops iterating early only waits for the batches already running.
+            pool.shutdown(cancel_futures=True)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def best(results, metric="cagr"):
+    return max(results, key=lambda item: item[1][metric])
@@ -0,0 +1,157 @@
+"""Volatility regime detection.
+
+Rolling realized volatility is computed in O(n) from cumulative sums of
+returns and squared returns (no per-window loop), then bucketed into
+Cash / Choppy / Long regimes and merged into interval runs:
+
+    detector = RegimeDetector(window=20).fit(prices)
+    starts, ends, labels = detector.runs()     # half-open [start, end) bar indices
+    detector.update(todays_bars)                # only the new bars are computed
+
+Index ``i`` of the volatility/label arrays refers to ``prices[i]`` (the first
+``window`` bars have no estimate and are labelled UNKNOWN).
+"""
+import numpy as np
+
+UNKNOWN, CASH, CHOPPY, LONG = -1, 0, 1, 2
+REGIME_NAMES = {UNKNOWN: "Unknown", CASH: "Cash", CHOPPY: "Choppy", LONG: "Long"}
+
+# Annualized volatility thresholds.
+CHOPPY_VOL = 0.20
+CASH_VOL = 0.30
+TRADING_DAYS = 252
+
+
+def log_returns(prices):
+    prices = np.asarray(prices, dtype=np.float64)
+    return np.diff(np.log(prices))
+
+
+def rolling_volatility(returns, window, periods_per_year=TRADING_DAYS):
+    """Annualized rolling sample volatility; the first ``window - 1`` values are NaN."""
+    r = np.asarray(returns, dtype=np.float64)
+    n = r.shape[0]
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    # Centre on the mean first so the sum-of-squares difference doesn't lose
+    # precision. Work in preallocated buffers: at millions of rows the cost is
+    # dominated by memory traffic, not arithmetic.
+    r = r - r.mean()
+    c = np.empty(n + 1)
+    c[0] = 0.0
+    np.cumsum(r, out=c[1:])
+    s1 = c[window:] - c[:-window]
+    np.multiply(r, r, out=r)
+    np.cumsum(r, out=c[1:])
+    var = np.subtract(c[window:], c[:-window], out=out[window - 1:])
+    np.multiply(s1, s1, out=s1)
+    s1 /= window
+    var -= s1
+    var *= periods_per_year / (window - 1)
+    np.maximum(var, 0.0, out=var)
+    np.sqrt(var, out=var)
+    return out
+
+
+def classify(volatility, choppy_vol=CHOPPY_VOL, cash_vol=CASH_VOL):
+    vol = np.asarray(volatility)
+    labels = np.full(vol.shape[0], LONG, dtype=np.int8)
+    labels[vol >= choppy_vol] = CHOPPY
+    labels[vol >= cash_vol] = CASH
+    labels[np.isnan(vol)] = UNKNOWN
+    return labels
+
+
+def regime_runs(labels, min_length=1):
+    """Merge consecutive equal labels into half-open ``[start, end)`` runs.
+
+    Returns ``(starts, ends, labels)`` arrays; runs shorter than ``min_length``
+    bars and UNKNOWN runs are dropped.
+    """
+    labels = np.asarray(labels)
+    if labels.shape[0] == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=labels.dtype)
+    change = np.flatnonzero(labels[1:] != labels[:-1]) + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change, [labels.shape[0]]))
+    run_labels = labels[starts]
+    keep = (ends - starts >= min_length) & (run_labels != UNKNOWN)
+    return starts[keep], ends[keep], run_labels[keep]
+
+
+def run_records(starts, ends, labels, index=None):
+    """JSON-friendly list of runs; ``index`` (e.g. dates) maps bar numbers to labels."""
+    records = []
+    for start, end, label in zip(starts.tolist(), ends.tolist(), labels.tolist()):
+        first, last = (start, end - 1) if index is None else (str(index[start]), str(index[end - 1]))
+        records.append({"start": first, "end": last, "regime": REGIME_NAMES[label], "bars": end - start})
+    return records
+
+
+class RegimeDetector:
+    def __init__(self, window=20, choppy_vol=CHOPPY_VOL, cash_vol=CASH_VOL, periods_per_year=TRADING_DAYS):
+        # The rolling standard deviation needs at least two returns.
+        if window < 2:
+            raise ValueError(f"window must be at least 2, got {window}")
+        self.window = window
+        self.choppy_vol = choppy_vol
+        self.cash_vol = cash_vol
+        self.periods_per_year = periods_per_year
+        self._size = 0
+        self._vol = np.empty(0)
+        self._labels = np.empty(0, dtype=np.int8)
+        self._last_price = None
+        self._tail = np.empty(0)  # last window - 1 returns, enough to extend the rolling sums
+
+    @property
+    def volatility(self):
+        return self._vol[:self._size]
+
+    @property
+    def labels(self):
+        return self._labels[:self._size]
+
+    def fit(self, prices):
+        prices = np.asarray(prices, dtype=np.float64)
+        self._size = 0
+        self._last_price = None
+        self._tail = np.empty(0)
+        return self.update(prices)
+
+    def update(self, new_bars):
+        """Append new prices, computing only the bars that were added."""
+        new_bars = np.asarray(new_bars, dtype=np.float64)
+        if new_bars.shape[0] == 0:
+            return self
+        if self._last_price is None:
+            returns = log_returns(new_bars)
+            head = np.array([np.nan])  # the very first bar has no return
+        else:
+            returns = log_returns(np.concatenate(([self._last_price], new_bars)))
+            head = np.empty(0)
+
+        # Rolling windows that straddle the old/new boundary need the old tail.
+        joined = np.concatenate((self._tail, returns))
+        vol = rolling_volatility(joined, self.window, self.periods_per_year)[self._tail.shape[0]:]
+        vol = np.concatenate((head, vol))
+        self._append(vol, classify(vol, self.choppy_vol, self.cash_vol))
+
+        self._tail = joined[-(self.window - 1):] if self.window > 1 else np.empty(0)
+        self._last_price = new_bars[-1]
+        return self
+
+    def runs(self, min_length=1):
+        return regime_runs(self.labels, min_length)
+
+    def _append(self, vol, labels):
+        needed = self._size + vol.shape[0]
+        if needed > self._vol.shape[0]:
+            # Grow geometrically so daily appends stay amortized O(new bars).
+            capacity = max(needed, 2 * self._vol.shape[0], 256)
+            self._vol = np.resize(self._vol, capacity)
+            self._labels = np.resize(self._labels, capacity)
+        self._vol[self._size:needed] = vol
+        self._labels[self._size:needed] = labels
+        self._size = needed
@@ -0,0 +1,267 @@
+"""Low-latency JSON signal API for Enterprise clients.
+
+Runs next to the Streamlit app:
+
+    python -m benchmark3x.signal_api --port 8503 --history signals.json --model .cache/models/forest.npz
+
+Endpoints:
+
+    GET  /v1/signal                    current SPXL/SSO signal (ETag / If-None-Match)
+    GET  /v1/signal/history            recent signals, newest last
+    GET  /v1/signal/wait?since=<seq>   long-poll: returns when seq advances (204 on timeout)
+    GET  /v1/signal/stream             server-sent events, one event per publication
+    POST /v1/signal                    publish (requires B3X_PUBLISH_TOKEN bearer token)
+    GET  /v1/signal/model              the classifier's call on the newest feature row (with --model)
+
+Response bodies are serialized once per publication and swapped in with a
+single attribute assignment, so reads never build JSON or take a lock.
+Publications are appended to the ``--history`` file before they are served,
+so a restart picks them up again. The ``--model`` forest is loaded once per
+process (``forest.get_model``); restart to pick up a newly published one.
+"""
+import argparse
+import asyncio
+import collections
+import datetime
+import hashlib
+import hmac
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+from benchmark3x import artifacts, httpd
+
+PUBLISH_TOKEN = os.environ.get("B3X_PUBLISH_TOKEN", "")
+PRODUCTS = ("SPXL", "SSO")
+HISTORY_LIMIT = 252
+LONG_POLL_MAX = 60.0
+SSE_HEARTBEAT = 15.0
+JSON_HEADERS = {"Content-Type": "application/json", "Cache-Control": "no-cache"}
+
+
+class Snapshot:
+    __slots__ = ("seq", "current", "history", "etag", "history_etag", "event")
+
+    def __init__(self, seq, current, history, etag, history_etag, event):
+        self.seq = seq
+        self.current = current
+        self.history = history
+        self.etag = etag
+        self.history_etag = history_etag
+        self.event = event
+
+
+def _etag(body):
+    return '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+
+
+class SignalBoard:
+    """Holds the published signals and their pre-serialized responses."""
+
+    def __init__(self, history=(), history_limit=HISTORY_LIMIT):
+        self._history = collections.deque(maxlen=history_limit)
+        self._changed = asyncio.Event()
+        self._seq = 0
+        self.snapshot = None
+        for record in history:
+            self._history.append(dict(record))
+        self._rebuild()
+
+    @staticmethod
+    def stamp(record):
+        """A copy of ``record`` with its ``published_at`` time filled in."""
+        record = dict(record)
+        record.setdefault("published_at", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+        return record
+
+    def publish(self, record):
+        """Record a new signal, e.g. ``{"date": "2025-06-02", "SPXL": 1, "SSO": 1}``."""
+        self._history.append(self.stamp(record))
+        self._rebuild()
+        # Wake every long-poll and SSE waiter, then start a fresh event for the next publication.
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _rebuild(self):
+        self._seq += 1
+        current = self._history[-1] if self._history else None
+        current_body = json.dumps({"seq": self._seq, "signal": current}, separators=(",", ":")).encode()
+        history_body = json.dumps(
+            {"seq": self._seq, "signals": list(self._history)}, separators=(",", ":")
+        ).encode()
+        sse = b"id: %d\nevent: signal\ndata: %s\n\n" % (self._seq, current_body)
+        # One assignment swaps every pre-built body at once.
+        self.snapshot = Snapshot(
+            self._seq, current_body, history_body, _etag(current_body), _etag(history_body), sse
+        )
+
+    async def wait_for_change(self, since, timeout):
+        changed = self._changed
+        if self.snapshot.seq > since:
+            return True
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+def check_signal(record):
+    """Raise ValueError unless ``record`` is ``{"date": "YYYY-MM-DD", "SPXL": 0/1, "SSO": 0/1, ...}``."""
+    if not isinstance(record, dict):
+        raise ValueError("signal must be a JSON object")
+    if not isinstance(record.get("date"), str):
+        raise ValueError("date must be a YYYY-MM-DD string")
+    datetime.date.fromisoformat(record["date"])
+    for product in PRODUCTS:
+        value = record.get(product)
+        # Exactly int: not JSON true/false (bool subclasses int) and not 1.0.
+        if type(value) is not int or value not in (0, 1):
+            raise ValueError(f"{product} must be 0 or 1")
+    return record
+
+
+def _cached_json(request, body, etag):
+    headers = dict(JSON_HEADERS, ETag=etag)
+    if httpd.etag_matches(request, etag):
+        return httpd.Response(304, headers=headers)
+    return httpd.Response(200, body, headers)
+
+
+async def _event_stream(board, since):
+    if board.snapshot.seq > since:
+        yield board.snapshot.event
+    seq = board.snapshot.seq
+    while True:
+        if await board.wait_for_change(seq, SSE_HEARTBEAT):
+            snapshot = board.snapshot
+            seq = snapshot.seq
+            yield snapshot.event
+        else:
+            yield b": keep-alive\n\n"
+
+
+def make_handler(board, publish_token=PUBLISH_TOKEN, history=None, model_signal=None):
+    """``history`` (a HistoryFile) stores each publication before it is served;
+    ``model_signal()`` returns the classifier's latest call (blocking, run off the loop)."""
+    def authorized(request):
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        return bool(publish_token) and hmac.compare_digest(supplied, publish_token)
+
+    async def handler(request):
+        path = request.path
+        if path == "/v1/signal":
+            if request.method == "POST":
+                if not authorized(request):
+                    return httpd.text_response(403, "Forbidden")
+                try:
+                    record = board.stamp(check_signal(json.loads(request.body)))
+                except ValueError:  # also UnicodeDecodeError and JSONDecodeError
+                    return httpd.text_response(400, "Invalid signal JSON")
+                if history is not None:
+                    try:
+                        await asyncio.to_thread(history.append, record)
+                    except OSError:
+                        return httpd.text_response(500, "Could not store the signal")
+                board.publish(record)
+                return httpd.Response(204)
+        if request.method not in ("GET", "HEAD"):
+            return httpd.text_response(405, "Method Not Allowed")
+        if path == "/v1/signal":
+            snapshot = board.snapshot
+            return _cached_json(request, snapshot.current, snapshot.etag)
+        if path == "/v1/signal/model":
+            if model_signal is None:
+                return httpd.text_response(404, "No model configured")
+            try:
+                latest = await asyncio.to_thread(model_signal)
+            except (OSError, ValueError):
+                return httpd.text_response(503, "Model unavailable")
+            return httpd.Response(200, json.dumps({"signal": latest}, separators=(",", ":")).encode(), JSON_HEADERS)
+        if path == "/v1/signal/history":
+            snapshot = board.snapshot
+            return _cached_json(request, snapshot.history, snapshot.history_etag)
+        if path == "/v1/signal/wait":
+            try:
+                since = int(request.arg("since", "0"))
+                timeout = float(request.arg("timeout", LONG_POLL_MAX))
+                if not math.isfinite(timeout):
+                    raise ValueError(timeout)
+                timeout = min(timeout, LONG_POLL_MAX)
+            except ValueError:
+                return httpd.text_response(400, "Bad Request")
+            if await board.wait_for_change(since, timeout):
+                snapshot = board.snapshot
+                return httpd.Response(200, snapshot.current, dict(JSON_HEADERS, ETag=snapshot.etag))
+            return httpd.Response(204, headers={"Cache-Control": "no-cache"})
+        if path == "/v1/signal/stream":
+            try:
+                since = int(request.headers.get("last-event-id") or request.arg("since", "0"))
+            except ValueError:
+                return httpd.text_response(400, "Bad Request")
+            headers = {"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+            return httpd.StreamResponse(_event_stream(board, since), headers=headers)
+        if path == "/healthz":
+            return httpd.text_response(200, "ok")
+        return httpd.text_response(404, "Not Found")
+
+    return handler
+
+
+def load_history(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+class HistoryFile:
+    """The ``--history`` JSON list, rewritten atomically with each publication appended."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        with self._lock:
+            records = load_history(self.path)
+            records.append(record)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            artifacts.atomic_write(self.path, json.dumps(records, indent=1).encode())
+
+
+def _model_signal(model_path, feature_dir=None):
+    # numpy and the model are only imported when scoring is enabled.
+    from benchmark3x import features, forest, walkforward
+
+    store = features.FeatureStore(feature_dir or features.FEATURE_DIR)
+    lock = threading.Lock()
+
+    def model_signal():
+        with lock:  # refresh() swaps the store's column maps
+            return walkforward.latest_signal(store.refresh(), forest.get_model(model_path))
+
+    return model_signal
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the SPXL/SSO signal API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8503)
+    parser.add_argument("--history", help="JSON file with a list of past signal records; publications are appended")
+    parser.add_argument("--model", help="packed forest (python -m benchmark3x.walkforward) for /v1/signal/model")
+    parser.add_argument("--features", help="feature store the model scores (default: B3X_FEATURE_DIR)")
+    args = parser.parse_args(argv)
+
+    board = SignalBoard(load_history(args.history) if args.history else ())
+    history = HistoryFile(args.history) if args.history else None
+    model_signal = _model_signal(args.model, args.features) if args.model else None
+    httpd.serve(make_handler(board, history=history, model_signal=model_signal), args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Pre-rendered static landing page.
+
+The landing page has no dynamic content, so instead of running the Streamlit
+script for every visit it can be rendered once to ``dist/index.html`` (plus
+gzip and brotli siblings) and served by a small static handler:
+
+    python -m benchmark3x.site build
+    python -m benchmark3x.site serve --port 8080 --streamlit-url http://localhost:8501
+
+The handler serves the landing page and ``/assets/``; any other ``?page=``
+(login, dashboard) is redirected to the Streamlit server.
+"""
+import argparse
+import gzip
+import hashlib
+import os
+from pathlib import Path
+
+from benchmark3x import artifacts, assets, charts, httpd, images, styles, templates
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always produced
+    brotli = None
+
+ROOT = Path(__file__).resolve().parent.parent
+DIST_DIR = ROOT / "dist"
+STREAMLIT_URL = os.environ.get("B3X_STREAMLIT_URL", "http://localhost:8501")
+ASSET_PREFIX = "/assets"
+# Only these ``?page=`` values are redirected; anything else would be echoed into Location.
+STREAMLIT_PAGES = ("login", "dashboard")
+HTML_CACHE_CONTROL = "public, max-age=300"
+
+# Outside Streamlit there is no app chrome to reset, only the browser defaults.
+STANDALONE_CSS = """
+<style>
+html, body { margin: 0; padding: 0; }
+body { font-family: "SF Pro Display", -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif; }
+</style>
+"""
+
+
+def render_landing_html(manifest, base_url=ASSET_PREFIX):
+    def image(name, fallback=""):
+        return images.responsive_image(name, manifest, fallback, base_url)
+
+    bundles = styles.load(manifest, base_url=base_url)
+    header = templates.header_html(assets.asset_url("logo_R1.jpg", manifest, "", base_url))
+    body = templates.landing_body(
+        header,
+        image("computer.jpg", templates.COMPUTER_FALLBACK),
+        image("downturn_chart.jpg", templates.CHART_FALLBACK),
+        charts.load_landing_stats(),
+    )
+    return (
+        "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n"
+        "<meta charset=\"utf-8\">\n"
+        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">\n"
+        "<title>Benchmark3x</title>\n"
+        + STANDALONE_CSS
+        + bundles["shared"]
+        + bundles["landing_critical"]
+        + "\n</head>\n<body>\n"
+        + body
+        + bundles["landing_deferred"]
+        + "\n</body>\n</html>\n"
+    )
+
+
+def build(out_dir=DIST_DIR):
+    """Render index.html once and write its precompressed variants."""
+    charts.ensure_regime_chart()
+    assets.build()
+    images.build()
+    styles.build(base_url=ASSET_PREFIX)
+    html = render_landing_html(assets.load_manifest()).encode()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    outputs = {"index.html": html, "index.html.gz": gzip.compress(html, 9, mtime=0)}
+    if brotli is not None:
+        outputs["index.html.br"] = brotli.compress(html, quality=11, mode=brotli.MODE_TEXT)
+    else:
+        (out_dir / "index.html.br").unlink(missing_ok=True)
+    for name, data in outputs.items():
+        artifacts.atomic_write(out_dir / name, data)
+    return {name: len(data) for name, data in outputs.items()}
+
+
+# --- STATIC HANDLER ---
+def _accepted_encodings(header):
+    accepted = set()
+    for part in header.split(","):
+        token, _, params = part.partition(";")
+        name, _, q = params.strip().partition("=")
+        try:
+            if name.strip() == "q" and float(q) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+def make_handler(dist_dir=DIST_DIR, streamlit_url=STREAMLIT_URL):
+    dist_dir = Path(dist_dir)
+    html = (dist_dir / "index.html").read_bytes()
+    etag_base = hashlib.sha256(html).hexdigest()[:16]
+    # Preference order: brotli, gzip, identity.
+    variants = []
+    for suffix, encoding in ((".br", "br"), (".gz", "gzip")):
+        path = dist_dir / ("index.html" + suffix)
+        if path.exists():
+            variants.append((encoding, path.read_bytes()))
+    asset_handler = assets.make_handler(prefix=ASSET_PREFIX + "/")
+    streamlit_url = streamlit_url.rstrip("/")
+
+    def handler(request):
+        if request.path.startswith(ASSET_PREFIX + "/"):
+            return asset_handler(request)
+        if request.method not in ("GET", "HEAD"):
+            return httpd.text_response(405, "Method Not Allowed")
+        if request.path not in ("/", "/index.html"):
+            return httpd.text_response(404, "Not Found")
+
+        page = request.arg("page", "landing")
+        if page in STREAMLIT_PAGES:
+            # Login and dashboard pages still need the Streamlit runtime.
+            location = f"{streamlit_url}/?page={page}"
+            return httpd.Response(302, headers={"Location": location, "Cache-Control": "no-store"})
+        if page != "landing":
+            return httpd.text_response(404, "Not Found")
+
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding, body = next(((e, b) for e, b in variants if e in accepted), (None, html))
+        etag = f'"{etag_base}-{encoding}"' if encoding else f'"{etag_base}"'
+        headers = {"ETag": etag, "Cache-Control": HTML_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        if httpd.etag_matches(request, etag):
+            return httpd.Response(304, headers=headers)
+        headers["Content-Type"] = "text/html; charset=utf-8"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return httpd.Response(200, body, headers)
+
+    return handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or serve the static landing page.")
+    parser.add_argument("command", choices=("build", "serve"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--streamlit-url", default=STREAMLIT_URL)
+    args = parser.parse_args(argv)
+
+    sizes = build()
+    for name, size in sizes.items():
+        print(f"{name}: {size:,} bytes")
+    if args.command == "serve":
+        httpd.serve(make_handler(streamlit_url=args.streamlit_url), args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""Build-time CSS stage: minified, deduplicated stylesheets per page.
+
+Compiles the ``<style>`` templates once instead of sending them as written on
+every render:
+
+- the hero's 40 gradient layers become one fingerprinted SVG background
+  (``hero-bars.svg`` in the asset manifest), painted as a single image;
+- comments and whitespace go, values are shortened (``#ffffff`` -> ``#fff``,
+  ``0.4`` -> ``.4``), repeated rules and declarations are dropped, and page
+  sheets leave out rules the shared sheet already has;
+- the landing sheet is split into critical rules (those that can match the
+  header and hero, sent before the page body) and the rest (sent after it).
+
+Bundles are written to ``static/styles.json`` and reused while the templates,
+this module and the referenced assets are unchanged:
+
+    python -m benchmark3x.styles        # build and report CSS before/after
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from benchmark3x import artifacts, assets, images, templates
+
+STYLES_NAME = "styles.json"
+BARS_NAME = "hero-bars.svg"
+PAGES = ("shared", "landing_critical", "landing_deferred", "login", "dashboard")
+
+_STYLE_BLOCK = re.compile(r"<style>(.*?)</style>", re.S)
+_STRING_OR_COMMENT = re.compile(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')|/\*.*?\*/', re.S)
+
+
+# --- MINIFY ---
+def _split_top(text, sep):
+    """Split on ``sep`` outside strings and parentheses (data URIs contain ``;``)."""
+    parts, depth, quote_char, start = [], 0, None, 0
+    for i, c in enumerate(text):
+        if quote_char:
+            if c == quote_char and text[i - 1] != "\\":
+                quote_char = None
+        elif c in "\"'":
+            quote_char = c
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _value(value):
+    out = []
+    for i, part in enumerate(re.split(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')', value)):
+        if i % 2:  # quoted string, kept as written
+            out.append(part)
+            continue
+        part = re.sub(r"\s+", " ", part)
+        part = re.sub(r"\s*([,(/])\s*", r"\1", part)
+        part = re.sub(r"\s+\)", ")", part)
+        part = re.sub(r"\s*!\s*important", "!important", part)
+        part = re.sub(r"(?<![\w.])0\.(\d)", r".\1", part)
+        part = re.sub(r"(?<![\w.#-])0px\b", "0", part)
+        part = re.sub(r"#([0-9a-fA-F])\1([0-9a-fA-F])\2([0-9a-fA-F])\3\b", r"#\1\2\3", part)
+        out.append(part)
+    return "".join(out).strip()
+
+
+def _declarations(body):
+    """Minified ``prop:value`` pairs; exact repeats keep their last position."""
+    decls = []
+    for raw in _split_top(body, ";"):
+        prop, sep, value = raw.partition(":")
+        if not sep or not prop.strip():
+            continue
+        decl = f"{prop.strip().lower()}:{_value(value)}"
+        # Repeated properties with different values (fallback, then image-set) both stay.
+        if decl in decls:
+            decls.remove(decl)
+        decls.append(decl)
+    return decls
+
+
+def _selector(selector):
+    selector = re.sub(r"\s+", " ", selector).strip()
+    return re.sub(r"\s*([,>])\s*", r"\1", selector)
+
+
+def parse(css):
+    """``[(selector, [declaration, ...]), ...]`` of a stylesheet; at-rules keep their text as selector."""
+    css = _STRING_OR_COMMENT.sub(lambda m: m.group(1) or "", css)
+    rules, depth, start = [], 0, 0
+    head = None
+    for i, c in enumerate(css):
+        if c == "{":
+            if depth == 0:
+                head, start = css[start:i], i + 1
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                body = css[start:i]
+                if head.strip().startswith("@"):
+                    # Nested blocks (@media, @keyframes) are kept whole, only squeezed.
+                    rules.append((re.sub(r"\s+", " ", f"{head.strip()}{{{body.strip()}}}"), None))
+                else:
+                    rules.append((_selector(head), _declarations(body)))
+                start = i + 1
+    return rules
+
+
+def dedupe(rules, already=()):
+    """Drop rules repeated later in ``rules`` or present in ``already`` (the cascade is unchanged)."""
+    seen = {_rule_text(rule) for rule in already}
+    out = []
+    for rule in reversed(rules):
+        text = _rule_text(rule)
+        if text in seen or rule[1] == []:
+            continue
+        seen.add(text)
+        out.append(rule)
+    return out[::-1]
+
+
+def _rule_text(rule):
+    selector, decls = rule
+    return selector if decls is None else f"{selector}{{{';'.join(decls)}}}"
+
+
+def stylesheet(rules):
+    """``<style>`` element for ``rules``; empty when there are none."""
+    return f"<style>{''.join(map(_rule_text, rules))}</style>" if rules else ""
+
+
+def css_of(html):
+    """The CSS inside every ``<style>`` block of ``html``."""
+    return "\n".join(_STYLE_BLOCK.findall(html))
+
+
+# --- CRITICAL SPLIT ---
+def page_tokens(html):
+    """Tag names, ``.class`` and ``#id`` tokens present in ``html``."""
+    tokens = {tag.lower() for tag in re.findall(r"<([a-zA-Z][\w-]*)", html)}
+    for classes in re.findall(r'class="([^"]*)"', html):
+        tokens.update("." + c for c in classes.split())
+    tokens.update("#" + i for i in re.findall(r'id="([^"]*)"', html))
+    return tokens
+
+
+def _can_match(selector, tokens):
+    """False only when some compound needs a tag, class or id the markup does not have."""
+    for compound in re.split(r"[\s>+~]+", re.sub(r"\[[^\]]*\]|\([^)]*\)", "", selector)):
+        compound = re.split(r"::?", compound)[0]
+        for token in re.findall(r"[.#]?[\w-]+", compound):
+            if token not in tokens:
+                return False
+    return True
+
+
+def split_critical(rules, above_fold_html):
+    """``(critical, deferred)``: rules that can style ``above_fold_html``, and the rest."""
+    tokens = page_tokens(above_fold_html)
+    critical, deferred = [], []
+    for selector, decls in rules:
+        matches = decls is None or any(_can_match(s, tokens) for s in _split_top(selector, ","))
+        (critical if matches else deferred).append((selector, decls))
+    return critical, deferred
+
+
+def landing_above_fold():
+    """Header and hero markup of the landing page (images and stats do not affect selectors)."""
+    image = {"src": "", "sources": {"image/webp": [(1, "")], "image/jpeg": [(1, "")]}}
+    stats = {"cagr": "", "profit_factor": "", "max_drawdown": ""}
+    body = templates.landing_body(templates.header_html(""), image, image, stats)
+    return body.split('<section id="model">', 1)[0]
+
+
+# --- BUILD ---
+def bars_url(manifest, base_url=assets.BASE_URL):
+    """URL of the built hero bars, or the same SVG inlined when it has not been built."""
+    return assets.asset_url(BARS_NAME, manifest, "", base_url) or (
+        "data:image/svg+xml," + quote(templates.hero_bars_svg(), safe=" =:/,.")
+    )
+
+
+def compile_styles(manifest, base_url=assets.BASE_URL):
+    """``{bundle: "<style>...</style>"}`` for every name in ``PAGES``."""
+    gears = images.responsive_image("gears.png", manifest, "", base_url)
+    landing = templates.landing_css(gears, bars_url(manifest, base_url))
+    shared = dedupe(parse(css_of(templates.SHARED_CSS)))
+    critical, deferred = split_critical(dedupe(parse(css_of(landing)), shared), landing_above_fold())
+    return {
+        "shared": stylesheet(shared),
+        "landing_critical": stylesheet(critical),
+        "landing_deferred": stylesheet(deferred),
+        "login": stylesheet(dedupe(parse(css_of(templates.LOGIN_CSS)), shared)),
+        "dashboard": stylesheet(dedupe(parse(css_of(templates.DASHBOARD_CSS)), shared)),
+    }
+
+
+def _inputs_key(manifest, base_url):
+    here = Path(__file__)
+    version = artifacts.source_version(here, here.with_name("templates.py"))
+    used = {k: v for k, v in manifest.items() if k == BARS_NAME or k.startswith("gears.png")}
+    raw = json.dumps([version, base_url, used], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def build(out_dir=assets.STATIC_DIR, base_url=assets.BASE_URL):
+    """Write the hero bars SVG as a fingerprinted asset and the compiled bundles."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    svg = templates.hero_bars_svg().encode()
+    with artifacts.file_lock(out_dir / assets.BUILD_LOCK):
+        manifest = assets.load_manifest(out_dir)
+        name = BARS_NAME.replace(".svg", f".{hashlib.sha256(svg).hexdigest()[:assets.HASH_LEN]}.svg")
+        if not (out_dir / name).exists():
+            artifacts.atomic_write(out_dir / name, svg)
+        stale = manifest.get(BARS_NAME)
+        if stale and stale != name:
+            assets.retire(out_dir, [stale])
+        manifest[BARS_NAME] = name
+        assets.write_manifest(out_dir, manifest)
+        bundles = compile_styles(manifest, base_url)
+        # One entry per asset base URL: the app and the static site reference assets differently.
+        records = _read_records(out_dir)
+        records[base_url] = {"key": _inputs_key(manifest, base_url), "bundles": bundles}
+        artifacts.atomic_write(out_dir / STYLES_NAME, json.dumps(records, indent=2, sort_keys=True).encode())
+    return bundles
+
+
+def _read_records(out_dir):
+    try:
+        return json.loads((Path(out_dir) / STYLES_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def load(manifest, out_dir=assets.STATIC_DIR, base_url=assets.BASE_URL):
+    """Built bundles matching ``manifest``, compiled in memory when missing or stale."""
+    record = _read_records(out_dir).get(base_url)
+    if record and record.get("key") == _inputs_key(manifest, base_url):
+        return record["bundles"]
+    return compile_styles(manifest, base_url)
+
+
+# --- REPORT ---
+def _legacy_bars_css():
+    """The hero bars as the original 40 stacked gradient layers (the "before" of the report)."""
+    layers, sizes, positions = [], [], []
+    for i, h in enumerate(templates.HERO_BAR_HEIGHTS):
+        rgb = "255, 200, 150" if i in templates.HERO_BAR_ACCENTS else "240, 240, 240"
+        layers.append(f"linear-gradient(to bottom, rgba({rgb}, 0.4), rgba({rgb}, 0.9))")
+        sizes.append(f"{templates.HERO_BAR_WIDTH}px {h}%")
+        positions.append(f"{i * templates.HERO_BAR_PITCH}px bottom")
+    return (f"background-image: \n{','.join(layers)};\nbackground-size: \n{', '.join(sizes)};\n"
+            f"background-position: \n{', '.join(positions)};\n")
+
+
+def _stats(css):
+    rules = parse(css)
+    return {
+        "bytes": len(css.encode()),
+        "gzip_bytes": len(gzip.compress(css.encode(), 9, mtime=0)),
+        "rules": len(rules),
+        "selectors": sum(len(_split_top(s, ",")) for s, d in rules if d is not None),
+        "declarations": sum(len(d) for _, d in rules if d is not None),
+        "background_layers": sum(len(_split_top(v.partition(":")[2], ","))
+                                 for _, d in rules if d for v in d if v.startswith("background-image:")),
+    }
+
+
+def report(manifest, bundles, base_url=assets.BASE_URL):
+    """Per page: CSS emitted per render before (shared + page templates) and after (bundles)."""
+    gears = images.responsive_image("gears.png", manifest, "", base_url)
+    landing = templates.landing_css(gears, "")
+    # The templates no longer carry the 40 layers; put them back for the baseline.
+    landing = landing.replace('background-image: url("");', _legacy_bars_css(), 1)
+    before = {
+        "landing": templates.SHARED_CSS + landing,
+        "login": templates.SHARED_CSS + templates.LOGIN_CSS,
+        "dashboard": templates.SHARED_CSS + templates.DASHBOARD_CSS,
+    }
+    after = {
+        "landing": bundles["shared"] + bundles["landing_critical"] + bundles["landing_deferred"],
+        "login": bundles["shared"] + bundles["login"],
+        "dashboard": bundles["shared"] + bundles["dashboard"],
+    }
+    out = {page: {"before": _stats(css_of(before[page])), "after": _stats(css_of(after[page]))} for page in before}
+    out["landing"]["critical_bytes"] = len(bundles["landing_critical"])
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile page stylesheets and report CSS before/after.")
+    parser.parse_args(argv)
+    assets.build()
+    images.build()
+    bundles = build()
+    manifest = assets.load_manifest()
+    print(f"{'page':<10}{'':>7}{'bytes':>8}{'gzip':>7}{'rules':>7}{'selectors':>11}{'decls':>7}{'bg layers':>11}")
+    for page, stats in report(manifest, bundles).items():
+        for when in ("before", "after"):
+            s = stats[when]
+            print(f"{page if when == 'before' else '':<10}{when:>7}{s['bytes']:>8,}{s['gzip_bytes']:>7,}{s['rules']:>7}"
+                  f"{s['selectors']:>11}{s['declarations']:>7}{s['background_layers']:>11}")
+        if "critical_bytes" in stats:
+            print(f"{'':<10}{'':>7} critical (before the body): {stats['critical_bytes']:,} B")
+
+
+if __name__ == "__main__":
+    main()
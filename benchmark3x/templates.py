@@ -0,0 +1,622 @@
+"""HTML/CSS templates for the Benchmark3x pages.
+
+Kept free of Streamlit imports so the landing page can also be pre-rendered to
+a static file (see benchmark3x.site). Image URLs are passed in by the caller.
+"""
+
+# Shown when an image is missing from the asset manifest.
+COMPUTER_FALLBACK = "https://via.placeholder.com/800x600.png?text=computer.jpg+not+found"
+CHART_FALLBACK = "https://via.placeholder.com/600x350.png?text=Chart+Generation+Failed"
+
+# --- RESPONSIVE IMAGES ---
+# `image` arguments are dicts from benchmark3x.images.responsive_image.
+def _srcset(pairs):
+    return ", ".join(f"{url} {width}w" for width, url in pairs)
+
+def picture_html(image, cls, alt, sizes, lazy=False):
+    loading = ' loading="lazy" decoding="async"' if lazy else ""
+    sources = list(image["sources"].items())
+    if not sources:
+        return f'<img src="{image["src"]}" class="{cls}" alt="{alt}"{loading}>'
+    # The last format is the universally supported fallback and goes on the <img> itself.
+    _, fallback = sources.pop()
+    tags = "".join(f'<source type="{mime}" srcset="{_srcset(pairs)}" sizes="{sizes}">\n' for mime, pairs in sources)
+    return (
+        f'<picture>\n{tags}'
+        f'<img src="{image["src"]}" srcset="{_srcset(fallback)}" sizes="{sizes}" class="{cls}" alt="{alt}"{loading}>\n'
+        '</picture>'
+    )
+
+def background_image_css(image):
+    if not image["sources"]:
+        # Unprocessed source: grayscale it at paint time instead.
+        return f"background-image: url('{image['src']}'); filter: grayscale(100%);"
+    options = ", ".join(f"url('{pairs[-1][1]}') type('{mime}')" for mime, pairs in image["sources"].items())
+    return f"background-image: url('{image['src']}'); background-image: image-set({options});"
+
+# --- SHARED HTML: HEADER ---
+def header_html(logo_src):
+    return f"""
+<div class="sticky-header" id="top">
+<a href="?page=landing" target="_self" class="logo-container">
+<img src="{logo_src}" class="logo-img" alt="Benchmark3x" />
+</a>
+<nav>
+<a href="?page=landing#model" target="_self">Model</a>
+<a href="?page=landing#pricing" target="_self">Pricing</a>
+<a href="?page=landing#faq" target="_self">FAQ</a>
+<a href="?page=login" target="_self" class="nav-login"><span class="lock-icon">🔒</span> Sign In</a>
+</nav>
+</div>
+"""
+
+# --- CSS: GLOBAL & SHARED ---
+SHARED_CSS = f"""
+<style>
+/* Reset Streamlit's default padding/margins */
+.block-container {{
+padding-top: 0rem !important;
+padding-bottom: 0rem !important;
+padding-left: 0rem !important;
+padding-right: 0rem !important;
+margin: 0px !important;
+max-width: 100% !important;
+overflow: visible !important;
+}}
+/* Hide Streamlit elements */
+header[data-testid="stHeader"] {{ visibility: hidden; height: 0px; }}
+footer {{ display: none !important; }}
+.main .block-container {{ margin-top: -60px !important; }}
+/* Global Font */
+body, .stApp {{
+font-family: "SF Pro Display", -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
+overflow-y: auto !important;
+}}
+/* HEADER STYLES */
+.sticky-header {{
+background-color: #000000;
+padding: 20px 4%; 
+display: flex;
+justify-content: space-between;
+align-items: center;
+border-bottom: 1px solid #222;
+width: 100%;
+position: sticky; 
+top: 0; 
+z-index: 9999;
+}}
+.logo-container {{ display: flex; align-items: center; text-decoration: none; cursor: pointer; }}
+.logo-img {{ height: 90px; width: auto; display: block; mix-blend-mode: screen; }}
+nav {{ display: flex; gap: 30px; align-items: center; }}
+/* MODIFIED: Increased size, white color, no underline */
+nav a {{
+color: #ffffff !important; 
+text-decoration: none !important; 
+font-size: 1.6rem; 
+font-weight: 500;
+transition: color 0.3s; 
+display: flex; 
+align-items: center; 
+cursor: pointer;
+}}
+nav a:hover {{ color: #f5a623 !important; }}
+.nav-login {{ color: #fff; font-weight: 600; }}
+.lock-icon {{ margin-right: 6px; font-size: 1.2rem; }}
+</style>
+"""
+
+# --- PAGE 1: LANDING PAGE CONTENT ---
+# The bars along the bottom of the hero, 80px apart: height in % of the 300px
+# strip, and which bars are orange. Drawn as one SVG instead of 40 gradients.
+HERO_BAR_HEIGHTS = (
+    25, 55, 40, 75, 90, 45, 20, 60, 85, 35, 50, 30, 70, 45, 95, 55, 25, 65, 40, 80,
+    60, 35, 75, 20, 50, 85, 45, 65, 30, 70, 90, 50, 35, 60, 25, 80, 40, 55, 30, 65,
+)
+HERO_BAR_ACCENTS = frozenset((4, 8, 14, 20, 25, 30, 35))
+HERO_BAR_WIDTH, HERO_BAR_PITCH, HERO_BARS_HEIGHT = 40, 80, 300
+
+def hero_bars_svg():
+    bars = "".join(
+        f'<rect x="{i * HERO_BAR_PITCH}" y="{HERO_BARS_HEIGHT - h * HERO_BARS_HEIGHT // 100}" '
+        f'width="{HERO_BAR_WIDTH}" height="{h * HERO_BARS_HEIGHT // 100}" fill="url(#{"o" if i in HERO_BAR_ACCENTS else "g"})"/>'
+        for i, h in enumerate(HERO_BAR_HEIGHTS)
+    )
+    gradients = "".join(
+        f'<linearGradient id="{name}" x2="0" y2="1"><stop stop-color="{color}" stop-opacity=".4"/>'
+        f'<stop offset="1" stop-color="{color}" stop-opacity=".9"/></linearGradient>'
+        for name, color in (("g", "#f0f0f0"), ("o", "#ffc896"))
+    )
+    width = (len(HERO_BAR_HEIGHTS) - 1) * HERO_BAR_PITCH + HERO_BAR_WIDTH
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{HERO_BARS_HEIGHT}">'
+        f"<defs>{gradients}</defs>{bars}</svg>"
+    )
+
+def landing_css(gears, bars):
+    return f"""
+<style>
+/* LANDING SPECIFIC STYLES */
+#landing-root {{
+background-color: #ffffff;
+color: #333;
+}}
+.orange {{ color: #f5a623; }}
+.text-center {{ text-align: center; }}
+.container {{ max-width: 1400px; margin: 0 auto; padding: 0 5%; position: relative; z-index: 2; }}
+h2 {{ font-size: 2.5rem; color: #111; margin-bottom: 20px; text-align: center; font-weight: 700; letter-spacing: -1px; }}
+.section-subtitle {{ text-align: center; color: #666; font-size: 1.1rem; margin-bottom: 60px; max-width: 900px; margin-left: auto; margin-right: auto; line-height: 1.6; }}
+p {{ line-height: 1.6; color: #555; }}
+section {{ margin-bottom: 100px !important; }}
+
+/* HERO SECTION */
+/* MODIFIED: Added margin-bottom 0px to fix bar gap issue */
+.hero {{ 
+    width: 100%; 
+    position: relative; 
+    overflow: hidden; 
+    background-color: white; 
+    margin-bottom: 0px !important;
+}}
+.hero-content-wrapper {{ max-width: 1800px; margin: 0 auto; padding: 100px 5% 150px 5%; display: flex; justify-content: space-between; align-items: flex-start; position: relative; z-index: 10; }}
+.hero::before {{
+content: ''; position: absolute; top: 0; left: 0; width: 35%; height: 600px;
+background-image: radial-gradient(circle, #d0d0d0 5px, transparent 6px); background-size: 30px 30px;
+clip-path: polygon(0 0, 100% 0, 0 100%); mask-image: linear-gradient(135deg, black 20%, transparent 100%);
+-webkit-mask-image: linear-gradient(135deg, black 20%, transparent 100%); opacity: 0.6; z-index: 1; pointer-events: none;
+}}
+/* RESTORED: THE BOTTOM BARS */
+.hero::after {{
+content: ''; position: absolute; bottom: 0; left: 33%; width: 100%; height: 300px;
+background-image: url("{bars}"); background-position: left bottom;
+background-repeat: no-repeat; z-index: 1; pointer-events: none;
+}}
+.hero-text {{ max-width: 45%; margin-top: 10px; margin-left: 100px; position: relative; }}
+h1 {{ font-size: 3.8rem; line-height: 1.1; color: #111; margin-bottom: 20px; font-weight: 800; letter-spacing: -1px; }}
+.hero-p {{ font-size: 1.2rem; margin-bottom: 30px; max-width: 520px; color: #555; }}
+.btn-primary {{ display: inline-block; background-color: #f5a623; color: white; padding: 14px 35px; text-decoration: none; border-radius: 4px; font-weight: 700; font-size: 1rem; transition: transform 0.2s, background-color 0.2s; border: none; cursor: pointer; text-align: center; }}
+.btn-primary:hover {{ transform: translateY(-2px); background-color: #e0961f; }}
+.hero-content-wrapper picture {{ display: contents; }}
+.computer-graphic {{ width: 50%; border-radius: 12px; box-shadow: 0 30px 60px rgba(0,0,0,0.25); object-fit: cover; transform: perspective(1000px) rotateY(-5deg) rotateX(2deg); transition: transform 0.5s ease; }}
+.computer-graphic:hover {{ transform: perspective(1000px) rotateY(0deg); }}
+/* MODEL SECTION */
+#model {{ background-color: #f8f9fa; border-top: 1px solid #eee; padding-top: 60px; padding-bottom: 80px; scroll-margin-top: 60px; width: 100%; position: relative; overflow: hidden; }}
+#model::before {{ content: ''; position: absolute; top: -15%; right: -15%; width: 62.5%; height: 125%; {background_image_css(gears)} background-repeat: no-repeat; background-position: center right; background-size: contain; opacity: 0.05; pointer-events: none; z-index: 0; }}
+.model-grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 70px; align-items: start; position: relative; z-index: 2; }}
+.model-step {{ margin-bottom: 30px; display: flex; gap: 20px; }}
+.step-num {{ font-size: 2rem; font-weight: 800; color: #f5a623; min-width: 50px; line-height: 1; }}
+.step-content h4 {{ font-size: 1.3rem; margin-bottom: 10px; color: #222; }}
+.stat-card-row {{ display: grid; grid-template-columns: 1fr 1fr; gap: 20px; margin-top: 40px; }}
+.stat-card {{ background: #fff; padding: 25px; border-radius: 8px; box-shadow: 0 4px 20px rgba(0,0,0,0.06); text-align: center; }}
+.stat-val {{ font-size: 2.5rem; font-weight: 700; color: #000; display: block; margin-bottom: 5px; }}
+.stat-label {{ font-size: 0.9rem; color: #888; text-transform: uppercase; letter-spacing: 1px; font-weight: 600; }}
+.math-box {{ background-color: #fff; padding: 25px; border-radius: 8px; border-left: 4px solid #f5a623; margin-top: 20px; font-size: 0.95rem; }}
+.chart-container {{ margin-top: 25px; background: #fff; padding: 15px; border-radius: 8px; box-shadow: 0 4px 20px rgba(0,0,0,0.06); text-align: center; }}
+.chart-img {{ width: 100%; height: auto; border-radius: 4px; border: 1px solid #eee; }}
+.chart-caption {{ margin-top: 10px; font-size: 0.85rem; color: #888; font-style: italic; }}
+/* PRICING */
+#pricing {{ background-color: #fff; padding-top: 60px; scroll-margin-top: 60px; }}
+.pricing-grid {{ display: flex; justify-content: center; gap: 30px; margin-top: 40px; flex-wrap: wrap; }}
+.pricing-card {{ background: #fff; border: 1px solid #e1e1e1; border-radius: 12px; padding: 40px; width: 380px; display: flex; flex-direction: column; transition: transform 0.3s, box-shadow 0.3s; }}
+.pricing-card:hover {{ transform: translateY(-10px); box-shadow: 0 20px 40px rgba(0,0,0,0.1); border-color: #f5a623; }}
+.pricing-card.black {{ background: #111; color: #fff; border: 1px solid #111; }}
+.pricing-card.black h3, .pricing-card.black .price, .pricing-card.black p, .pricing-card.black li {{ color: #fff; }}
+.pricing-card h3 {{ font-size: 1.5rem; margin-bottom: 10px; }}
+.price {{ font-size: 3.5rem; font-weight: 800; margin: 20px 0; letter-spacing: -2px; }}
+.price span {{ font-size: 1rem; color: #999; font-weight: 400; letter-spacing: 0; }}
+.features-list {{ list-style: none; margin: 30px 0; flex-grow: 1; }}
+.features-list li {{ margin-bottom: 12px; font-size: 1rem; display: flex; align-items: center; color: #555; }}
+.check {{ color: #f5a623; margin-right: 12px; font-weight: bold; }}
+/* FAQ */
+#faq {{ background-color: #f8f9fa; border-top: 1px solid #eee; padding-top: 60px; padding-bottom: 60px; scroll-margin-top: 60px; width: 100%; }}
+.faq-grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 30px; }}
+.faq-item {{ background: #fff; padding: 30px; border-radius: 8px; border: 1px solid #eee; }}
+.faq-item h4 {{ font-size: 1.1rem; margin-bottom: 12px; font-weight: 700; color: #111; }}
+.faq-item p {{ font-size: 0.95rem; color: #666; }}
+/* FOOTER */
+.landing-footer {{ background: #111; color: #ffffff; padding: 60px 5%; text-align: center; border-top: 1px solid #222; margin-bottom: 0 !important; }}
+.landing-footer p {{ font-size: 0.85rem; margin-bottom: 10px; color: #ffffff; }}
+.landing-footer a {{ color: #ffffff; text-decoration: none; opacity: 0.8; }}
+.landing-footer a:hover {{ opacity: 1; }}
+.disclaimer {{ font-size: 0.75rem; color: #ffffff; max-width: 900px; margin: 20px auto; line-height: 1.5; opacity: 0.9; }}
+</style>
+"""
+
+# FLUSH LEFT HTML
+def landing_body(header, computer, chart, stats):
+    return f"""
+<div id="landing-root">
+{header}
+<main>
+<section class="hero">
+<div class="hero-content-wrapper">
+<div class="hero-text">
+<h1>3x Returns.<br>Without the Risk.</h1>
+<p class="hero-p">
+Professional-grade algorithmic signals for <strong>SPXL (3x)</strong> and <strong>SSO (2x)</strong>. 
+We capture the upside of leverage while systematically managing the volatility decay. 
+<br><br>
+<strong>Zero look-ahead bias. Pure Python.</strong>
+</p>
+<a href="#pricing" class="btn-primary">View Access Plans</a>
+</div>
+{picture_html(computer, "computer-graphic", "Trading Terminal", "(max-width: 900px) 100vw, 50vw")}
+</div>
+</section>
+<section id="model">
+<div class="container">
+<h2>The Model, The Machine</h2>
+<p class="section-subtitle">
+Our engine is a machine learning tool trained on hundreds of predictors and backtested with decades of market data. The key to successful leverage isn't just knowing when to enter the market, but knowing when to get out and sit on the sidelines. Our proprietary system picks not only the high-probability days to invest, but more importantly, signals when to exit to avoid the worst drawdowns. <strong>Two models, two purposes—resulting in incredible CAGR performance.</strong>
+</p>
+<div class="model-grid">
+<div>
+<div class="model-step">
+<div class="step-num">01</div>
+<div class="step-content">
+<h4>The Problem: Volatility Decay</h4>
+<p>If SPY drops 10%, a 3x ETF drops 30%. To get back to even, the 3x ETF needs a 43% gain. In sideways "choppy" markets, this mathematical drag destroys portfolios.</p>
+</div>
+</div>
+<div class="model-step">
+<div class="step-num">02</div>
+<div class="step-content">
+<h4>The Solution: Regime Scanning</h4>
+<p>We monitor VIX term structure and realized volatility. When "High Volatility" is detected, the model triggers a <strong>Cash Signal</strong>, sitting out the chop.</p>
+</div>
+</div>
+<div class="model-step">
+<div class="step-num">03</div>
+<div class="step-content">
+<h4>The Result: Pure Trends</h4>
+<p>We only re-enter SPXL/SSO when the regime stabilizes. This allows us to participate in the powerful 3x upside of bull markets, without suffering the 3x downside of crashes.</p>
+</div>
+</div>
+<div class="model-step">
+<div class="step-num">04</div>
+<div class="step-content">
+<h4>Deep Predictors</h4>
+<p>Our engine ingests 14 distinct market features, including Dark Pool Index (DPI), Gamma Exposure (GEX), and Yield Curve spreads, to paint a complete picture of market health.</p>
+</div>
+</div>
+<div class="model-step">
+<div class="step-num">05</div>
+<div class="step-content">
+<h4>Machine Learning Core</h4>
+<p>A supervised Random Forest classifier, trained on 20 years of tick-level data, dynamically weighs these predictors to identify probability skews that human traders miss.</p>
+</div>
+</div>
+<div class="model-step">
+<div class="step-num">06</div>
+<div class="step-content">
+<h4>The Signal</h4>
+<p>The output is binary and unequivocal: <strong>1 (Long)</strong> or <strong>0 (Cash)</strong>. There is no hedging, no confusion, and no discretion. Just pure execution.</p>
+</div>
+</div>
+</div>
+<div>
+<div class="stat-card">
+<span class="stat-val orange">{stats["cagr"]}</span>
+<span class="stat-label">Backtested CAGR</span>
+</div>
+<div class="stat-card-row">
+<div class="stat-card">
+<span class="stat-val">{stats["profit_factor"]}</span>
+<span class="stat-label">Profit Factor</span>
+</div>
+<div class="stat-card">
+<span class="stat-val">{stats["max_drawdown"]}</span>
+<span class="stat-label">Max Drawdown</span>
+</div>
+</div>
+<div class="math-box">
+<strong>Why not just hold SPXL?</strong><br>
+During the 2020 crash, SPXL drew down over -70%. Recovering from a -70% loss requires a +233% gain just to break even. Our model moved to cash <i>before</i> the acceleration, preserving the capital base for the recovery.
+</div>
+<div class="chart-container">
+{picture_html(chart, "chart-img", "Chart showing model avoiding a downturn", "(max-width: 900px) 90vw, 640px", lazy=True)}
+<div class="chart-caption">Figure 1.1: Volatility Regime Filter in Action</div>
+</div>
+</div>
+</div>
+</div>
+</section>
+<section id="pricing">
+<div class="container">
+<h2>Subscription</h2>
+<p class="section-subtitle">Transparent pricing for individual traders and software licensing for proprietary trading desks.</p>
+<div class="pricing-grid">
+<div class="pricing-card">
+<h3>Professional Signal</h3>
+<p style="color:#888; font-size:0.9rem;">For independent traders.</p>
+<div class="price">$299<span>/mo</span></div>
+<ul class="features-list">
+<li><span class="check">✓</span> Daily Signals (SPXL & SSO)</li>
+<li><span class="check">✓</span> 7:00 AM Pre-market Alerts</li>
+<li><span class="check">✓</span> Live Dashboard Access</li>
+<li><span class="check">✓</span> Position Sizing Calculator</li>
+<li><span class="check">✓</span> Private Community Access</li>
+</ul>
+<a href="#" class="btn-primary" style="width:100%;">Start 14-Day Trial</a>
+</div>
+<div class="pricing-card black">
+<h3 class="orange">Enterprise Code</h3>
+<p style="color:#aaa; font-size:0.9rem;">For developers & prop desks.</p>
+<div class="price">Custom</div>
+<ul class="features-list">
+<li><span class="check">✓</span> <strong>Everything in Professional</strong></li>
+<li><span class="check">✓</span> Low-Latency API (FIX/JSON)</li>
+<li><span class="check">✓</span> <strong>Full Python Source Code</strong></li>
+<li><span class="check">✓</span> Parameter Optimization Engine</li>
+<li><span class="check">✓</span> On-Prem Docker Deployment</li>
+<li><span class="check">✓</span> Developer Support</li>
+</ul>
+<a href="#" class="btn-primary" style="background-color:#fff; color:#000; width:100%;">Contact Sales</a>
+</div>
+</div>
+</div>
+</section>
+<section id="faq">
+<div class="container">
+<h2>Common Questions</h2>
+<div class="faq-grid">
+<div class="faq-item">
+<h4>Do you manage my money?</h4>
+<p><strong>No.</strong> Benchmark3x is a software provider and financial publisher. We provide data signals. You execute the trades in your own brokerage account. We never touch your funds.</p>
+</div>
+<div class="faq-item">
+<h4>Is this financial advice?</h4>
+<p>No. Our signals are based on mathematical models and historical backtesting. They are for educational and informational purposes only. You must evaluate if 3x leverage fits your personal risk tolerance.</p>
+</div>
+<div class="faq-item">
+<h4>How do I place the trades?</h4>
+<p>Most subscribers receive our email/SMS alert at 7:00 AM ET and place a simple "Market On Open" order in their brokerage app. It takes less than 60 seconds a day. Enterprise clients can automate this via API.</p>
+</div>
+<div class="faq-item">
+<h4>Why use SPXL (3x) instead of SPY?</h4>
+<p>In low-volatility bull markets, SPXL offers superior alpha. The risk is the drawdown. Our model acts as a "safety switch," allowing you to hold the 3x asset only when conditions are mathematically favorable.</p>
+</div>
+<div class="faq-item">
+<h4>What happens if I miss a signal?</h4>
+<p>The strategy is designed for "swing trading" trends, not high-frequency scalping. Missing an entry by a few minutes or even an hour rarely impacts long-term performance significantly.</p>
+</div>
+<div class="faq-item">
+<h4>Is the code actually provided?</h4>
+<p>For Enterprise License holders, yes. We provide the full Python source code, allowing you to audit the strategy logic on your own infrastructure. We believe in "Glass Box" transparency, not Black Box secrets.</p>
+</div>
+<div class="faq-item">
+<h4>Can I use this in an IRA or Roth IRA?</h4>
+<p>Yes. SPXL and SSO are standard Exchange Traded Funds (ETFs) available in almost all self-directed retirement accounts. They do not require margin accounts or special permissions to trade.</p>
+</div>
+<div class="faq-item">
+<h4>What brokerages are supported?</h4>
+<p>Because we provide the signals (and not the execution), you can use any major brokerage including Fidelity, Charles Schwab, E*TRADE, Interactive Brokers, or Robinhood.</p>
+</div>
+<div class="faq-item">
+<h4>Is there a specific cancellation policy?</h4>
+<p>Yes. You can cancel your monthly subscription at any time with one click from your dashboard. You will retain access until the end of your current billing cycle. There are no long-term contracts for the Professional plan.</p>
+</div>
+<div class="faq-item">
+<h4>Does the model short the market?</h4>
+<p>No. The model is "Long Only." It switches between being invested in the ETF (SPXL/SSO) or sitting in Cash. We do not use inverse ETFs (like SPXU) or short selling, which reduces the risk of "whipsaw" losses significantly.</p>
+</div>
+</div>
+</div>
+</section>
+</main>
+<div class="landing-footer">
+<div class="container">
+<p>© 2025 Benchmark3x Analytics. All rights reserved.</p>
+<p>
+<a href="#">Terms of Service</a> | <a href="#">Privacy Policy</a> | <a href="#">Risk Disclosure</a>
+</p>
+<div class="disclaimer">
+<p><strong>IMPORTANT DISCLAIMER:</strong> Benchmark3x is a software application and research tool. We are not a registered investment advisor, broker-dealer, or financial analyst. The information presented is for educational purposes only and does not constitute financial advice.</p>
+<p>Hypothetical or simulated performance results have certain limitations. Unlike an actual performance record, simulated results do not represent actual trading. Also, since the trades have not been executed, the results may have under-or-over compensated for the impact, if any, of certain market factors, such as lack of liquidity. Trading leveraged ETFs involves substantial risk of loss.</p>
+</div>
+</div>
+</div>
+</div>
+"""
+
+# --- PAGE 2: LOGIN PAGE STYLES ---
+LOGIN_CSS = f"""
+<style>
+/* LOGIN SPECIFIC STYLES */
+/* MODIFIED: Force background to white (was gray) */
+.stApp {{
+    background-color: #ffffff !important;
+}}
+
+/* Target the center column we create */
+div[data-testid="column"]:nth-of-type(2) {{
+    background-color: white;
+    padding: 40px;
+    border-radius: 8px;
+    box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+    margin-top: 50px;
+}}
+
+/* Style the buttons to look like social logins */
+.social-btn {{
+    display: block;
+    width: 100%;
+    padding: 12px;
+    margin-bottom: 12px;
+    text-align: center;
+    border-radius: 4px;
+    text-decoration: none;
+    font-weight: 500;
+    color: white !important; /* Forces text to be white */
+    font-size: 1.2rem; /* MODIFIED: Increased size by 50% */
+}}
+.google-btn {{ background-color: #4285F4; }}
+.facebook-btn {{ background-color: #3b5998; }}
+.social-btn:hover {{ opacity: 0.9; color: white !important; }}
+
+/* MODIFIED: Increased font size by 50% */
+.login-header {{ font-size: 2.8rem; font-weight: 600; margin-bottom: 20px; color: #333; }}
+.divider {{ margin: 20px 0; border-top: 1px solid #eee; }}
+
+/* Increase size of Streamlit inputs in the login card */
+div[data-testid="column"]:nth-of-type(2) p {{
+    font-size: 1.2rem !important; /* Labels */
+}}
+div[data-testid="column"]:nth-of-type(2) input {{
+    font-size: 1.1rem !important; /* Input text */
+    padding: 1rem; /* Make boxes taller */
+}}
+</style>
+"""
+
+
+# --- PAGE 3: LIVE DASHBOARD ---
+DASHBOARD_CSS = f"""
+<style>
+.stApp {{
+    background-color: #ffffff !important;
+}}
+.dashboard-title {{ font-size: 2rem; font-weight: 600; color: #333; margin: 90px 0 10px 0; }}
+</style>
+"""
+
+# Canvas chart fed by benchmark3x.dashboard: fetches the LTTB tiles for the
+# visible range at the canvas width, then appends pushed bars as they arrive.
+# Plain string (not an f-string) because of the JavaScript braces.
+DASHBOARD_CHART = """
+<div style="font-family: sans-serif;">
+<div id="ranges" style="margin-bottom: 6px;"></div>
+<canvas id="chart" style="width: 100%; height: __HEIGHT__px;"></canvas>
+<div id="status" style="font-size: 12px; color: #888;"></div>
+</div>
+<script>
+const API = "__API__";
+const AUTH = "token=__TOKEN__";
+const RANGES = [["1M", 21], ["6M", 126], ["1Y", 252], ["5Y", 1260], ["10Y", 2520], ["All", 0]];
+const BANDS = {0: "rgba(231,76,60,0.15)", 1: "rgba(241,196,15,0.15)"};
+const canvas = document.getElementById("chart");
+const status = document.getElementById("status");
+let meta = null, span = 0, pts = null, pushed = 0, source = null, loading = null, queued = [];
+
+function tilesFor(start, end, width) {
+  const z = Math.max(0, Math.ceil(Math.log2(Math.max(end - start, 1) / Math.max(width, 1))));
+  const size = meta.tile_points * 2 ** z, tiles = [];
+  for (let t = Math.floor(start / size); t <= Math.floor((Math.max(end, start + 1) - 1) / size); t++) tiles.push(t);
+  return [z, tiles];
+}
+
+// One load at a time; bars pushed meanwhile are queued and applied against the new meta.
+function load() {
+  if (!loading) loading = fetchView().finally(() => {
+    loading = null;
+    for (const m of queued.splice(0)) apply(m);
+  });
+  return loading;
+}
+
+async function fetchView() {
+  const fresh = await (await fetch(`${API}/v1/chart/meta?${AUTH}`)).json();
+  const end = fresh.rows, start = span ? Math.max(0, end - span) : 0;
+  meta = fresh;
+  const [z, tiles] = tilesFor(start, end, canvas.clientWidth);
+  const parts = await Promise.all(tiles.map(t =>
+    fetch(`${API}/v1/chart/tile?z=${z}&t=${t}&v=${meta.version}&${AUTH}`).then(r => r.json())));
+  pts = {i: [], d: [], y: [], r: []};
+  for (const p of parts) for (let k = 0; k < p.i.length; k++) {
+    if (p.i[k] >= start && p.i[k] < end) for (const f in pts) pts[f].push(p[f][k]);
+  }
+  pushed = 0;
+  draw();
+  if (!source) follow();
+}
+
+function apply(m) {
+  // A gap (bars this view never saw) or a reset needs a reload; overlap is trimmed.
+  if (m.reset || !pts || m.from > meta.rows) return load();
+  const keep = [];
+  for (let k = 0; k < m.i.length; k++) if (m.i[k] >= meta.rows) keep.push(k);
+  if (!keep.length) return;
+  for (const f in pts) for (const k of keep) pts[f].push(m[f][k]);
+  meta.rows = Math.max(meta.rows, m.rows);
+  pushed += keep.length;
+  if (span) {
+    const start = meta.rows - span;
+    const drop = pts.i.findIndex(i => i >= start);
+    if (drop > 0) for (const f in pts) pts[f].splice(0, drop);
+  }
+  // Raw bars were appended; re-downsample once they are a noticeable share of the points.
+  if (pushed > canvas.clientWidth / 8) return load();
+  draw();
+}
+
+function follow() {
+  source = new EventSource(`${API}/v1/chart/stream?since=${meta.rows}&${AUTH}`);
+  source.addEventListener("bars", e => {
+    const m = JSON.parse(e.data);
+    if (loading) queued.push(m);
+    else apply(m);
+  });
+}
+
+function day(d) {
+  const ms = meta.unit === "D" ? d * 86400000 : meta.unit === "m" ? d * 60000 : d * 1000;
+  return new Date(ms).toISOString().slice(0, meta.unit === "D" ? 10 : 16).replace("T", " ");
+}
+
+function draw() {
+  const dpr = window.devicePixelRatio || 1, w = canvas.clientWidth, h = canvas.clientHeight;
+  canvas.width = w * dpr; canvas.height = h * dpr;
+  const g = canvas.getContext("2d");
+  g.scale(dpr, dpr);
+  g.clearRect(0, 0, w, h);
+  const n = pts.i.length;
+  if (!n) return;
+  const i0 = pts.i[0], i1 = Math.max(pts.i[n - 1], i0 + 1);
+  let lo = Infinity, hi = -Infinity;
+  for (const y of pts.y) { if (y < lo) lo = y; if (y > hi) hi = y; }
+  const pad = 40, X = i => pad + (i - i0) / (i1 - i0) * (w - pad - 10);
+  const Y = y => 10 + (hi - y) / ((hi - lo) || 1) * (h - 40);
+  for (let k = 0; k < n - 1; k++) {
+    const band = BANDS[pts.r[k]];
+    if (band) { g.fillStyle = band; g.fillRect(X(pts.i[k]), 10, X(pts.i[k + 1]) - X(pts.i[k]) + 0.5, h - 40); }
+  }
+  g.strokeStyle = "#111"; g.lineWidth = 1.2; g.beginPath();
+  for (let k = 0; k < n; k++) k ? g.lineTo(X(pts.i[k]), Y(pts.y[k])) : g.moveTo(X(pts.i[k]), Y(pts.y[k]));
+  g.stroke();
+  g.fillStyle = "#666"; g.font = "11px sans-serif";
+  g.fillText(hi.toFixed(0), 2, 14); g.fillText(lo.toFixed(0), 2, h - 32);
+  g.fillText(day(pts.d[0]), pad, h - 12);
+  const last = day(pts.d[n - 1]);
+  g.fillText(last, w - 10 - g.measureText(last).width, h - 12);
+  status.textContent = `${n} points for ${(pts.i[n - 1] - pts.i[0] + 1).toLocaleString()} bars; last close ${pts.y[n - 1]}`;
+}
+
+for (const [label, bars] of RANGES) {
+  const b = document.createElement("button");
+  b.textContent = label; b.style.marginRight = "4px";
+  b.onclick = () => { span = bars; load(); };
+  document.getElementById("ranges").appendChild(b);
+}
+window.addEventListener("resize", () => meta && load());
+load().catch(() => { status.textContent = "Chart service unavailable at " + API; });
+</script>
+"""
+
+def dashboard_chart(api_url, token, height=420):
+    """The chart page; ``token`` is a ``chart`` token from ``auth.issue_token`` (URL-safe)."""
+    return (DASHBOARD_CHART.replace("__API__", api_url).replace("__TOKEN__", token)
+            .replace("__HEIGHT__", str(height)))
+
+# --- REMEMBERED SESSIONS ---
+# Streamlit cannot set response cookies, so a same-origin frame writes it on the
+# app's document; the next page load reads it back from st.context.cookies.
+# Script-readable by necessity, so signing out revokes the token server-side
+# and expires the cookie (max_age 0).
+SESSION_COOKIE_JS = """<script>
+parent.document.cookie = "__NAME__=__VALUE__; Max-Age=__MAX_AGE__; Path=/; SameSite=Strict"
+  + (parent.location.protocol === "https:" ? "; Secure" : "");
+</script>"""
+
+def session_cookie(name, token, max_age):
+    """A frame that stores ``token`` (URL-safe) in the ``name`` cookie for ``max_age`` seconds."""
+    return (SESSION_COOKIE_JS.replace("__NAME__", name).replace("__VALUE__", token)
+            .replace("__MAX_AGE__", str(int(max_age))))
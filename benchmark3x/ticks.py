@@ -0,0 +1,342 @@
+"""Streaming tick ingestion: tick files to OHLCV bars with realized variance.
+
+    python -m benchmark3x.ticks ingest data/ticks/ --bar 1min --workers 4
+
+Tick files hold time-ordered ``timestamp_ns,price,size`` rows, either as CSV
+(an optional header line is skipped) or as raw little-endian records of
+``TICK_DTYPE`` (``.bin``). Each file is read in ``chunk_rows`` slices, parsed
+vectorized and folded into bars, so memory is bounded by the chunk size and
+the bars of one file, never by the number of ticks.
+
+Bars are appended to a columnar ``FeatureStore`` (open/high/low/close,
+volume, realized variance, tick count). Files are aggregated in parallel on a
+process pool and appended in file order; a checkpoint file records finished
+files, and bars at or before the store's last bar are skipped, so an
+interrupted ingest resumes where it stopped. Bars are in UTC and must not
+span two files (per-day files with bars of up to a day).
+"""
+import argparse
+import collections
+import io
+import json
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from benchmark3x import features
+
+ROOT = Path(__file__).resolve().parent.parent
+BAR_DIR = ROOT / ".cache" / "bars"
+TICK_DTYPE = np.dtype([("ts", "<i8"), ("price", "<f8"), ("size", "<i8")])
+CHUNK_ROWS = 1_000_000
+CSV_ROW_BYTES = 40  # read-size estimate for a CSV chunk of CHUNK_ROWS
+CHECKPOINT_NAME = "ingest.jsonl"
+
+MINUTE_NS = 60 * 10 ** 9
+# name -> (bar length in ns, store index unit)
+BARS = {
+    "1min": (MINUTE_NS, "m"),
+    "5min": (5 * MINUTE_NS, "m"),
+    "15min": (15 * MINUTE_NS, "m"),
+    "1h": (60 * MINUTE_NS, "m"),
+    "1d": (1440 * MINUTE_NS, "D"),
+}
+UNIT_NS = {"m": MINUTE_NS, "D": 1440 * MINUTE_NS}
+BAR_COLUMNS = {
+    "open": "float64", "high": "float64", "low": "float64", "close": "float64",
+    "volume": "int64", "rv": "float64", "ticks": "int64",
+}
+
+
+# --- READING ---
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield ``TICK_DTYPE`` arrays of at most about ``chunk_rows`` ticks."""
+    path = Path(path)
+    if path.suffix == ".csv":
+        yield from _csv_chunks(path, chunk_rows)
+        return
+    with open(path, "rb") as f:
+        while True:
+            chunk = np.fromfile(f, dtype=TICK_DTYPE, count=chunk_rows)
+            if not chunk.shape[0]:
+                return
+            yield chunk
+
+
+def _csv_chunks(path, chunk_rows):
+    block = chunk_rows * CSV_ROW_BYTES
+    rest = b""
+    first = True
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(block)
+            if not data:
+                break
+            data = rest + data
+            cut = data.rfind(b"\n") + 1
+            body, rest = data[:cut], data[cut:]
+            if first and body:
+                first = False
+                body = _skip_header(body)
+            if body:
+                yield _parse_csv(body)
+    if first:  # no newline anywhere: the tail is the first line too
+        rest = _skip_header(rest)
+    if rest.strip():
+        yield _parse_csv(rest)
+
+
+def _skip_header(data):
+    if data[:1].isdigit():
+        return data
+    end = data.find(b"\n")
+    return b"" if end < 0 else data[end + 1:]
+
+
+def _parse_csv(data):
+    return np.loadtxt(io.BytesIO(data), delimiter=",", dtype=TICK_DTYPE, ndmin=1)
+
+
+# --- AGGREGATION ---
+def _empty_bars():
+    out = {"bar": np.empty(0, dtype=np.int64)}
+    out.update({name: np.empty(0, dtype=dtype) for name, dtype in BAR_COLUMNS.items()})
+    return out
+
+
+class BarAggregator:
+    """Folds time-ordered tick chunks into bars; the last (open) bar carries over."""
+
+    def __init__(self, bar_ns):
+        self.bar_ns = bar_ns
+        self._open = None  # the in-progress bar, as a dict of scalars
+        self._last = None  # (ts, bar, log price) of the previous tick
+
+    def push(self, ticks):
+        """Add a chunk; returns the bars it completed."""
+        n = ticks.shape[0]
+        if not n:
+            return _empty_bars()
+        ts, price, size = ticks["ts"], ticks["price"], ticks["size"]
+        if np.any(ts[1:] < ts[:-1]) or (self._last is not None and ts[0] < self._last[0]):
+            raise ValueError("ticks must be in time order")
+
+        bar = ts // self.bar_ns
+        logp = np.log(price)
+        # Squared log return from the previous tick, counted only within a bar.
+        prev_logp = np.empty(n)
+        prev_bar = np.empty(n, dtype=np.int64)
+        prev_logp[1:], prev_bar[1:] = logp[:-1], bar[:-1]
+        if self._last is not None:
+            prev_bar[0], prev_logp[0] = self._last[1], self._last[2]
+        else:
+            prev_bar[0], prev_logp[0] = bar[0] - 1, logp[0]
+        sq = np.where(bar == prev_bar, np.square(logp - prev_logp), 0.0)
+
+        starts = np.flatnonzero(np.concatenate(([True], bar[1:] != bar[:-1])))
+        ends = np.append(starts[1:], n)
+        bars = {
+            "bar": bar[starts],
+            "open": price[starts],
+            "high": np.maximum.reduceat(price, starts),
+            "low": np.minimum.reduceat(price, starts),
+            "close": price[ends - 1],
+            "volume": np.add.reduceat(size, starts),
+            "rv": np.add.reduceat(sq, starts),
+            "ticks": ends - starts,
+        }
+
+        carried = self._open
+        if carried is not None and carried["bar"] == bars["bar"][0]:
+            bars["open"][0] = carried["open"]
+            bars["high"][0] = max(bars["high"][0], carried["high"])
+            bars["low"][0] = min(bars["low"][0], carried["low"])
+            for name in ("volume", "rv", "ticks"):
+                bars[name][0] += carried[name]
+            carried = None
+
+        self._open = {name: values[-1] for name, values in bars.items()}
+        self._last = (ts[-1], bar[-1], logp[-1])
+        done = {name: values[:-1] for name, values in bars.items()}
+        if carried is not None:
+            done = {name: np.concatenate(([carried[name]], values)) for name, values in done.items()}
+        return done
+
+    def flush(self):
+        """Close and return the open bar."""
+        if self._open is None:
+            return _empty_bars()
+        out = {name: np.array([value]) for name, value in self._open.items()}
+        self._open = None
+        return out
+
+
+def iter_bars(path, bar_ns, chunk_rows=CHUNK_ROWS):
+    """Yield ``(bars, n_ticks)`` per chunk of a tick file, then the final open bar."""
+    aggregator = BarAggregator(bar_ns)
+    for chunk in read_chunks(path, chunk_rows):
+        yield aggregator.push(chunk), chunk.shape[0]
+    yield aggregator.flush(), 0
+
+
+def aggregate_file(path, bar_ns, chunk_rows=CHUNK_ROWS):
+    """All bars of one file (pool worker)."""
+    parts = []
+    n_ticks = 0
+    for bars, n in iter_bars(path, bar_ns, chunk_rows):
+        parts.append(bars)
+        n_ticks += n
+    return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}, n_ticks
+
+
+# --- STORAGE AND CHECKPOINT ---
+def open_store(out_dir, unit):
+    out_dir = Path(out_dir)
+    if not (out_dir / features.META_NAME).exists():
+        return features.FeatureStore.create(out_dir, BAR_COLUMNS, unit)
+    store = features.FeatureStore(out_dir)
+    if store.features != BAR_COLUMNS or store.unit != unit:
+        raise ValueError(f"{out_dir} holds a different bar layout")
+    return store
+
+
+def _append_bars(store, bars, bar_ns):
+    keys = bars["bar"] * (bar_ns // UNIT_NS[store.unit])
+    if len(store):
+        # Already stored before an interruption.
+        fresh = keys > int(store.index[-1])
+        if not fresh.all():
+            keys = keys[fresh]
+            bars = {name: values[fresh] for name, values in bars.items()}
+    if keys.shape[0]:
+        store.append(keys, {name: bars[name] for name in BAR_COLUMNS})
+    return keys.shape[0]
+
+
+def _file_id(path):
+    st = Path(path).stat()
+    return f"{Path(path).resolve()}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _load_done(path):
+    done = set()
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["file"])
+                except (ValueError, KeyError):
+                    continue  # torn final line from a crash
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def _mark_done(f, file_id, n_ticks, n_bars):
+    f.write(json.dumps({"file": file_id, "ticks": n_ticks, "bars": n_bars}) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _peak_rss_mib():
+    # VmHWM starts over at exec; ru_maxrss would carry a spawning parent's peak.
+    try:
+        with open("/proc/self/status") as f:
+            own = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+    except (OSError, StopIteration):
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own / 1024, children / 1024
+
+
+# --- INGEST ---
+def ingest(paths, out_dir=None, bar="1min", workers=1, chunk_rows=CHUNK_ROWS):
+    """Aggregate tick files (in the order given) into a bar store; returns a report dict."""
+    bar_ns, unit = BARS[bar]
+    out_dir = Path(out_dir or BAR_DIR / bar)
+    store = open_store(out_dir, unit)
+    checkpoint = out_dir / CHECKPOINT_NAME
+    done = _load_done(checkpoint)
+    todo = [(path, _file_id(path)) for path in paths]
+    skipped = sum(1 for _, file_id in todo if file_id in done)
+    todo = [item for item in todo if item[1] not in done]
+    totals = {"ticks": 0, "bars": 0}
+    start = time.perf_counter()
+
+    with open(checkpoint, "a") as ckpt:
+        if workers <= 1:
+            # Inline: stream each file and append chunk by chunk.
+            for path, file_id in todo:
+                n_ticks = n_bars = 0
+                for bars, n in iter_bars(path, bar_ns, chunk_rows):
+                    n_bars += _append_bars(store, bars, bar_ns)
+                    n_ticks += n
+                _mark_done(ckpt, file_id, n_ticks, n_bars)
+                totals["ticks"] += n_ticks
+                totals["bars"] += n_bars
+        else:
+            # Aggregate in parallel, append in file order, a bounded window in flight.
+            with ProcessPoolExecutor(workers) as pool:
+                queue = iter(todo)
+                window = collections.deque()
+
+                def submit():
+                    for path, file_id in queue:
+                        window.append((file_id, pool.submit(aggregate_file, path, bar_ns, chunk_rows)))
+                        return
+
+                for _ in range(2 * workers):
+                    submit()
+                while window:
+                    file_id, future = window.popleft()
+                    bars, n_ticks = future.result()
+                    submit()
+                    n_bars = _append_bars(store, bars, bar_ns)
+                    _mark_done(ckpt, file_id, n_ticks, n_bars)
+                    totals["ticks"] += n_ticks
+                    totals["bars"] += n_bars
+
+    elapsed = time.perf_counter() - start
+    own_rss, worker_rss = _peak_rss_mib()
+    return {
+        "files": len(todo),
+        "skipped_files": skipped,
+        "ticks": totals["ticks"],
+        "bars": totals["bars"],
+        "elapsed": elapsed,
+        "ticks_per_sec": totals["ticks"] / elapsed if elapsed > 0 else 0.0,
+        "peak_rss_mib": own_rss,
+        "peak_worker_rss_mib": worker_rss,
+    }
+
+
+def _expand(paths):
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix in (".csv", ".bin")))
+        else:
+            files.append(path)
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate tick files into OHLCV + realized-variance bars.")
+    parser.add_argument("command", choices=("ingest",))
+    parser.add_argument("paths", nargs="+", help="tick files or directories, in time order")
+    parser.add_argument("--bar", choices=sorted(BARS), default="1min")
+    parser.add_argument("--out", help=f"bar store directory (default {BAR_DIR}/<bar>)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    report = ingest(_expand(args.paths), args.out, args.bar, args.workers, args.chunk_rows)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""Walk-forward retraining of the signal classifier, with cached folds.
+
+    result = walk_forward(FeatureStore(), mode="expanding", train=756, test=63)
+    result["signal"]                     # stitched out-of-sample 1/0 series
+    stats(result, store)                 # backtest summary of that series
+
+History is cut into test windows of ``test`` rows anchored at the first row,
+so appending days never moves an existing boundary. Each fold trains on the
+rows before its window (all of them when ``mode="expanding"``, the last
+``train`` when ``"rolling"``), minus a gap of ``horizon`` rows whose labels
+would look into the test window. A row's label is whether the close
+``horizon`` rows later is higher; its prediction is the signal held over the
+next bar, so nothing a fold is scored on was visible when it was trained.
+
+Fold models (``.npz``) and out-of-sample probabilities (``.npy``) live in the
+artifact cache, keyed by a hash of the rows they were built from and the
+hyperparameters. A run only trains folds whose training rows changed, on a
+process pool. Appending a day therefore only re-scores the last, partial
+window, and trains a single new fold when the day opens a new window.
+The newest fold's model is the live one: the CLI publishes it to
+``forest.MODEL_PATH``, where the app and the signal API load it once per
+process and score the latest row with ``latest_signal``.
+
+The trees are grown here with NumPy (histogram splits over at most ``bins``
+quantile bins per feature, bootstrap rows, ``max_features`` candidates per
+node) as sklearn-style arrays and packed with ``forest.pack``.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from benchmark3x import artifacts, backtest, features, forest
+
+MODES = ("expanding", "rolling")
+# The close is only used for labels: its level would let the trees key on the era.
+PREDICTORS = [name for name in features.FEATURES if name != "close"]
+
+DEFAULTS = {
+    "n_trees": 50,
+    "max_depth": 6,
+    "min_leaf": 20,
+    "max_features": 4,
+    "bins": 32,
+    "horizon": 5,      # label: close ``horizon`` rows ahead is higher
+    "threshold": 0.5,  # Long when the predicted probability reaches this
+    "seed": 0,
+}
+
+
+# --- FOLDS ---
+def folds(n_rows, train=756, test=63, mode="expanding", gap=DEFAULTS["horizon"]):
+    """``(train_slice, test_slice)`` pairs; the last test window may be partial."""
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    out = []
+    for start in range(train + gap, n_rows, test):
+        end = start - gap
+        first = 0 if mode == "expanding" else end - train
+        out.append((slice(first, end), slice(start, min(start + test, n_rows))))
+    return out
+
+
+def labels(close, horizon):
+    """1 where the close ``horizon`` rows later is higher; the last ``horizon`` rows are unknown."""
+    y = np.zeros(close.shape[0], dtype=np.int8)
+    y[:-horizon] = close[horizon:] > close[:-horizon]
+    return y
+
+
+# --- TRAINING ---
+def _bin_edges(X, bins):
+    """Per-feature split candidates: quantiles of the training values, as float32 data values."""
+    edges = []
+    for column in X.T:
+        values = column[~np.isnan(column)]
+        if not values.size:
+            edges.append(np.empty(0, dtype=np.float32))
+            continue
+        picks = np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1], method="inverted_cdf")
+        edges.append(np.unique(picks.astype(np.float32)))
+    return edges
+
+
+def _binned(X, edges):
+    out = np.empty(X.shape, dtype=np.uint8)
+    for f, e in enumerate(edges):
+        out[:, f] = np.searchsorted(e, X[:, f], "left")
+        # The packed forest sends NaN left (``x > t`` is False), so bin it with the smallest values.
+        out[np.isnan(X[:, f]), f] = 0
+    return out
+
+
+def _grow(binned, edges, y, weight, params, rng):
+    """One CART tree on bootstrap ``weight``s, as sklearn-style arrays."""
+    left, right, feature, threshold, value = [], [], [], [], []
+    n_features = binned.shape[1]
+    n_bins = max(len(e) for e in edges) + 1
+
+    def node(rows, depth):
+        i = len(left)
+        w = weight[rows]
+        pos = float(w @ y[rows])
+        total = float(w.sum())
+        left.append(forest.TREE_LEAF)
+        right.append(forest.TREE_LEAF)
+        feature.append(-2)
+        threshold.append(-2.0)
+        value.append((total - pos, pos))
+        if depth >= params["max_depth"] or total < 2 * params["min_leaf"] or pos in (0.0, total):
+            return i
+
+        best = None
+        for f in rng.choice(n_features, min(params["max_features"], n_features), replace=False):
+            if not len(edges[f]):
+                continue
+            b = binned[rows, f]
+            # Weighted counts per bin, then every "bin <= k" split at once.
+            n_left = np.cumsum(np.bincount(b, w, n_bins))[:len(edges[f])]
+            p_left = np.cumsum(np.bincount(b, w * y[rows], n_bins))[:len(edges[f])]
+            n_right, p_right = total - n_left, pos - p_left
+            ok = (n_left >= params["min_leaf"]) & (n_right >= params["min_leaf"])
+            if not ok.any():
+                continue
+            with np.errstate(divide="ignore", invalid="ignore"):
+                # Weighted Gini impurity of the children, up to a constant.
+                score = p_left * (n_left - p_left) / n_left + p_right * (n_right - p_right) / n_right
+            score = np.where(ok, score, np.inf)
+            k = int(np.argmin(score))
+            if best is None or score[k] < best[0]:
+                best = (score[k], f, k)
+        if best is None:
+            return i
+
+        _, f, k = best
+        go_left = binned[rows, f] <= k
+        feature[i] = int(f)
+        threshold[i] = float(edges[f][k])
+        left[i] = node(rows[go_left], depth + 1)
+        right[i] = node(rows[~go_left], depth + 1)
+        return i
+
+    node(np.flatnonzero(weight), 0)
+    return {
+        "children_left": np.array(left), "children_right": np.array(right),
+        "feature": np.array(feature), "threshold": np.array(threshold), "value": np.array(value),
+    }
+
+
+def fit(X, y, params=DEFAULTS):
+    """Random forest on ``X`` (rows x features) and 0/1 ``y``, as a ``PackedForest``."""
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float64)
+    edges = _bin_edges(X, params["bins"])
+    binned = _binned(X, edges)
+    rng = np.random.default_rng(params["seed"])
+    trees = []
+    for _ in range(params["n_trees"]):
+        weight = np.bincount(rng.integers(0, X.shape[0], X.shape[0]), minlength=X.shape[0]).astype(np.float64)
+        trees.append(_grow(binned, edges, y, weight, params, rng))
+    return forest.pack(trees, X.shape[1], np.array([0, 1]))
+
+
+# --- FOLD TASKS ---
+def _version():
+    here = Path(__file__)
+    return artifacts.source_version(here, here.with_name("forest.py"))
+
+
+def _rows_hash(store, rows, names):
+    digest = hashlib.sha256()
+    digest.update(store.index[rows].tobytes())
+    for name in names:
+        digest.update(store.column(name)[rows].tobytes())
+    return digest.hexdigest()
+
+
+def _matrix(store, rows):
+    return np.column_stack([store.column(name)[rows] for name in PREDICTORS])
+
+
+def _fold_task(root, cache_root, fold, params, version):
+    """Train (if needed) and score one fold in a worker; returns whether it trained."""
+    store = features.FeatureStore(root)
+    cache = artifacts.ArtifactCache(cache_root)
+    (train, test), (model_params, pred_params) = fold
+
+    def build_model(path):
+        # Training rows end ``horizon`` rows before the window, so their labels only use closes before it.
+        close = store.column("close")[:train.stop + params["horizon"]]
+        fit(_matrix(store, train), labels(close, params["horizon"])[train], params).save(path)
+
+    misses = cache.misses
+    model_path = cache.get_or_build("walkforward-model", model_params, build_model, ".npz", version)
+    trained = cache.misses > misses
+
+    def build_predictions(path):
+        proba = forest.load(model_path).predict_proba(_matrix(store, test))[:, 1]
+        with open(path, "wb") as f:
+            np.save(f, proba)
+
+    cache.get_or_build("walkforward-predictions", pred_params, build_predictions, ".npy", version)
+    return trained
+
+
+# --- SCHEDULER ---
+def walk_forward(store, mode="expanding", train=756, test=63, end=None, workers=None, cache=None, **overrides):
+    """Out-of-sample probabilities and signal for every row after the first training window.
+
+    Rows are those before ``end`` (a date; all rows when None). Returns a
+    dict with the stitched ``dates``/``rows``/``proba``/``signal`` arrays,
+    per-fold ranges and counts of folds trained, re-scored and reused.
+    """
+    unknown = set(overrides) - set(DEFAULTS)
+    if unknown:
+        raise TypeError(f"unknown parameters: {sorted(unknown)}")
+    params = dict(DEFAULTS, **overrides)
+    cache = cache or artifacts.default_cache()
+    version = _version()
+    hyper = {name: params[name] for name in DEFAULTS if name != "threshold"}
+    n_rows = store.index_range(None, end).stop
+
+    plan, pending = [], []
+    for train_rows, test_rows in folds(n_rows, train, test, mode, params["horizon"]):
+        # Labels of the training rows read the closes up to the window start.
+        label_rows = slice(train_rows.start, train_rows.stop + params["horizon"])
+        model_params = {"rows": _rows_hash(store, train_rows, PREDICTORS) + _rows_hash(store, label_rows, ["close"]),
+                        **hyper}
+        model_key = artifacts.artifact_key("walkforward-model", model_params, version)
+        pred_params = {"model": model_key, "rows": _rows_hash(store, test_rows, PREDICTORS)}
+        pred_path = cache.path_for(artifacts.artifact_key("walkforward-predictions", pred_params, version), ".npy")
+        model_path = cache.path_for(model_key, ".npz")
+        fold = ((train_rows, test_rows), (model_params, pred_params))
+        plan.append((fold, pred_path))
+        if not pred_path.exists():
+            pending.append(fold)
+
+    trained = 0
+    if pending:
+        args = (str(store.root), str(cache.root))
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        if workers > 1:
+            # forkserver: the caller may be a threaded server (the Streamlit app), which must not be forked.
+            context = multiprocessing.get_context("forkserver")
+            with ProcessPoolExecutor(workers, mp_context=context) as pool:
+                futures = [pool.submit(_fold_task, *args, fold, params, version) for fold in pending]
+                trained = sum(future.result() for future in futures)
+        else:
+            trained = sum(_fold_task(*args, fold, params, version) for fold in pending)
+
+    parts = [np.load(path) for _, path in plan]
+    proba = np.concatenate(parts) if parts else np.empty(0)
+    first = plan[0][0][0][1].start if plan else n_rows
+    # A reused fold's model may have been evicted from the cache since it was scored.
+    model = model_path if plan and model_path.exists() else None
+    return {
+        "mode": mode,
+        "params": params,
+        "rows": slice(first, n_rows),
+        "dates": store.dates[first:n_rows],
+        "proba": proba,
+        "signal": (proba >= params["threshold"]).astype(np.int8),
+        "folds": [{"train": [f[0][0].start, f[0][0].stop], "test": [f[0][1].start, f[0][1].stop]} for f, _ in plan],
+        "trained": trained,
+        "scored": len(pending),
+        "reused": len(plan) - len(pending),
+        "model": model,
+    }
+
+
+def latest_signal(store, model, threshold=DEFAULTS["threshold"]):
+    """``{"date", "proba", "signal"}`` from ``model`` (a PackedForest) for the newest row, or None."""
+    n = len(store)
+    if not n:
+        return None
+    proba = float(model.predict_proba(_matrix(store, slice(n - 1, n)))[0, 1])
+    return {"date": str(store.dates[n - 1]), "proba": round(proba, 4), "signal": int(proba >= threshold)}
+
+
+def stats(result, store, product="SPXL"):
+    """Backtest summary of the stitched signal over its out-of-sample rows (landing-card numbers)."""
+    close = store.column("close")[result["rows"]]
+    return backtest.summary(backtest.run_backtest(close, result["signal"], product))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward train and score the classifier on the feature store.")
+    parser.add_argument("--root", default=str(features.FEATURE_DIR))
+    parser.add_argument("--mode", choices=MODES, default="expanding")
+    parser.add_argument("--train", type=int, default=756, help="rows per training window (rolling mode)")
+    parser.add_argument("--test", type=int, default=63, help="rows per out-of-sample window")
+    parser.add_argument("--end", help="only use rows before this date")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--product", choices=sorted(backtest.PRODUCTS), default="SPXL")
+    parser.add_argument("--model", default=str(forest.MODEL_PATH),
+                        help="publish the newest fold's model here for the app and signal API")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+    args = parser.parse_args(argv)
+
+    store = features.FeatureStore(args.root)
+    start = time.perf_counter()
+    result = walk_forward(store, args.mode, args.train, args.test, args.end, args.workers,
+                          **{name: getattr(args, name) for name in DEFAULTS})
+    elapsed = time.perf_counter() - start
+    if result["model"]:
+        Path(args.model).parent.mkdir(parents=True, exist_ok=True)
+        artifacts.publish(result["model"], args.model)
+    summary = stats(result, store, args.product)
+    report = {
+        "folds": len(result["folds"]), "trained": result["trained"], "scored": result["scored"],
+        "reused": result["reused"], "seconds": round(elapsed, 3),
+        "out_of_sample": [str(result["dates"][0]), str(result["dates"][-1])] if len(result["dates"]) else None,
+        "stats": summary,
+        "model": args.model if result["model"] else None,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['folds']} folds ({args.mode}): {report['trained']} trained, {report['scored']} scored, "
+          f"{report['reused']} reused in {elapsed:.2f}s")
+    if report["out_of_sample"]:
+        print(f"out of sample {report['out_of_sample'][0]} .. {report['out_of_sample'][1]}, "
+              f"exposure {summary['exposure']:.0%}, {summary['trades']} trades")
+        print("  ".join(f"{k} {v}" for k, v in backtest.format_stats(summary).items()))
+    if report["model"]:
+        print(f"model published to {report['model']}")
+
+
+if __name__ == "__main__":
+    main()
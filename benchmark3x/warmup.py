@@ -0,0 +1,48 @@
+"""Prebuild every derived artifact before the app takes traffic.
+
+    python -m benchmark3x.warmup            # then: streamlit run app_live.py
+    python -m benchmark3x.warmup --force    # re-render the chart too
+
+Renders the regime chart (matplotlib), fingerprints the assets, encodes the
+responsive image variants, compiles the stylesheets, computes the stat cards
+and renders the static landing page. With these on disk the Streamlit app only reads files on its
+first run, and never imports numpy or matplotlib to serve a page.
+"""
+import argparse
+import time
+
+from benchmark3x import assets, charts, images, site, styles
+
+STEPS = (
+    ("chart", charts.ensure_regime_chart),
+    ("assets", assets.build),
+    ("images", images.build),
+    ("styles", styles.build),
+    ("stats", charts.write_landing_stats),
+    ("html", site.build),
+)
+
+
+def run(force=False):
+    """Run every step in order; returns ``{step: seconds}``."""
+    if force:
+        charts.ensure_regime_chart(rebuild=True)
+    timings = {}
+    for name, step in STEPS:
+        start = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prebuild chart, assets, images, styles, stats and HTML.")
+    parser.add_argument("--force", action="store_true", help="regenerate the chart even if it exists")
+    args = parser.parse_args(argv)
+
+    for name, seconds in run(args.force).items():
+        print(f"{name:<8} {seconds * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()